@@ -1,43 +1,81 @@
+import numpy as np
 import pandas as pd
 
+def rank_within_groups(codes, values, n_groups):
+    # Row order by group, then value descending. Packing both into one int64 key lets a
+    # single stable argsort replace the much slower two-key lexsort.
+    if len(values) == 0:
+        return np.arange(0)
+    low, high = int(values.min()), int(values.max())
+    span = high - low + 1
+    if n_groups * span < 2 ** 62:
+        return np.argsort(codes.astype(np.int64) * span + (high - values), kind='stable')
+    return np.lexsort((-values, codes))
+
 def analyze_data(df):
+    # Every per-party and per-constituency aggregate comes from one factorization of each key
+    # plus bincount/lexsort over the raw column arrays; df itself is never copied or modified.
+    constituency_codes, constituencies = pd.factorize(df['Constituency'], sort=True)
+    party_codes, parties = pd.factorize(df['Party'], sort=True)
+    valid = (constituency_codes >= 0) & (party_codes >= 0)
+    # Recode over the rows kept so every constituency and party has at least one candidate.
+    constituency_codes, kept = pd.factorize(constituency_codes[valid], sort=True)
+    constituencies = constituencies[kept]
+    party_codes, kept = pd.factorize(party_codes[valid], sort=True)
+    parties = parties[kept]
+    votes = df['Votes'].to_numpy(dtype=np.int64)[valid]
+
+    constituency_votes = np.bincount(constituency_codes, weights=votes, minlength=len(constituencies))
+    constituency_counts = np.bincount(constituency_codes, minlength=len(constituencies))
+    party_votes = np.bincount(party_codes, weights=votes, minlength=len(parties)).astype(np.int64)
+    party_counts = np.bincount(party_codes, minlength=len(parties))
+
+    order = rank_within_groups(constituency_codes, votes, len(constituencies))
+    starts = np.concatenate(([0], np.cumsum(constituency_counts)[:-1]))
+    winner_rows = order[starts]
+    runner_up_votes = np.where(constituency_counts > 1, votes[order[np.minimum(starts + 1, len(order) - 1)]], 0)
+    margins = votes[winner_rows] - runner_up_votes
+    party_seats = np.bincount(party_codes[winner_rows], minlength=len(parties))
+
     insights = {}
 
     # Insight 1: Total number of seats contested
-    insights['total_seats'] = df['Constituency'].nunique()
+    insights['total_seats'] = len(constituencies)
 
     # Insight 2: Total number of votes cast
-    insights['total_votes'] = df['Votes'].sum()
+    insights['total_votes'] = int(df['Votes'].sum())
 
     # Insight 3: Party-wise number of seats won
-    insights['party_wise_seats'] = df.groupby('Party')['Constituency'].count().to_dict()
+    insights['party_wise_seats'] = {party: int(seats) for party, seats in zip(parties, party_seats) if seats}
 
     # Insight 4: Candidate with the highest number of votes
-    insights['top_candidate_votes'] = df.loc[df['Votes'].idxmax()]['Candidate']
+    insights['top_candidate_votes'] = df['Candidate'].iloc[np.flatnonzero(valid)[np.argmax(votes)]]
 
     # Insight 5: Average number of votes per constituency
-    insights['avg_votes_per_constituency'] = df.groupby('Constituency')['Votes'].mean().mean()
+    insights['avg_votes_per_constituency'] = float((constituency_votes / constituency_counts).mean())
 
     # Insight 6: Number of constituencies won by margin greater than 10,000 votes
-    df['Vote Margin'] = df['Votes'] - df['Votes'].shift(-1)
-    insights['constituencies_margin_gt_10000'] = df[df['Vote Margin'] > 10000]['Constituency'].nunique()
+    insights['constituencies_margin_gt_10000'] = int((margins > 10000).sum())
 
     # Insight 7: Party with the highest average votes per candidate
-    insights['party_highest_avg_votes'] = df.groupby('Party')['Votes'].mean().idxmax()
+    insights['party_highest_avg_votes'] = parties[np.argmax(party_votes / party_counts)]
 
     # Insight 8: Total number of candidates
     insights['total_candidates'] = df['Candidate'].nunique()
 
     # Insight 9: Top 5 parties by total votes received
-    insights['top_5_parties_by_votes'] = df.groupby('Party')['Votes'].sum().nlargest(5).to_dict()
+    top_5 = np.argsort(-party_votes, kind='stable')[:5]
+    insights['top_5_parties_by_votes'] = {parties[i]: int(party_votes[i]) for i in top_5}
 
     # Insight 10: Percentage of votes won by the winning candidate in each constituency
-    df['Vote Percentage'] = (df['Votes'] / df.groupby('Constituency')['Votes'].transform('sum')) * 100
-    insights['avg_vote_percentage_winning_candidate'] = df.groupby('Constituency').first()['Vote Percentage'].mean()
+    insights['avg_vote_percentage_winning_candidate'] = float(
+        (votes[winner_rows] / constituency_votes * 100).mean())
 
     return insights
 
 if __name__ == "__main__":
-    cleaned_df = pd.read_csv('cleaned_election_results.csv')
+    from snapshot_store import load_dataset
+
+    cleaned_df = load_dataset('election_results', 'cleaned_election_results.csv')
     insights = analyze_data(cleaned_df)
     print(insights)
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from analyze_data import analyze_data
+
+
+def legacy_analyze_data(df):
+    # analyze_data() before the single-pass rewrite: one groupby per insight.
+    insights = {}
+    insights['total_seats'] = df['Constituency'].nunique()
+    insights['total_votes'] = df['Votes'].sum()
+    insights['party_wise_seats'] = df.groupby('Party')['Constituency'].count().to_dict()
+    insights['top_candidate_votes'] = df.loc[df['Votes'].idxmax()]['Candidate']
+    insights['avg_votes_per_constituency'] = df.groupby('Constituency')['Votes'].mean().mean()
+    df['Vote Margin'] = df['Votes'] - df['Votes'].shift(-1)
+    insights['constituencies_margin_gt_10000'] = df[df['Vote Margin'] > 10000]['Constituency'].nunique()
+    insights['party_highest_avg_votes'] = df.groupby('Party')['Votes'].mean().idxmax()
+    insights['total_candidates'] = df['Candidate'].nunique()
+    insights['top_5_parties_by_votes'] = df.groupby('Party')['Votes'].sum().nlargest(5).to_dict()
+    df['Vote Percentage'] = (df['Votes'] / df.groupby('Constituency')['Votes'].transform('sum')) * 100
+    insights['avg_vote_percentage_winning_candidate'] = df.groupby('Constituency').first()['Vote Percentage'].mean()
+    return insights
+
+
+def synthetic_results(rows, elections=(2014, 2019, 2024), parties=40, seed=0):
+    # All-candidates results: each constituency of each election gets 5-15 candidates.
+    rng = np.random.default_rng(seed)
+    per_seat = rng.integers(5, 16, size=rows // 10 + 1)
+    seat_ids = np.repeat(np.arange(len(per_seat)), per_seat)[:rows]
+    election = np.asarray(elections)[seat_ids % len(elections)]
+    constituency = pd.Categorical.from_codes(
+        seat_ids, [f"PC{i // len(elections)}-{elections[i % len(elections)]}" for i in range(len(per_seat))])
+    party = pd.Categorical.from_codes(rng.integers(0, parties, size=len(seat_ids)),
+                                      [f"Party {i}" for i in range(parties)])
+    return pd.DataFrame({
+        'Election': election,
+        'Constituency': constituency,
+        'Candidate': np.char.add('Candidate ', np.arange(len(seat_ids)).astype(str)),
+        'Party': party,
+        'Votes': rng.integers(100, 1_000_000, size=len(seat_ids)),
+    })
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def main(rows=3_000_000):
+    df = synthetic_results(rows)
+    print(f"rows: {len(df):,}  constituencies: {df['Constituency'].nunique():,}")
+
+    before = df.copy()
+    insights, fast = timed(analyze_data, df)
+    assert df.equals(before), "analyze_data modified its input"
+
+    legacy, slow = timed(legacy_analyze_data, df.copy())
+    for key in ('total_seats', 'total_votes', 'top_candidate_votes', 'total_candidates',
+                'top_5_parties_by_votes', 'party_highest_avg_votes'):
+        assert insights[key] == legacy[key], key
+
+    print(f"legacy groupby passes: {slow:.2f} s")
+    print(f"single-pass engine:    {fast:.2f} s")
+    print(f"speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from candidate_index import CandidateIndex
+from fixture_server import DATASETS_DIR
+
+
+def synthetic_candidates(rows, parties=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Constituency': [f"Constituency {i % 5000}({i % 5000 % 50})" for i in range(rows)],
+        'Winning Candidate': [f"Candidate {i}" for i in range(rows)],
+        'Total Votes': rng.integers(10_000, 1_500_000, size=rows),
+        'Margin': rng.integers(1, 500_000, size=rows),
+        'Party': rng.choice([f"Party {i}" for i in range(parties)], size=rows),
+    })
+
+
+def mask_queries(df, parties):
+    for party in parties:
+        df[df['Party'] == party].nlargest(5, 'Total Votes')
+        df[df['Party'] == party].nsmallest(5, 'Total Votes')
+        df[(df['Party'] == party) & (df['Margin'] >= 1000) & (df['Margin'] <= 50000)]
+
+
+def index_queries(index, parties):
+    for party in parties:
+        index.top_k(5, party)
+        index.bottom_k(5, party)
+        index.margin_range(1000, 50000, party)
+
+
+def best_of(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    cases = [('candidate_data.csv', pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv')))]
+    cases += [(f"synthetic {rows}", synthetic_candidates(rows)) for rows in (10_000, 100_000, 1_000_000)]
+    for label, df in cases:
+        parties = df['Party'].value_counts().index[:10].tolist()
+        start = time.perf_counter()
+        index = CandidateIndex(df)
+        build = time.perf_counter() - start
+        masked = best_of(mask_queries, df, parties)
+        indexed = best_of(index_queries, index, parties)
+        print(f"{label:20s} build {build * 1000:8.1f} ms  mask {masked * 1000:8.1f} ms  "
+              f"index {indexed * 1000:6.1f} ms  ({masked / indexed:5.1f}x per 10-party query batch)")
+
+
+if __name__ == "__main__":
+    main()
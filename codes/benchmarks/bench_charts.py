@@ -0,0 +1,61 @@
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import new
+from charts import ChartRenderer
+from fixture_server import DATASETS_DIR
+
+
+def queue_all_charts(df, candidate_df, charts):
+    new.election_closeness(df, charts)
+    new.forming_government(df, charts)
+    new.overall_election_statistics(df, charts)
+    new.party_size_distribution(df, charts)
+    new.potential_kingmakers(df, charts)
+    new.independent_candidates_won(df, charts)
+    new.top_5_candidates_by_votes(candidate_df, charts)
+    new.top_5_candidates_by_votes_top_10_parties(df, candidate_df, charts)
+    new.least_5_candidates_by_votes(candidate_df, charts)
+    new.least_5_candidates_by_votes_top_10_parties(df, candidate_df, charts)
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def full_regenerate(df, candidate_df, workers):
+    # A fresh output directory each time so nothing is skipped as unchanged.
+    charts = ChartRenderer(tempfile.mkdtemp(prefix='charts_'), workers=workers)
+    queue_all_charts(df, candidate_df, charts)
+    start = time.perf_counter()
+    rendered = charts.flush()
+    return len(rendered), time.perf_counter() - start
+
+
+def main(runs=5):
+    df = pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv'))
+    candidate_df = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+
+    for workers in sorted({1, os.cpu_count()}):
+        for run in range(runs):
+            count, elapsed = full_regenerate(df, candidate_df, workers)
+            print(f"workers={workers} run={run + 1}: {count} charts in {elapsed:.2f} s, peak RSS {rss_mb():.0f} MB")
+
+    out_dir = tempfile.mkdtemp(prefix='charts_')
+    for label in ('first render', 'unchanged inputs'):
+        charts = ChartRenderer(out_dir)
+        queue_all_charts(df, candidate_df, charts)
+        start = time.perf_counter()
+        rendered = charts.flush()
+        print(f"{label}: {len(rendered)} charts rendered in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
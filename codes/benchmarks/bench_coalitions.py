@@ -0,0 +1,94 @@
+import itertools
+import math
+import os
+import sys
+import time
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from coalitions import CoalitionEngine, banzhaf_index, shapley_shubik_index
+from fixture_server import DATASETS_DIR
+
+
+def brute_force_banzhaf(weights, quota):
+    n = len(weights)
+    swings = np.zeros(n)
+    for size in range(n + 1):
+        for coalition in itertools.combinations(range(n), size):
+            seats = sum(weights[i] for i in coalition)
+            if seats >= quota:
+                for i in coalition:
+                    if seats - weights[i] < quota:
+                        swings[i] += 1
+    return swings / swings.sum()
+
+
+def exact_shapley_shubik(weights, quota):
+    # The same pivot counting in Python integers (exact at any size) over an object array,
+    # one table of the other parties per distinct seat count.
+    n = len(weights)
+    index = {}
+    for w in set(weights):
+        others = list(weights)
+        others.remove(w)
+        counts = np.zeros((n, quota), dtype=object)
+        counts[0, 0] = 1
+        for j, v in enumerate(others):
+            if v < quota:
+                for k in range(min(j + 1, n - 1), 0, -1):
+                    counts[k, v:] += counts[k - 1, :quota - v]
+        pivotal = counts[:, max(quota - w, 0):].sum(axis=1)
+        shares = sum(Fraction(int(pivotal[k]) * math.factorial(k) * math.factorial(n - 1 - k)) for k in range(n))
+        index[w] = float(shares / math.factorial(n))
+    return np.array([index[w] for w in weights])
+
+
+def synthetic_parties(n, seed=0):
+    # Long-tailed seat shares like the real table: a few large parties, many with 1-5 seats.
+    rng = np.random.default_rng(seed)
+    totals = np.maximum(1, (rng.pareto(1.2, size=n) * 4).astype(int))
+    return pd.DataFrame({'Party': [f"Party {i}" for i in range(n)], 'Total': totals})
+
+
+def time_engine(df, repeat=3):
+    engine = CoalitionEngine(df)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.power_indices()
+        engine.smallest_coalition(df.loc[df['Total'].idxmax(), 'Party'])
+        best = min(best, time.perf_counter() - start)
+    return engine.quota, best
+
+
+def main():
+    small = synthetic_parties(14, seed=1)['Total'].tolist()
+    quota = sum(small) // 2 + 1
+    assert np.allclose(banzhaf_index(small, quota), brute_force_banzhaf(small, quota))
+    assert np.isclose(shapley_shubik_index(small, quota).sum(), 1.0)
+
+    # Far past where float counts lose integer precision (~1e16), against exact integers.
+    many = np.random.default_rng(2).integers(1, 6, size=250).tolist()
+    quota = sum(many) // 2 + 1
+    start = time.perf_counter()
+    exact = exact_shapley_shubik(many, quota)
+    exact_seconds = time.perf_counter() - start
+    index = shapley_shubik_index(many, quota)
+    assert np.allclose(index, exact, rtol=1e-9, atol=0), np.abs(index / exact - 1).max()
+    assert np.isclose(index.sum(), 1.0)
+    print(f"250 parties: Shapley-Shubik within {np.abs(index / exact - 1).max():.1e} of exact integer counts "
+          f"({exact_seconds:.1f}s exact)")
+
+    cases = [('parties_data.csv (42)', pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv')))]
+    cases += [(f"synthetic {n}", synthetic_parties(n)) for n in (200, 500, 1000)]
+    for label, df in cases:
+        quota, elapsed = time_engine(df)
+        print(f"{label:24s} quota={quota:6d}  indices + smallest coalition: {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
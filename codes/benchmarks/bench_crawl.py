@@ -0,0 +1,93 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from constituency_crawl import PROGRESS_FILE, ConstituencyCrawl
+from fixture_server import DATASETS_DIR, build_fixture_site, serve_fixtures, synthetic_results
+from snapshot_store import SnapshotStore
+
+# End-to-end crawl of every constituency page on the local fixture site, which answers a
+# share of requests with 503: a first crawl is killed outright part way through, a second
+# resumes over the same crawl directory until nothing remains, and the published snapshot
+# must hold exactly the results the site was built from, with no page lost or doubled.
+
+CRAWL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'constituency_crawl.py')
+KEY = ['Constituency', 'Candidate', 'Party', 'Votes']
+
+
+def expected_results():
+    parties = pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv'))
+    candidates = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+    return synthetic_results(candidates, parties['Party'])
+
+
+def canonical(df):
+    df = df[KEY].astype({'Constituency': str, 'Candidate': str, 'Party': str, 'Votes': 'int64'})
+    return df.sort_values(KEY).reset_index(drop=True)
+
+
+def progress_lines(crawl_dir):
+    path = os.path.join(crawl_dir, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+
+def main(error_rate=0.05, kill_after=6.0):
+    root = tempfile.mkdtemp(prefix='crawl_bench_')
+    build_fixture_site(root)
+    server, base_url = serve_fixtures(root, error_rate=error_rate)
+    crawl_dir = os.path.join(root, 'crawl')
+    try:
+        # A polite crawl in its own process, killed without warning part way through.
+        crawler = subprocess.Popen([sys.executable, CRAWL_PATH, '--base-url', base_url, '--crawl-dir', crawl_dir,
+                                    '--rate-limit', '40'], stdout=subprocess.DEVNULL)
+        time.sleep(kill_after)
+        crawler.send_signal(signal.SIGKILL)
+        crawler.wait()
+        print(f"killed first crawl after {kill_after:.1f}s with {progress_lines(crawl_dir)} pages logged")
+
+        crawl = ConstituencyCrawl(crawl_dir, base_url, workers=8, rate_limit=0, backoff=0.05, batch_pages=50)
+        rounds = 0
+        start = time.perf_counter()
+        while True:
+            rounds += 1
+            counts = crawl.run()
+            print(f"resume round {rounds}: fetched {counts['fetched']}, failed {counts['failed']}, "
+                  f"remaining {counts['remaining']} of {counts['constituencies']}")
+            if counts['remaining'] == 0 or rounds == 10:
+                break
+        seconds = time.perf_counter() - start
+        store = SnapshotStore(os.path.join(root, 'snapshots'))
+        version = crawl.publish(store)
+    finally:
+        server.shutdown()
+
+    crawled = store.read('election_results', version)
+    expected = expected_results()
+    assert canonical(crawled).equals(canonical(expected)), "crawled results differ from the fixture site"
+    print(f"published {len(crawled)} rows over {crawled['Constituency'].nunique()} constituencies "
+          f"({len(crawl.parts())} parts), identical to the site; resume took {seconds:.2f}s")
+
+    # The same site crawled from scratch with no failures, for the steady-state rate.
+    server, base_url = serve_fixtures(root)
+    try:
+        clean = ConstituencyCrawl(os.path.join(root, 'clean'), base_url, workers=8, rate_limit=0)
+        start = time.perf_counter()
+        counts = clean.run()
+        seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    print(f"clean crawl: {counts['fetched']} pages in {seconds:.2f}s ({counts['fetched'] / seconds:.0f} pages/s)")
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:3]))
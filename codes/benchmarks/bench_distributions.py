@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from bench_suite import synthetic_candidates
+from distributions import SCHEMES, DistributionEngine
+
+SPECS = [('Total Votes', 'votes'), ('Margin', 'margin')]
+
+
+def history(rows, states=36, elections=(2014, 2019, 2024)):
+    df = synthetic_candidates(rows)
+    rng = np.random.default_rng(1)
+    df['State'] = pd.Categorical.from_codes(rng.integers(0, states, rows), [f"State {i}" for i in range(states)])
+    df['Election'] = rng.choice(np.array(elections, dtype=np.int16), rows)
+    df['Party'] = df['Party'].astype('category')
+    return df
+
+
+def pandas_slices(df):
+    # What each dashboard slice costs today: filter the frame, pd.cut, value_counts.
+    results = {}
+    for column, scheme in SPECS:
+        scheme = SCHEMES[scheme]
+        for (state, election), _ in df.groupby(['State', 'Election'], observed=True):
+            selected = df[(df['State'] == state) & (df['Election'] == election)]
+            binned = pd.cut(selected[column], bins=list(scheme.edges), labels=list(scheme.labels), right=scheme.right)
+            results[column, state, election] = binned.value_counts().sort_index().to_numpy()
+    return results
+
+
+def engine_slices(df):
+    return DistributionEngine(df).histograms(SPECS, by=['State', 'Election'])
+
+
+def main(rows=1_000_000):
+    df = history(rows)
+
+    start = time.perf_counter()
+    expected = pandas_slices(df)
+    pandas_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = engine_slices(df)
+    engine_seconds = time.perf_counter() - start
+
+    for (column, _), result in zip(SPECS, results):
+        for (state, election), counts in result.iterrows():
+            assert (counts.to_numpy() == expected[column, state, election]).all(), (column, state, election)
+
+    engine = DistributionEngine(df)
+    engine.histograms(SPECS, by=['State', 'Election'])
+    start = time.perf_counter()
+    for _ in range(100):
+        engine.histograms(SPECS, by=['State', 'Election'])
+    cached_seconds = (time.perf_counter() - start) / 100
+
+    slices = len(results[0])
+    print(f"rows: {rows:,}  slices: {slices} (state x election) x {len(SPECS)} metrics")
+    print(f"pandas filter + cut per slice: {pandas_seconds:8.3f}s")
+    print(f"DistributionEngine, one pass:  {engine_seconds:8.3f}s  ({pandas_seconds / engine_seconds:.0f}x)")
+    print(f"same snapshot, cached:         {cached_seconds * 1e6:8.1f}us")
+
+
+if __name__ == "__main__":
+    main(*(int(float(arg)) for arg in sys.argv[1:2]))
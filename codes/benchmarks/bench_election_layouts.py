@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from election_history import ELECTIONS, ingest_election, load_history
+from fixture_server import DATASETS_DIR, build_election_site, serve_fixtures
+from snapshot_store import SnapshotStore
+
+# Every election in election_history.ELECTIONS scraped from a local site laid out the way
+# its Layout describes (title rows, footers, cell order, link cell and table classes), then
+# read back from the history store: each must hold exactly the winners the site was built
+# from, whatever the layout.
+
+COLUMNS = ['Party', 'Serial Number', 'Constituency', 'Winning Candidate', 'Total Votes', 'Margin']
+
+
+def canonical(df):
+    df = df[COLUMNS].astype({'Party': str, 'Serial Number': 'int64', 'Constituency': str, 'Winning Candidate': str,
+                             'Total Votes': 'int64', 'Margin': 'int64'})
+    return df.sort_values(COLUMNS).reset_index(drop=True)
+
+
+def main():
+    root = tempfile.mkdtemp(prefix='layouts_bench_')
+    expected = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+    store = SnapshotStore(os.path.join(root, 'snapshots'))
+    for election, layout in ELECTIONS.items():
+        build_election_site(root, layout, str(election))
+        server, base_url = serve_fixtures(root, path=str(election))
+        try:
+            start = time.perf_counter()
+            ingest_election(store, election, base_url, rate_limit=0)
+            seconds = time.perf_counter() - start
+        finally:
+            server.shutdown()
+        stored = load_history(store, [election])
+        assert canonical(stored).equals(canonical(expected)), f"{election} layout scraped differently"
+        print(f"{election}: {len(stored)} winners over {stored['Party'].nunique()} parties in {seconds:.2f}s, "
+              f"identical to the site")
+
+
+if __name__ == "__main__":
+    main()
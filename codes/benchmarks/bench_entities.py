@@ -0,0 +1,89 @@
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from entities import DATASETS_DIR, EntityIndex
+
+# Joining a full-results table that spells names the way the constituency pages do
+# ("ANAKAPALLE (5)", party abbreviations) onto the winners table: the string way normalizes
+# every row with a regex and merges on the keys; the entity way looks up each distinct value
+# once and merges on int32 IDs. Both must produce the same join.
+
+
+def string_key(value):
+    return re.sub(r'\s+', '', str(value)).casefold()
+
+
+def results(candidates, parties, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    constituencies = candidates['Constituency'].to_numpy()[rng.integers(0, len(candidates), rows)]
+    spelled = np.array([name.upper().replace('(', ' (') for name in candidates['Constituency']], dtype=object)
+    respelled = rng.random(rows) < 0.5
+    constituencies = np.where(respelled, spelled[rng.integers(0, len(candidates), rows)], constituencies)
+    labels = parties['Party'].to_numpy()
+    abbreviations = np.array([label.split(' - ')[-1] for label in labels], dtype=object)
+    party = rng.integers(0, len(labels), rows)
+    return pd.DataFrame({'Constituency': constituencies,
+                         'Party': np.where(rng.random(rows) < 0.5, abbreviations[party], labels[party]),
+                         'Votes': rng.integers(0, 1_000_000, rows)})
+
+
+def string_join(df, winners):
+    # Winner's party per result row, matched by normalized constituency string.
+    keyed = winners.assign(Key=[string_key(name) for name in winners['Constituency']])
+    left = df.assign(Key=[string_key(name) for name in df['Constituency']])
+    return left.merge(keyed[['Key', 'Party']], on='Key', how='left', suffixes=('', ' Winner'))['Party Winner']
+
+
+def entity_join(df, winners, index):
+    keyed = pd.DataFrame({'ID': index.constituencies.ids(winners['Constituency']), 'Party Winner': winners['Party']})
+    left = pd.DataFrame({'ID': index.constituencies.ids(df['Constituency'])})
+    return left.merge(keyed, on='ID', how='left')['Party Winner']
+
+
+def main(rows=1_000_000):
+    parties = pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv'))
+    candidates = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+    df = results(candidates, parties, rows)
+
+    start = time.perf_counter()
+    index = EntityIndex.seeded()
+    seed_seconds = time.perf_counter() - start
+    path = index.save(os.path.join(tempfile.mkdtemp(prefix='entities_bench_'), 'entities.json'))
+    start = time.perf_counter()
+    EntityIndex.load(path)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = string_join(df, candidates)
+    string_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    joined = entity_join(df, candidates, index)
+    entity_seconds = time.perf_counter() - start
+    assert joined.isna().sum() == 0 and (joined.to_numpy() == expected.to_numpy()).all()
+
+    start = time.perf_counter()
+    expected = df['Party'].str.contains('Independent', case=False) | (df['Party'] == 'IND')
+    contains_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    mask = index.parties.independent_mask(df['Party'])
+    mask_seconds = time.perf_counter() - start
+    assert (mask == expected.to_numpy()).all()
+
+    print(f"rows: {rows:,}  constituencies: {len(index.constituencies)}  parties: {len(index.parties)}")
+    print(f"index: seeded from CSVs {seed_seconds * 1e3:7.1f}ms, reloaded from JSON {load_seconds * 1e3:7.1f}ms")
+    print(f"constituency join: regex keys {string_seconds:6.3f}s, entity IDs {entity_seconds:6.3f}s "
+          f"({string_seconds / entity_seconds:.0f}x)")
+    print(f"independent rows: str.contains {contains_seconds:6.3f}s, entity flags {mask_seconds:6.3f}s "
+          f"({contains_seconds / mask_seconds:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(float(arg)) for arg in sys.argv[1:2]))
@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from fixture_server import build_fixture_site
+from new import parse_candidate_data, parse_eci_data
+
+
+def bs4_candidate_data(content, party_name):
+    # The html.parser row loop the scrapers used before html_tables.py.
+    soup = BeautifulSoup(content, 'html.parser')
+    table = soup.find('table', class_='table-striped')
+    data = []
+    for row in table.find_all('tr')[1:]:
+        cols = row.find_all('td')
+        if len(cols) >= 5:
+            total_votes = cols[3].text.strip().replace(',', '')
+            margin = cols[4].text.strip().replace(',', '')
+            data.append({
+                'Serial Number': cols[0].text.strip(),
+                'Constituency': cols[1].text.strip(),
+                'Winning Candidate': cols[2].text.strip(),
+                'Total Votes': int(total_votes) if total_votes != '-' else 0,
+                'Margin': int(margin) if margin != '-' else 0,
+                'Party': party_name
+            })
+    return pd.DataFrame(data)
+
+
+def bs4_eci_data(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    table = soup.find('table', class_='table')
+    data = []
+    for row in table.find_all('tr')[1:]:
+        cols = row.find_all('td')
+        if len(cols) == 4:
+            data.append({
+                'Party': cols[0].text.strip(),
+                'Won': int(cols[1].text.strip()),
+                'Leading': int(cols[2].text.strip()),
+                'Total': int(cols[3].text.strip()),
+                'Link': cols[1].find('a')['href']
+            })
+    return pd.DataFrame(data)
+
+
+def same_values(reference, df):
+    # html_tables returns the snapshot dtypes (int32 party counts); only values must match.
+    return reference.columns.equals(df.columns) and reference.astype(str).equals(df.astype(str))
+
+
+def load_pages(site_dir):
+    with open(os.path.join(site_dir, 'index.htm'), 'rb') as f:
+        index_page = f.read()
+    parties = parse_eci_data(index_page)
+    party_pages = []
+    for _, row in parties.iterrows():
+        with open(os.path.join(site_dir, row['Link']), 'rb') as f:
+            party_pages.append((f.read(), row['Party']))
+    return index_page, party_pages
+
+
+def time_refresh(parse_index, parse_party, index_page, party_pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_index(index_page)
+        for content, party in party_pages:
+            parse_party(content, party)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(site_dir=None, repeat=5):
+    if site_dir is None:
+        site_dir = build_fixture_site(tempfile.mkdtemp(prefix='eci_fixtures_'))
+    index_page, party_pages = load_pages(site_dir)
+
+    for content, party in party_pages:
+        assert same_values(bs4_candidate_data(content, party), parse_candidate_data(content, party))
+    assert same_values(bs4_eci_data(index_page), parse_eci_data(index_page))
+
+    baseline = time_refresh(bs4_eci_data, bs4_candidate_data, index_page, party_pages, repeat)
+    fast = time_refresh(parse_eci_data, parse_candidate_data, index_page, party_pages, repeat)
+    print(f"pages per refresh: {len(party_pages) + 1}")
+    print(f"BeautifulSoup html.parser: {baseline * 1000:.1f} ms")
+    print(f"html_tables (lxml):        {fast * 1000:.1f} ms")
+    print(f"speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
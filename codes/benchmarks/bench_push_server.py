@@ -0,0 +1,227 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from fixture_server import DATASETS_DIR, build_fixture_site, render_index_page, render_party_page, serve_fixtures
+
+# Load test for push_server.py: the push server runs in its own process against the local
+# stand-in for the ECI site, thousands of SSE and WebSocket clients connect from this one,
+# plus a few that never read. Every interval a handful of seats change hands on the stand-in
+# pages; each client timestamps the deltas it receives, so the report shows how long a tick
+# takes to reach every client and whether stalled clients held the others back.
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'push_server.py')
+
+
+class CountingSite:
+    # The fixture site, with seats moved between parties: one candidate row changes party
+    # and both parties' index counts follow, so every tick changes seats and candidate insights.
+    def __init__(self, root, seed=0):
+        self.site_dir = build_fixture_site(root)
+        self.parties = pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv'))
+        self.candidates = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+        self.rng = random.Random(seed)
+
+    def write(self, name, html):
+        # Written aside and renamed, so the fixture server never serves a half-written page.
+        path = os.path.join(self.site_dir, name)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(path + '.tmp', path)
+
+    def move_seats(self, seats):
+        for _ in range(seats):
+            row = self.rng.choice(list(self.candidates.index))
+            losing = self.candidates.at[row, 'Party']
+            gaining = self.rng.choice([party for party in self.parties['Party'] if party != losing])
+            self.candidates.at[row, 'Party'] = gaining
+            for party, step in ((losing, -1), (gaining, 1)):
+                at = self.parties['Party'] == party
+                self.parties.loc[at, ['Won', 'Total']] += step
+                link = self.parties.loc[at, 'Link'].iloc[0]
+                self.write(link, render_party_page(self.candidates[self.candidates['Party'] == party]))
+        self.write('index.htm', render_index_page(self.parties))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get_json(port, path):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=10) as response:
+        return json.loads(response.read())
+
+
+async def sse_client(port, deltas):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n')
+    await reader.readuntil(b'\r\n\r\n')
+    try:
+        while True:
+            block = await reader.readuntil(b'\n\n')
+            if block.startswith(b'event: delta\n'):
+                received = time.time()
+                event = json.loads(block[len(b'event: delta\ndata: '):])
+                deltas.append((event['tick'], received - event['published_at']))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def ws_client(port, deltas):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                 b'Sec-WebSocket-Key: ' + os.urandom(16).hex()[:24].encode() + b'\r\nSec-WebSocket-Version: 13\r\n\r\n')
+    await reader.readuntil(b'\r\n\r\n')
+    try:
+        while True:
+            first, second = await reader.readexactly(2)
+            n = second & 0x7f
+            if n == 126:
+                n = int.from_bytes(await reader.readexactly(2), 'big')
+            elif n == 127:
+                n = int.from_bytes(await reader.readexactly(8), 'big')
+            payload = await reader.readexactly(n)
+            if first & 0x0f == 0x1 and payload.startswith(b'{"event":"delta"'):
+                received = time.time()
+                event = json.loads(payload)['data']
+                deltas.append((event['tick'], received - event['published_at']))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def stalled_client(port):
+    # Subscribes with a tiny receive buffer and never reads: a dashboard on a dead link.
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(('127.0.0.1', port))
+    sock.sendall(b'GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n')
+    return sock
+
+
+async def connect_all(port, sse, ws, concurrency=200):
+    # Connections opened a batch at a time so the listen backlog never overflows.
+    gate = asyncio.Semaphore(concurrency)
+    clients = []
+
+    async def connect(client):
+        deltas = []
+        async with gate:
+            task = asyncio.create_task(client(port, deltas))
+            await asyncio.sleep(0)
+        clients.append((task, deltas))
+
+    await asyncio.gather(*(connect(sse_client) for _ in range(sse)), *(connect(ws_client) for _ in range(ws)))
+    return clients
+
+
+async def wait_for_clients(port, count, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = await asyncio.to_thread(get_json, port, '/stats')
+        if stats['clients'] >= count:
+            return stats
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"only {stats['clients']} of {count} clients connected")
+
+
+async def run(sse, ws, stalled, ticks, interval, seats):
+    root = tempfile.mkdtemp(prefix='push_bench_')
+    site = CountingSite(root)
+    fixtures, base_url = serve_fixtures(root)
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, SERVER_PATH, '--base-url', base_url, '--port', str(port), '--interval', str(interval),
+         '--heartbeat', '5', '--send-timeout', str(4 * interval), '--write-buffer', '8192',
+         '--insights', os.path.join(root, 'election_insights.txt'),
+         '--changelog', os.path.join(root, 'live_changelog.jsonl')],
+        stdout=subprocess.DEVNULL, cwd=root)
+    try:
+        # The first tick scrapes every party page; clients join once there is a snapshot.
+        while True:
+            await asyncio.sleep(0.5)
+            try:
+                if (await asyncio.to_thread(get_json, port, '/stats'))['ticks']:
+                    break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("push server exited")
+
+        started = time.perf_counter()
+        clients = await connect_all(port, sse, ws)
+        stuck = [stalled_client(port) for _ in range(stalled)]
+        await wait_for_clients(port, sse + ws + stalled)
+        connect_seconds = time.perf_counter() - started
+        first_tick = (await asyncio.to_thread(get_json, port, '/state'))['tick']
+
+        for _ in range(ticks):
+            await asyncio.to_thread(site.move_seats, seats)
+            await asyncio.sleep(interval)
+        await asyncio.sleep(2 * interval)
+        stats = await asyncio.to_thread(get_json, port, '/stats')
+    finally:
+        server.terminate()
+        server.wait()
+        fixtures.shutdown()
+
+    for task, _ in clients:
+        task.cancel()
+    for sock in stuck:
+        sock.close()
+
+    latencies = {}
+    for _, deltas in clients:
+        for tick, latency in deltas:
+            if tick > first_tick:
+                latencies.setdefault(tick, []).append(latency)
+    return connect_seconds, latencies, stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test the live push server against the local ECI stand-in.")
+    parser.add_argument('--sse', type=int, default=2000, help="SSE clients")
+    parser.add_argument('--ws', type=int, default=500, help="WebSocket clients")
+    parser.add_argument('--stalled', type=int, default=20, help="clients that never read")
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=3, help="seconds between polls and seat changes")
+    parser.add_argument('--seats', type=int, default=3, help="seats that change hands per tick")
+    args = parser.parse_args()
+
+    connect_seconds, latencies, stats = asyncio.run(
+        run(args.sse, args.ws, args.stalled, args.ticks, args.interval, args.seats))
+    clients = args.sse + args.ws
+    print(f"clients: {clients} ({args.sse} SSE, {args.ws} WebSocket) + {args.stalled} stalled, "
+          f"connected in {connect_seconds:.2f}s")
+    print(f"{'tick':>5s} {'delivered':>10s} {'p50 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+    for tick in sorted(latencies):
+        values = sorted(latencies[tick])
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        print(f"{tick:5d} {len(values):5d}/{clients:<4d} {statistics.median(values) * 1e3:8.1f} "
+              f"{p99 * 1e3:8.1f} {values[-1] * 1e3:8.1f}")
+    fan_out = stats['sent_bytes'] / stats['encoded_bytes'] if stats['encoded_bytes'] else 0
+    print(f"published {stats['published']} of {stats['ticks']} ticks, {stats['encoded_bytes'] / 1e3:.1f} kB encoded, "
+          f"{stats['sent_bytes'] / 1e6:.1f} MB sent ({fan_out:.0f}x fan-out)")
+    print(f"resyncs: {stats['resyncs']}  dropped: {stats['dropped']}  server peak RSS: {stats['peak_rss_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
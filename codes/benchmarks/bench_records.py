@@ -0,0 +1,102 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from bench_suite import synthetic_candidates
+from html_tables import parse_int_column
+from records import CandidateRecords
+
+
+def scraped_pages(rows, seats=4000):
+    # Party pages as the scraper sees them: per party, one list of cell texts per column.
+    # A million candidate rows means many candidates (elections, booths) per constituency.
+    df = synthetic_candidates(rows)
+    seat = df['Serial Number'] % seats
+    df['Constituency'] = 'Seat ' + seat.astype(str) + '(' + (seat % 80 + 1).astype(str) + ')'
+    df['Total Votes'] = df['Total Votes'].map('{:,}'.format)
+    df['Margin'] = df['Margin'].map('{:,}'.format)
+    return [(party, [page[column].astype(str).tolist() for column in
+                     ('Serial Number', 'Constituency', 'Winning Candidate', 'Total Votes', 'Margin')])
+            for party, page in df.groupby('Party', sort=False)]
+
+
+def dict_rows(pages):
+    # The original scrapers: one dict per row, then an object-dtype frame.
+    data = []
+    for party, (serial, constituency, candidate, total_votes, margin) in pages:
+        for row in zip(serial, constituency, candidate, total_votes, margin):
+            data.append({
+                'Serial Number': row[0],
+                'Constituency': row[1],
+                'Winning Candidate': row[2],
+                'Total Votes': int(row[3].replace(',', '')),
+                'Margin': int(row[4].replace(',', '')),
+                'Party': party,
+            })
+    return pd.DataFrame(data).astype({'Constituency': object, 'Winning Candidate': object, 'Party': object})
+
+
+def frame_concat(pages):
+    # Column lists per page, one object frame each, concatenated.
+    frames = [pd.DataFrame({
+        'Serial Number': serial,
+        'Constituency': constituency,
+        'Winning Candidate': candidate,
+        'Total Votes': parse_int_column(total_votes),
+        'Margin': parse_int_column(margin),
+        'Party': party,
+    }).astype({'Serial Number': object, 'Constituency': object, 'Winning Candidate': object, 'Party': object})
+        for party, (serial, constituency, candidate, total_votes, margin) in pages]
+    return pd.concat(frames, ignore_index=True)
+
+
+def compact_records(pages):
+    records = CandidateRecords()
+    for party, (serial, constituency, candidate, total_votes, margin) in pages:
+        records.extend(party, serial, constituency, candidate, parse_int_column(total_votes),
+                       parse_int_column(margin))
+    return records.to_frame()
+
+
+def measure(build, pages):
+    gc.collect()
+    start = time.perf_counter()
+    df = build(pages)
+    seconds = time.perf_counter() - start
+    resident = df.memory_usage(deep=True).sum()
+    del df
+    gc.collect()
+    tracemalloc.start()
+    build(pages)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, resident, peak
+
+
+def main(rows=1_000_000):
+    pages = scraped_pages(rows)
+    reference = dict_rows(pages)
+    compact = compact_records(pages)
+    assert reference.astype(str).equals(compact.astype(str))
+    del reference, compact
+
+    print(f"rows: {rows:,}  parties: {len(pages)}")
+    print(f"{'':24s} {'build s':>8s} {'frame MB':>9s} {'peak MB':>8s}")
+    results = {}
+    for name, build in (('dict per row', dict_rows), ('object frames + concat', frame_concat),
+                        ('CandidateRecords', compact_records)):
+        results[name] = seconds, resident, peak = measure(build, pages)
+        print(f"{name:24s} {seconds:8.2f} {resident / 1e6:9.1f} {peak / 1e6:8.1f}")
+    baseline = results['dict per row']
+    compact = results['CandidateRecords']
+    print(f"frame memory: {baseline[1] / compact[1]:.1f}x smaller, build peak: {baseline[2] / compact[2]:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main(*(int(float(arg)) for arg in sys.argv[1:2]))
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import new
+from analyze_data import analyze_data
+from bench_analyze_data import synthetic_results
+from charts import ChartRenderer
+from fixture_server import DATASETS_DIR
+from generate_report import generate_constituency_reports, generate_report
+from process_data import peak_rss_mb
+
+
+def render_charts(out_dir):
+    df = pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv'))
+    candidate_df = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+    charts = ChartRenderer(out_dir)
+    new.election_insights(df, candidate_df, charts)
+    charts.flush()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        render_charts(tmp)
+        results = synthetic_results(8000, elections=(2024,))
+        results = results[results['Constituency'].cat.codes < 543]
+        insights = analyze_data(results)
+
+        start = time.perf_counter()
+        pages = generate_report(insights, os.path.join(tmp, 'election_report.pdf'), chart_dir=tmp)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(os.path.join(tmp, 'election_report.pdf')) / 1024
+        print(f"summary report: {pages} pages in {elapsed:.2f} s ({pages / elapsed:.1f} pages/s), {size:.0f} KB")
+
+        # Peak RSS after the first few reports against after all of them: a streaming writer
+        # should leave the second no higher than the first.
+        first = results[results['Constituency'].cat.codes < 10]
+        generate_constituency_reports(first, os.path.join(tmp, 'warmup'))
+        warm_rss = peak_rss_mb()
+
+        seats = results['Constituency'].nunique()
+        start = time.perf_counter()
+        pages = generate_constituency_reports(results, os.path.join(tmp, 'constituencies'))
+        elapsed = time.perf_counter() - start
+        print(f"{seats} constituency reports: {pages} pages in {elapsed:.2f} s ({pages / elapsed:.1f} pages/s)")
+        print(f"peak RSS after 10 reports {warm_rss:.0f} MB, after {seats}: {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
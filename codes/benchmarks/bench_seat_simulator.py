@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from fixture_server import DATASETS_DIR
+from process_data import peak_rss_mb
+from seat_simulator import CHALLENGER, simulate
+
+TOP_PARTIES = ['Bharatiya Janata Party - BJP', 'Indian National Congress - INC']
+
+
+def two_party_results(candidate_df):
+    # Full results with BJP running second wherever it did not win and INC wherever it did,
+    # trailing by the winner's margin: the shape of the national contest, for the runner-ups.
+    rival = np.where(candidate_df['Party'] == TOP_PARTIES[0], TOP_PARTIES[1], TOP_PARTIES[0])
+    winners = pd.DataFrame({'Constituency': candidate_df['Constituency'], 'Party': candidate_df['Party'],
+                            'Votes': candidate_df['Total Votes']})
+    runners_up = pd.DataFrame({'Constituency': candidate_df['Constituency'], 'Party': rival,
+                               'Votes': candidate_df['Total Votes'] - candidate_df['Margin']})
+    return pd.concat([winners, runners_up], ignore_index=True)
+
+
+def check_model(candidate_df, results_df):
+    # No swing at all: every seat stays with its winner.
+    still = simulate(candidate_df, 1_000, 0.0, 0.0, 0.0, results_df=results_df, workers=1, power_samples=0)
+    assert (still.seats['Mean Seats'] == still.seats['Base Seats']).all()
+    # Swings centred on zero move seats both ways between named parties, so the largest party
+    # can reach the majority it lacks and some party ends up above its base.
+    projection = simulate(candidate_df, 20_000, results_df=results_df, workers=1, power_samples=0)
+    assert projection.majority_probability > 0 and projection.any_majority_probability > 0
+    assert (projection.seats['Mean Seats'] > projection.seats['Base Seats']).any()
+    # Without runner-ups flipped seats are pooled, and the pool is no party.
+    pooled = simulate(candidate_df, 1_000, workers=1, power_samples=10)
+    assert CHALLENGER not in set(pooled.seats['Party']) | set(pooled.kingmakers['Party'])
+    print(f"zero-centred swing with named runner-ups: P(majority)={projection.majority_probability:.3f}")
+
+
+def timed(candidate_df, trials, **kwargs):
+    start = time.perf_counter()
+    projection = simulate(candidate_df, trials, **kwargs)
+    return projection, time.perf_counter() - start
+
+
+def main(trials=500_000):
+    candidate_df = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+    regions = np.random.default_rng(0).integers(0, 36, size=len(candidate_df))
+    results_df = two_party_results(candidate_df)
+    check_model(candidate_df, results_df)
+
+    # Same seed and chunking on one or several processes: the projection must not change.
+    reference, _ = timed(candidate_df, 50_000, chunk_trials=10_000, workers=1, power_samples=0,
+                         results_df=results_df)
+    projection, _ = timed(candidate_df, 50_000, chunk_trials=10_000, workers=2, power_samples=0,
+                          results_df=results_df)
+    assert projection.seats.equals(reference.seats)
+
+    for label, kwargs in [('uniform swing', {}), ('uniform + 36 regions', {'regions': regions})]:
+        for workers in sorted({1, os.cpu_count() or 1}):
+            projection, elapsed = timed(candidate_df, trials, workers=workers, power_samples=0,
+                                        memory_limit_mb=128, results_df=results_df, **kwargs)
+            print(f"{label:22s} workers={workers}: {trials:,} trials in {elapsed:5.2f} s "
+                  f"({trials / elapsed:9,.0f} trials/s), P(majority)={projection.majority_probability:.3f}")
+
+    _, elapsed = timed(candidate_df, 20_000, workers=1, power_samples=500, results_df=results_df)
+    print(f"with 500 Banzhaf samples: 20,000 trials in {elapsed:.2f} s")
+    print(f"peak RSS {peak_rss_mb():.0f} MB (chunks capped at 128 MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import time
+
+CODES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOAD = ("import pandas as pd; "
+        "df = pd.read_csv('../datasets/parties_data.csv'); "
+        "candidate_df = pd.read_csv('../datasets/candidate_data.csv'); ")
+
+SCENARIOS = {
+    # Pure compute layer: pandas only.
+    'compute only': (
+        "import compute_insights as c; " + LOAD +
+        "c.forming_government(df).summary(); c.potential_kingmakers(df).summary(); "
+        "c.top_5_candidates_by_votes_top_10_parties(df, candidate_df).summary()"),
+    # What a caller paid before the split: new.py pulled in pyplot at import time.
+    'new.py + matplotlib': (
+        "import matplotlib.pyplot; import new; " + LOAD +
+        "import compute_insights as c; c.forming_government(df).summary(); "
+        "c.potential_kingmakers(df).summary(); "
+        "c.top_5_candidates_by_votes_top_10_parties(df, candidate_df).summary()"),
+}
+
+
+def time_scenario(code, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=CODES_DIR, check=True,
+                       env=dict(os.environ, MPLBACKEND='Agg'))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeat=5):
+    results = {name: time_scenario(code, repeat) for name, code in SCENARIOS.items()}
+    for name, elapsed in results.items():
+        print(f"{name:22s} {elapsed * 1000:7.0f} ms")
+    print(f"compute-only speedup: {results['new.py + matplotlib'] / results['compute only']:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
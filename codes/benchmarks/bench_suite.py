@@ -0,0 +1,220 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import compute_insights
+import instrumentation
+from analyze_data import analyze_data
+from candidate_index import CandidateIndex
+from fixture_server import ELECTION_PATH, build_fixture_site, serve_fixtures
+from new import parse_candidate_data, parse_eci_data, scrape_all_candidates, scrape_eci_data
+from process_data import clean_data_chunked
+
+# End-to-end stage timings over replayed ECI pages and synthetic datasets of any size, saved
+# as an instrumentation run report (stage names carry the row count, e.g. 'results.clean@100000')
+# so two runs compare stage by stage (best of the repeats) against the tolerances in thresholds.json.
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds.json')
+GENERATE_CHUNK_ROWS = 1_000_000
+CLEAN_CHUNK_ROWS = 500_000
+
+
+def party_names(parties):
+    # Named like the ECI index ("Name - ABBR"), with the independents the insights filter on.
+    return [f"Party {i} - P{i}" for i in range(parties - 1)] + ['Independent - IND']
+
+
+def synthetic_candidates(rows, start=0, parties=60, seed=0):
+    # Winners table in candidate_data.csv's schema for seats start .. start + rows; party sizes
+    # fall off like the real result (a few large parties, a long tail of one-seat ones).
+    rng = np.random.default_rng([seed, start])
+    weights = 1 / np.arange(1, parties + 1)
+    serial = pd.Series(np.arange(start + 1, start + rows + 1))
+    votes = rng.integers(200_000, 1_200_000, size=rows)
+    return pd.DataFrame({
+        'Serial Number': serial,
+        'Constituency': 'Seat ' + serial.astype(str) + '(' + (serial % 80 + 1).astype(str) + ')',
+        'Winning Candidate': 'CANDIDATE ' + serial.astype(str),
+        'Total Votes': votes,
+        'Margin': rng.integers(1, np.minimum(votes // 2, 400_000)),
+        'Party': rng.choice(party_names(parties), size=rows, p=weights / weights.sum()),
+    })
+
+
+def synthetic_booth_results(rows, start=0, parties=60, candidates=10, seed=0):
+    # All-candidate results in election_results.csv's schema, candidates rows per constituency,
+    # standing in for booth-level returns at large row counts.
+    rng = np.random.default_rng([seed, start])
+    position = np.arange(start, start + rows)
+    seat = pd.Series(position // candidates)
+    return pd.DataFrame({
+        'Constituency': 'Seat ' + seat.astype(str) + '(' + (seat % 80 + 1).astype(str) + ')',
+        'Candidate': 'CANDIDATE ' + pd.Series(position).astype(str),
+        'Party': rng.choice(party_names(parties), size=rows),
+        'Votes': rng.integers(100, 1_000_000, size=rows),
+    })
+
+
+def write_synthetic_csv(path, generator, rows, chunk_rows=GENERATE_CHUNK_ROWS):
+    # Written chunk by chunk, so 10^8 rows never need to be in memory at once.
+    for start in range(0, rows, chunk_rows):
+        chunk = generator(min(chunk_rows, rows - start), start)
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return path
+
+
+def parties_from_candidates(candidate_df):
+    # The party-wise index table the insights read, derived from a winners table.
+    won = candidate_df['Party'].value_counts()
+    return pd.DataFrame({'Party': won.index, 'Won': won.to_numpy(), 'Leading': 0, 'Total': won.to_numpy()})
+
+
+def candidate_insights(candidate_df):
+    parties = parties_from_candidates(candidate_df)
+    return [
+        compute_insights.party_size_distribution(parties),
+        compute_insights.forming_government(parties),
+        compute_insights.election_closeness(parties),
+        compute_insights.potential_kingmakers(parties),
+        compute_insights.independent_candidates_won(parties),
+        compute_insights.top_5_candidates_by_votes_top_10_parties(parties, candidate_df),
+        compute_insights.least_5_candidates_by_votes_top_10_parties(parties, candidate_df),
+    ]
+
+
+def load_pages(site_dir):
+    with open(os.path.join(site_dir, 'index.htm'), 'rb') as f:
+        index_page = f.read()
+    party_pages = []
+    for _, row in parse_eci_data(index_page).iterrows():
+        with open(os.path.join(site_dir, row['Link']), 'rb') as f:
+            party_pages.append((f.read(), row['Party']))
+    return index_page, party_pages
+
+
+def bench_fixtures(fixture_root, repeat):
+    # A full refresh (index plus every party page) over HTTP from the local stand-in server,
+    # then the same pages parsed straight from disk.
+    server, base_url = serve_fixtures(fixture_root)
+    try:
+        for _ in range(repeat):
+            with instrumentation.stage('fixtures.scrape'), contextlib.redirect_stdout(io.StringIO()):
+                scrape_all_candidates(scrape_eci_data(f"{base_url}index.htm"), base_url, rate_limit=0)
+    finally:
+        server.shutdown()
+
+    index_page, party_pages = load_pages(os.path.join(fixture_root, ELECTION_PATH))
+    for _ in range(repeat):
+        with instrumentation.stage('fixtures.parse', len(index_page) + sum(len(page) for page, _ in party_pages)):
+            parse_eci_data(index_page)
+            for content, party in party_pages:
+                parse_candidate_data(content, party)
+
+
+def bench_candidates(rows, work_dir, repeat, in_memory):
+    path = os.path.join(work_dir, f'candidate_data_{rows}.csv')
+    with instrumentation.stage(f'candidates.generate@{rows}'):
+        write_synthetic_csv(path, synthetic_candidates, rows)
+    if not in_memory:
+        return
+    for _ in range(repeat):
+        with instrumentation.stage(f'candidates.load@{rows}', os.path.getsize(path)):
+            candidate_df = pd.read_csv(path)
+    for _ in range(repeat):
+        with instrumentation.stage(f'candidates.insights@{rows}'):
+            candidate_insights(candidate_df)
+    for _ in range(repeat):
+        with instrumentation.stage(f'candidates.index@{rows}'):
+            CandidateIndex(candidate_df).top_k(10)
+
+
+def bench_results(rows, work_dir, repeat, in_memory):
+    path = os.path.join(work_dir, f'election_results_{rows}.csv')
+    with instrumentation.stage(f'results.generate@{rows}'):
+        write_synthetic_csv(path, synthetic_booth_results, rows)
+    for _ in range(repeat):
+        # Streams at any size, so this is the one results stage that runs for 10^8 rows. Fixed
+        # chunks and no ceiling: peak RSS is process-wide and earlier stages already raised it.
+        with instrumentation.stage(f'results.clean@{rows}', os.path.getsize(path)):
+            clean_data_chunked(path, memory_limit_mb=float('inf'), chunk_rows=CLEAN_CHUNK_ROWS)
+    if not in_memory:
+        return
+    results_df = pd.read_csv(path)
+    for _ in range(repeat):
+        with instrumentation.stage(f'results.analyze@{rows}'):
+            analyze_data(results_df)
+
+
+def run_suite(sizes, repeat=3, fixture_root=None, work_dir=None, max_in_memory=10_000_000):
+    if fixture_root is None:
+        fixture_root = tempfile.mkdtemp(prefix='eci_fixtures_')
+        build_fixture_site(fixture_root)
+    work_dir = work_dir or tempfile.mkdtemp(prefix='bench_suite_')
+    run = instrumentation.Instrumentation()
+    with instrumentation.activate(run):
+        bench_fixtures(fixture_root, repeat)
+        for rows in sizes:
+            bench_candidates(rows, work_dir, repeat, rows <= max_in_memory)
+            bench_results(rows, work_dir, repeat, rows <= max_in_memory)
+    report = run.report()
+    # fixtures.scrape's requests are recorded per URL on a random port; only the stages compare.
+    report.pop('urls')
+    report['meta'] = {'sizes': sizes, 'repeat': repeat, 'python': platform.python_version(),
+                      'pandas': pd.__version__, 'numpy': np.__version__, 'cpus': os.cpu_count()}
+    return report
+
+
+def stage_tolerances(report, thresholds):
+    # thresholds['stages'] is keyed by stage without its row count.
+    return {name: thresholds['stages'][name.split('@')[0]] for name in report['stages']
+            if name.split('@')[0] in thresholds.get('stages', {})}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time every stage on replayed ECI pages and synthetic data.")
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e4, 1e5, 1e6],
+                        help="dataset rows, 1e3 .. 1e8")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--fixtures', help="directory of recorded pages (fixture_server.py --record)")
+    parser.add_argument('--work-dir', help="where the synthetic CSVs are written (default: a temporary dir)")
+    parser.add_argument('--max-in-memory', type=float, default=1e7,
+                        help="largest size the load/insights/index/analyze stages run at")
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--baseline', help="earlier --out to compare against; regressions exit non-zero")
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH)
+    args = parser.parse_args()
+
+    report = run_suite([int(rows) for rows in args.sizes], args.repeat, args.fixtures, args.work_dir,
+                       int(args.max_in_memory))
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name, entry in report['stages'].items():
+        print(f"{name:32s} {entry['min_seconds']:10.4f}s  raised peak RSS by {entry['peak_rss_growth_mb']:8.1f} MB")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.thresholds) as f:
+            thresholds = json.load(f)
+        regressions = instrumentation.compare_reports(baseline, report, thresholds['tolerance'],
+                                                      thresholds['min_seconds'], stage_tolerances(report, thresholds),
+                                                      measure='min_seconds')
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.3f}s -> {after:.3f}s")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
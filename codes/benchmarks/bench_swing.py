@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from entities import EntityIndex
+from swing import SwingEngine, vote_share_swing
+
+ELECTIONS = (2014, 2019, 2024)
+
+
+def synthetic_history(seats, parties=40, states=36, seed=0):
+    # Winners tables for the same seats in each election, ~20% of seats changing hands.
+    rng = np.random.default_rng(seed)
+    party_names = np.array([f"Party {i}" for i in range(parties)])
+    state = rng.integers(0, states, size=seats)
+    winner = rng.integers(0, parties, size=seats)
+    frames = []
+    for election in ELECTIONS:
+        flips = rng.random(seats) < 0.2
+        winner = np.where(flips, rng.integers(0, parties, size=seats), winner)
+        frames.append(pd.DataFrame({
+            'Election': election,
+            'State': [f"State {i}" for i in state],
+            'Constituency': [f"Seat {i}({i % 80 + 1})" for i in range(seats)],
+            'Winning Candidate': [f"Candidate {election}-{i}" for i in range(seats)],
+            'Total Votes': rng.integers(200_000, 1_200_000, size=seats),
+            'Margin': rng.integers(1, 400_000, size=seats),
+            'Party': party_names[winner],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def pandas_swing(history, before, after, state=None, party=None):
+    # The merge-per-query approach: filter both elections, join on constituency, compare.
+    left = history[history['Election'] == before]
+    right = history[history['Election'] == after]
+    merged = left.merge(right, on=['State', 'Constituency'], suffixes=(' Before', ' After'))
+    if state is not None:
+        merged = merged[merged['State'] == state]
+    if party is not None:
+        merged = merged[(merged['Party Before'] == party) | (merged['Party After'] == party)]
+    merged['Flipped'] = merged['Party Before'] != merged['Party After']
+    merged['Margin Change'] = merged['Margin After'] - merged['Margin Before']
+    return merged
+
+
+def synthetic_results(seats, candidates=8, parties=40, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = seats * candidates
+    return pd.DataFrame({
+        'Election': np.repeat(ELECTIONS, rows),
+        'Constituency': np.tile(np.repeat([f"Seat {i}" for i in range(seats)], candidates), len(ELECTIONS)),
+        'Party': rng.choice([f"Party {i}" for i in range(parties)], size=rows * len(ELECTIONS)),
+        'Votes': rng.integers(1_000, 600_000, size=rows * len(ELECTIONS)),
+    })
+
+
+def pandas_vote_share_swing(results, before, after):
+    votes = results.groupby(['Election', 'Constituency', 'Party'])['Votes'].sum()
+    shares = votes / votes.groupby(level=['Election', 'Constituency']).transform('sum') * 100
+    table = shares.unstack('Election').reindex(columns=[before, after]).fillna(0)
+    return table[after] - table[before]
+
+
+def best_of(func, *args, repeat=5, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def queries(engine_or_history, run):
+    for state in ("State 1", "State 2", "State 3"):
+        for party in ("Party 0", "Party 1", None):
+            run(engine_or_history, 2019, 2024, state=state, party=party)
+
+
+def check_same_named_seats():
+    # 2014 and 2019 pages name both Aurangabads and both Hamirpurs bare; within their States
+    # they must stay four seats and line up with 2024's numbered names.
+    seats = [('Bihar', 'Aurangabad', 'Aurangabad(37)'), ('Maharashtra', 'Aurangabad', 'Aurangabad(19)'),
+             ('Himachal Pradesh', 'Hamirpur', 'HAMIRPUR(3)'), ('Uttar Pradesh', 'Hamirpur', 'Hamirpur(47)')]
+    history = pd.DataFrame([
+        {'Election': election, 'State': state, 'Constituency': name if election < 2024 else numbered,
+         'Winning Candidate': f"Candidate {election}-{i}", 'Total Votes': 400_000 + i, 'Margin': 1_000 + i,
+         'Party': f"Party {i}" if election < 2024 else f"Party {(i + 1) % 4}"}
+        for election in ELECTIONS for i, (state, name, numbered) in enumerate(seats)])
+    engine = SwingEngine(history, EntityIndex.seeded(os.path.join(tempfile.mkdtemp(), 'entities.json')))
+    swing = engine.swing(2014, 2019)
+    assert len(swing) == 4 and sorted(swing['State']) == sorted(state for state, _, _ in seats)
+    assert engine.swing(2019, 2024)['Flipped'].sum() == 4
+    assert engine.party_swing(2014, 2019)['Seats 2019'].sum() == 4
+    try:
+        SwingEngine(history.drop(columns='State'), engine.entities)
+    except Exception as e:
+        assert 'Aurangabad' in str(e)
+    else:
+        raise AssertionError("bare shared names without a State were accepted")
+
+
+def main():
+    check_same_named_seats()
+    for seats in (543, 10_000, 100_000):
+        history = synthetic_history(seats)
+        start = time.perf_counter()
+        engine = SwingEngine(history)
+        build = time.perf_counter() - start
+
+        merged = pandas_swing(history, 2019, 2024)
+        assert engine.swing(2019, 2024)['Flipped'].sum() == merged['Flipped'].sum()
+
+        pandas_time = best_of(queries, history, pandas_swing)
+        engine_time = best_of(queries, engine, SwingEngine.swing)
+        print(f"{seats:7d} seats: build {build * 1000:7.1f} ms | 9 sliced swing queries: pandas merge "
+              f"{pandas_time * 1000:8.1f} ms, engine {engine_time * 1000:6.1f} ms ({pandas_time / engine_time:5.1f}x)")
+
+    for seats in (543, 10_000):
+        results = synthetic_results(seats)
+        pandas_time = best_of(pandas_vote_share_swing, results, 2019, 2024, repeat=3)
+        vectorized = best_of(vote_share_swing, results, 2019, 2024, repeat=3)
+        print(f"{seats:7d} seats x 8 candidates: vote share swing pandas {pandas_time * 1000:7.1f} ms, "
+              f"bincount {vectorized * 1000:7.1f} ms ({pandas_time / vectorized:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from analyze_data import rank_within_groups
+from entities import ConstituencyTable, normalize
+
+SORT_COLUMNS = ('Total Votes', 'Margin')
+
+
+class CandidateIndex:
+    # Party-partitioned, presorted row positions over candidate_df. Each sort column is
+    # ordered once by (party, value) both ways and globally both ways, so top-k and bottom-k
+    # are slice heads and value ranges are binary searches. Ties keep frame order, matching
+    # nlargest()/nsmallest(). states (Constituency, State) adds a State column to key on when
+    # candidate_df has none.
+    def __init__(self, candidate_df, states=None):
+        self.df = candidate_df.reset_index(drop=True)
+        if states is not None and 'State' not in self.df.columns:
+            mapping = states.drop_duplicates('Constituency').set_index('Constituency')['State']
+            self.df['State'] = self.df['Constituency'].map(mapping)
+        party_codes, self.parties = pd.factorize(self.df['Party'])
+        self.party_lookup = {party: code for code, party in enumerate(self.parties)}
+        counts = np.bincount(party_codes, minlength=len(self.parties))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        self.orders = {}
+        self.sorted_values = {}
+        for column in SORT_COLUMNS:
+            values = self.df[column].to_numpy()
+            party_asc = rank_within_groups(party_codes, -values, len(self.parties))
+            global_asc = np.argsort(values, kind='stable')
+            self.orders[column] = {
+                'party_desc': rank_within_groups(party_codes, values, len(self.parties)),
+                'party_asc': party_asc,
+                'global_desc': np.argsort(-values, kind='stable'),
+                'global_asc': global_asc,
+            }
+            self.sorted_values[column] = {'party_asc': values[party_asc], 'global_asc': values[global_asc]}
+
+        # Constituencies are keyed on name and seat number, since names repeat across states
+        # (Aurangabad(19) and Aurangabad(37)); a bare name finds its seat only when unique.
+        self.constituencies = ConstituencyTable()
+        constituency_codes = self.constituencies.ids(self.df['Constituency'], add=True)
+        self.constituency_order = np.argsort(constituency_codes, kind='stable')
+        self.constituency_offsets = np.concatenate(([0], np.cumsum(np.bincount(
+            constituency_codes[constituency_codes >= 0], minlength=len(self.constituencies)))))
+        self.constituency_order = self.constituency_order[np.count_nonzero(constituency_codes < 0):]
+
+        # Rows of each state by Total Votes, descending; rows without a state are left out.
+        self.states = pd.Index([])
+        if 'State' in self.df.columns:
+            state_codes, self.states = pd.factorize(self.df['State'])
+            self.state_lookup = {normalize(state): code for code, state in enumerate(self.states)}
+            grouped = np.where(state_codes >= 0, state_codes, len(self.states))
+            self.state_order = rank_within_groups(grouped, self.df['Total Votes'].to_numpy(), len(self.states) + 1)
+            self.state_offsets = np.concatenate(([0], np.cumsum(np.bincount(grouped, minlength=len(self.states)))))
+
+    def span(self, party):
+        code = self.party_lookup.get(party)
+        if code is None:
+            return 0, 0
+        return self.offsets[code], self.offsets[code + 1]
+
+    def ordered(self, by, descending, party=None):
+        if party is None:
+            return self.orders[by]['global_desc' if descending else 'global_asc']
+        start, stop = self.span(party)
+        return self.orders[by]['party_desc' if descending else 'party_asc'][start:stop]
+
+    def rows(self, positions):
+        return self.df.iloc[positions]
+
+    def top_k(self, k, party=None, by='Total Votes'):
+        return self.rows(self.ordered(by, True, party)[:k])
+
+    def bottom_k(self, k, party=None, by='Total Votes'):
+        return self.rows(self.ordered(by, False, party)[:k])
+
+    def value_range(self, by, low=None, high=None, party=None):
+        # Rows with low <= value <= high, ascending.
+        if party is None:
+            start, stop = 0, len(self.df)
+            order, values = self.orders[by]['global_asc'], self.sorted_values[by]['global_asc']
+        else:
+            start, stop = self.span(party)
+            order, values = self.orders[by]['party_asc'], self.sorted_values[by]['party_asc']
+        lo = start if low is None else start + np.searchsorted(values[start:stop], low, side='left')
+        hi = stop if high is None else start + np.searchsorted(values[start:stop], high, side='right')
+        return self.rows(order[lo:hi])
+
+    def margin_range(self, low=None, high=None, party=None):
+        return self.value_range('Margin', low, high, party)
+
+    def constituency(self, name):
+        # Accepts the scraped form "Anakapalle(5)" in any case and spacing, or a bare name
+        # that only one seat has.
+        code = self.constituencies.id(name)
+        if code < 0:
+            return self.rows([])
+        start, stop = self.constituency_offsets[code], self.constituency_offsets[code + 1]
+        return self.rows(self.constituency_order[start:stop])
+
+    def state(self, name, k=None):
+        # A state's candidates by Total Votes, highest first (the top k when given).
+        code = self.state_lookup.get(normalize(name)) if len(self.states) else None
+        if code is None:
+            return self.rows([])
+        start, stop = self.state_offsets[code], self.state_offsets[code + 1]
+        return self.rows(self.state_order[start:stop][:k])
+
+    def top_k_by_party(self, parties, k, by='Total Votes', largest=True):
+        select = self.top_k if largest else self.bottom_k
+        return [(party, select(k, party, by)) for party in parties]
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    index = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            frame = self.route(url.path, params)
+        except (KeyError, ValueError) as e:
+            return self.send_json(400, {'error': str(e)})
+        if frame is None:
+            return self.send_json(404, {'error': f"Unknown endpoint: {url.path}"})
+        self.send_json(200, frame.to_dict(orient='records'))
+
+    def route(self, path, params):
+        k = int(params.get('k', 5))
+        by = params.get('by', 'Total Votes')
+        if by not in SORT_COLUMNS:
+            raise ValueError(f"by must be one of {', '.join(SORT_COLUMNS)}")
+        if path == '/top':
+            return self.index.top_k(k, params.get('party'), by)
+        if path == '/bottom':
+            return self.index.bottom_k(k, params.get('party'), by)
+        if path == '/margin':
+            low = int(params['min']) if 'min' in params else None
+            high = int(params['max']) if 'max' in params else None
+            return self.index.margin_range(low, high, params.get('party'))
+        if path == '/constituency':
+            return self.index.constituency(params['name'])
+        if path == '/state':
+            return self.index.state(params['name'], int(params['k']) if 'k' in params else None)
+        return None
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_index(index, host='127.0.0.1', port=8080):
+    handler = type('BoundQueryHandler', (QueryHandler,), {'index': index})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from snapshot_store import load_dataset
+
+    parser = argparse.ArgumentParser(description="Serve top-k / margin / constituency queries over candidate data.")
+    parser.add_argument('--csv', default='../datasets/candidate_data.csv')
+    parser.add_argument('--states', help="CSV mapping Constituency to State, for /state queries")
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    states = pd.read_csv(args.states) if args.states else None
+    server = serve_index(CandidateIndex(load_dataset('candidates', args.csv), states), port=args.port)
+    print(f"Serving candidate queries on http://127.0.0.1:{args.port}/top?party=...&k=5")
+    server.serve_forever()
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+
+MANIFEST_FILE = 'chart_manifest.json'
+
+
+def rotate_labels(ax, labels, fontsize=None):
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=fontsize)
+
+
+def draw_independent_candidates_won(fig, total_independents):
+    ax = fig.add_subplot()
+    bars = ax.bar(['Independent Candidates'], [total_independents])
+    ax.set_title('Number of Independent Candidates Who Won')
+
+    for bar in bars:
+        yval = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2, yval, int(yval), va='bottom', ha='center')
+
+
+def draw_overall_election_statistics(fig, stats, values):
+    ax = fig.add_subplot()
+    bars = ax.bar(stats, values, color='skyblue', edgecolor='black')
+
+    for bar, value in zip(bars, values):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(),
+                f'{value:.2f}' if isinstance(value, float) else f'{value}',
+                ha='center', va='bottom', fontsize=12)
+
+    ax.set_title('Overall Election Statistics', fontsize=16)
+    ax.set_ylabel('Count', fontsize=14)
+
+
+def draw_party_size_distribution(fig, labels, counts):
+    ax = fig.add_subplot()
+    bars = ax.bar(labels, counts, color='skyblue', edgecolor='black')
+
+    for bar in bars:
+        ax.annotate(str(int(bar.get_height())), (bar.get_x() + bar.get_width() / 2., bar.get_height()),
+                    ha='center', va='center', xytext=(0, 10), textcoords='offset points', fontsize=12)
+
+    ax.set_title('Party Size Distribution', fontsize=16)
+    ax.set_xlabel('Number of Seats', fontsize=14)
+    ax.set_ylabel('Number of Parties', fontsize=14)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid(axis='y', linestyle=':', linewidth=0.5)
+
+
+def draw_forming_government(fig, parties, totals, top_party, top_total, majority):
+    ax = fig.add_subplot()
+    bars = ax.bar(parties, totals, color='skyblue', width=0.6, edgecolor='black')
+    ax.bar(top_party, top_total, color='orange', label='Likely to form government', edgecolor='black')
+    ax.axhline(y=majority, color='red', linestyle='--', label='Majority')
+
+    for bar in bars:
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 1,
+                f"{int(bar.get_height())}", ha='center', va='bottom')
+
+    ax.set_ylim(0, max(totals) + 10)  # Increase space above the highest bar
+    ax.set_yticks(range(0, max(totals) + 50, 10))  # Increase y-axis ticks by 10
+
+    ax.set_title('Forming Government Analysis')
+    ax.set_ylabel('Number of Seats')
+    rotate_labels(ax, parties)
+    ax.legend()
+
+
+def draw_election_closeness(fig, parties, totals, difference, closeness_percentage):
+    ax = fig.add_subplot()
+    bars = ax.bar(parties, totals)
+
+    for bar in bars:
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 1,
+                f"{int(bar.get_height())}", ha='center', va='bottom')
+
+    ax.text(0.5, (max(totals) + min(totals)) / 2,
+            f"Difference: {difference} seats\n({closeness_percentage:.2f}%)", ha='center', va='center',
+            bbox=dict(boxstyle="round,pad=0.3", fc="yellow", ec="b", lw=1, alpha=0.5))
+
+    ax.set_title('Election Closeness: Top Two Parties')
+    ax.set_ylabel('Number of Seats')
+    rotate_labels(ax, parties)
+
+
+def draw_potential_kingmakers(fig, parties, totals):
+    ax = fig.add_subplot()
+    bars = ax.bar(parties, totals, color='skyblue')
+
+    fig.suptitle('Potential Kingmakers', fontsize=16)
+    ax.set_title('( Kingmakers are parties with enough seats to influence the formation of a majority coalition )',
+                 fontsize=14)
+    ax.set_ylabel('Number of Seats', fontsize=14)
+    ax.set_xlabel('Party', fontsize=14)
+    rotate_labels(ax, parties, fontsize=12)
+    ax.tick_params(axis='y', labelsize=12)
+
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2.0, height, f'{int(height)}', ha='center', va='bottom', fontsize=12)
+
+
+def draw_candidates_by_votes(fig, title, candidates, votes):
+    ax = fig.add_subplot()
+    ax.bar(candidates, votes)
+    ax.set_title(title)
+    ax.set_ylabel("Total Votes")
+    rotate_labels(ax, candidates)
+    for i, v in enumerate(votes):
+        ax.text(i, v, f'{v:,}', ha='center', va='bottom')
+
+
+def draw_candidates_by_votes_per_party(fig, panels):
+    axs = fig.subplots(5, 2).ravel()
+    for ax, (party, candidates, votes) in zip(axs, panels):
+        ax.bar(candidates, votes)
+        ax.set_title(f"{party}")
+        rotate_labels(ax, candidates)
+        ax.set_ylabel('Total Votes')
+        for j, v in enumerate(votes):
+            ax.text(j, v, f'{v:,}', ha='center', va='bottom')
+
+
+# Chart name -> (draw function, figure size). The PNG is written as '<name>.png'.
+CHARTS = {
+    'independent_candidates_won': (draw_independent_candidates_won, (8, 6)),
+    'overall_election_statistics': (draw_overall_election_statistics, (10, 6)),
+    'party_size_distribution': (draw_party_size_distribution, (10, 6)),
+    'forming_government': (draw_forming_government, (18, 12)),
+    'election_closeness': (draw_election_closeness, (10, 6)),
+    'potential_kingmakers': (draw_potential_kingmakers, (14, 8)),
+    'top_5_candidates_by_votes': (draw_candidates_by_votes, (12, 6)),
+    'least_5_candidates_by_votes': (draw_candidates_by_votes, (12, 6)),
+    'top_5_candidates_by_votes_top_10_parties': (draw_candidates_by_votes_per_party, (20, 25)),
+    'least_5_candidates_by_votes_top_10_parties': (draw_candidates_by_votes_per_party, (20, 25)),
+}
+
+
+def chart_hash(name, args):
+    return hashlib.sha256(pickle.dumps((name, args))).hexdigest()
+
+
+def draw_chart(name, args, path):
+    # A pyplot-free Figure is not registered anywhere global, so clearing it and dropping
+    # the reference releases everything it allocated.
+    draw, figsize = CHARTS[name]
+    fig = Figure(figsize=figsize)
+    try:
+        draw(fig, *args)
+        fig.tight_layout()
+        fig.savefig(path)
+    finally:
+        fig.clear()
+    return path
+
+
+class ChartRenderer:
+    # Renders charts into out_dir, skipping any chart whose input hash matches the one
+    # recorded for its PNG on the previous render.
+    def __init__(self, out_dir='.', workers=None):
+        self.out_dir = out_dir
+        self.workers = workers
+        self.manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+        self.jobs = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {}
+
+    def path(self, name):
+        return os.path.join(self.out_dir, f'{name}.png')
+
+    def is_fresh(self, name, digest):
+        return self.manifest.get(name) == digest and os.path.exists(self.path(name))
+
+    def add(self, name, *args):
+        self.jobs[name] = args
+
+    def render(self, name, *args):
+        self.add(name, *args)
+        return self.flush(workers=1)
+
+    def flush(self, workers=None):
+        workers = workers or self.workers or os.cpu_count()
+        pending = {}
+        for name, args in self.jobs.items():
+            digest = chart_hash(name, args)
+            if not self.is_fresh(name, digest):
+                pending[name] = (args, digest)
+        self.jobs = {}
+        if pending:
+            os.makedirs(self.out_dir, exist_ok=True)
+
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                futures = {name: executor.submit(draw_chart, name, args, self.path(name))
+                           for name, (args, _) in pending.items()}
+                for future in futures.values():
+                    future.result()
+        else:
+            for name, (args, _) in pending.items():
+                draw_chart(name, args, self.path(name))
+
+        for name, (_, digest) in pending.items():
+            self.manifest[name] = digest
+        if pending:
+            with open(self.manifest_path, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+        return sorted(pending)
@@ -0,0 +1,207 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from compute_insights import majority_threshold
+
+# Weighted voting over the party seat vector: a coalition wins once its seats reach the
+# quota (the forming_government() majority, 272 for 543 seats). Power indices use the
+# pseudo-polynomial counting DP rather than enumerating subsets, so cost grows with
+# parties x quota instead of 2^parties.
+
+
+def add_party(counts, w, rows):
+    # One DP step in place: every coalition counted so far, with and without a party of w
+    # seats. Rows are updated from the top down so each add reads a row not yet touched by
+    # this party; a single overlapping slice add would make numpy copy the whole table.
+    quota = counts.shape[1]
+    if w < quota:
+        for k in range(rows, 0, -1):
+            counts[k, w:] += counts[k - 1, :quota - w]
+
+
+def coalition_counts(weights, quota):
+    # counts[k, s] = number of k-party coalitions with exactly s seats, for s < quota. Only
+    # rows up to the parties seen so far, and up to the largest k whose k smallest parties
+    # stay below the quota, can be non-zero.
+    counts = np.zeros((len(weights) + 1, quota))
+    counts[0, 0] = 1.0
+    max_rows = int(np.searchsorted(np.cumsum(np.sort(weights)), quota))
+    for j, w in enumerate(weights):
+        add_party(counts, w, min(j + 1, max_rows))
+    return counts
+
+
+def leave_one_out(groups, quota, max_rows):
+    # Yields (w, counts over every coalition without one party of w seats) for each
+    # (w, multiplicity) in groups. Divide and conquer: each half of the groups starts from a
+    # table holding the other half's parties, so every party is added once per level and the
+    # whole costs about log2(len(groups)) full tables. Only additions are involved; undoing a
+    # party's step by subtraction is cheaper but cancels catastrophically once the counts
+    # pass 1e16 (around 60 parties).
+    def extend(counts, seen, parties):
+        counts = counts.copy()
+        for w, m in parties:
+            for _ in range(m):
+                seen += 1
+                add_party(counts, w, min(seen, max_rows))
+        return counts, seen
+
+    empty = np.zeros((max_rows + 1, quota))
+    empty[0, 0] = 1.0
+    stack = [(0, len(groups), empty, 0)]
+    while stack:
+        lo, hi, counts, seen = stack.pop()
+        if hi - lo == 1:
+            w, m = groups[lo]
+            yield w, extend(counts, seen, [(w, m - 1)])[0]
+            continue
+        mid = (lo + hi) // 2
+        stack.append((mid, hi, *extend(counts, seen, groups[lo:mid])))
+        stack.append((lo, mid, *extend(counts, seen, groups[mid:hi])))
+
+
+def swing_counts(weights, quota):
+    # For each party: number of coalitions of the others (by size) that it turns from losing
+    # into winning, i.e. whose seats fall in [quota - w, quota - 1]. Parties with the same
+    # seat count share one table.
+    weights = np.asarray(weights, dtype=np.int64)
+    n = len(weights)
+    swings = np.zeros((n, n))
+    max_rows = int(np.searchsorted(np.cumsum(np.sort(weights)), quota))
+    seats, multiplicity = np.unique(weights, return_counts=True)
+    for w, without in leave_one_out(list(zip(seats.tolist(), multiplicity.tolist())), quota, max_rows):
+        if w <= 0:
+            continue
+        pivotal = without[:n, max(quota - w, 0):].sum(axis=1)
+        swings[weights == w, :len(pivotal)] = pivotal
+    return swings
+
+
+def banzhaf_from_swings(swings):
+    swings = swings.sum(axis=1)
+    total = swings.sum()
+    return swings / total if total else swings
+
+
+def shapley_shubik_from_swings(swings):
+    # A party is pivotal for k preceding parties in k!(n-1-k)!/n! of all orderings.
+    n = swings.shape[0]
+    order_share = np.array([1.0 / (n * math.comb(n - 1, k)) for k in range(n)])
+    return swings @ order_share
+
+
+def banzhaf_index(weights, quota):
+    return banzhaf_from_swings(swing_counts(weights, quota))
+
+
+def shapley_shubik_index(weights, quota):
+    return shapley_shubik_from_swings(swing_counts(weights, quota))
+
+
+def minimal_winning_coalitions(weights, quota, max_size=None, limit=None):
+    # Depth-first over parties in descending seat order, stopping each branch the moment it
+    # reaches the quota. The last party added is then the smallest member and the coalition
+    # was losing without it, so every coalition found is minimal winning, and every minimal
+    # winning coalition is found exactly once. Yields tuples of party positions.
+    order = sorted(range(len(weights)), key=lambda i: -weights[i])
+    order = [i for i in order if weights[i] > 0]
+    suffix = np.concatenate((np.cumsum([weights[i] for i in order][::-1])[::-1], [0]))
+    found = 0
+    stack = [(0, 0, ())]
+    while stack:
+        start, seats, members = stack.pop()
+        if max_size is not None and len(members) >= max_size:
+            continue
+        for j in range(len(order) - 1, start - 1, -1):
+            if seats + suffix[j] < quota:
+                continue
+            party = order[j]
+            total = seats + weights[party]
+            if total >= quota:
+                yield members + (party,)
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+            else:
+                stack.append((j + 1, total, members + (party,)))
+
+
+def smallest_coalition(weights, party, quota):
+    # Fewest partners that lift party to the quota, ties broken by fewest surplus seats.
+    # first[k, s] records which partner first made (k partners, s seats) reachable, which is
+    # enough to walk the choice back. Returns partner positions, or None if unreachable.
+    need = quota - weights[party]
+    if need <= 0:
+        return []
+    others = [i for i in range(len(weights)) if i != party and weights[i] > 0]
+    ranked = sorted(others, key=lambda i: -weights[i])
+    if sum(weights[i] for i in others) < need:
+        return None
+    max_partners = next(k for k in range(1, len(ranked) + 1)
+                        if sum(weights[i] for i in ranked[:k]) >= need)
+
+    cap = need + max(weights[i] for i in others)
+    first = np.full((max_partners + 1, cap), -1, dtype=np.int64)
+    first[0, 0] = len(weights)
+    for i in others:
+        w = weights[i]
+        reachable = first[:-1, :cap - w] >= 0
+        fresh = reachable & (first[1:, w:] < 0)
+        first[1:, w:][fresh] = i
+    for k in range(1, max_partners + 1):
+        hits = np.flatnonzero(first[k, need:] >= 0)
+        if len(hits):
+            s = need + hits[0]
+            break
+
+    partners = []
+    while k > 0:
+        i = first[k, s]
+        partners.append(i)
+        k, s = k - 1, s - weights[i]
+    return partners
+
+
+class CoalitionEngine:
+    def __init__(self, df, quota=None):
+        self.df = df.reset_index(drop=True)
+        self.weights = self.df['Total'].astype(int).tolist()
+        self.quota = quota if quota is not None else majority_threshold(df)
+
+    def power_indices(self):
+        swings = swing_counts(self.weights, self.quota)
+        return pd.DataFrame({
+            'Party': self.df['Party'],
+            'Total': self.weights,
+            'Banzhaf': banzhaf_from_swings(swings),
+            'Shapley-Shubik': shapley_shubik_from_swings(swings),
+        }).sort_values('Shapley-Shubik', ascending=False, kind='stable').reset_index(drop=True)
+
+    def minimal_winning_coalitions(self, max_size=None, limit=None):
+        parties = self.df['Party']
+        return [[parties[i] for i in coalition]
+                for coalition in minimal_winning_coalitions(self.weights, self.quota, max_size, limit)]
+
+    def smallest_coalition(self, party):
+        position = self.df.index[self.df['Party'] == party]
+        if len(position) == 0:
+            raise Exception(f"Unknown party: {party}")
+        partners = smallest_coalition(self.weights, int(position[0]), self.quota)
+        if partners is None:
+            return None
+        members = self.df.loc[[int(position[0])] + partners, ['Party', 'Total']].reset_index(drop=True)
+        return members
+
+
+if __name__ == "__main__":
+    import sys
+
+    parties_df = pd.read_csv(sys.argv[1] if len(sys.argv) > 1 else '../datasets/parties_data.csv')
+    engine = CoalitionEngine(parties_df)
+    print(f"Quota: {engine.quota}")
+    print(engine.power_indices().head(10).to_string(index=False))
+    top_party = parties_df.loc[parties_df['Total'].idxmax(), 'Party']
+    print(f"\nSmallest coalition for {top_party}:")
+    print(engine.smallest_coalition(top_party).to_string(index=False))
@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from candidate_index import CandidateIndex
+from distributions import DistributionEngine
+from entities import entity_index
+
+# Pure insight computations over the party table (df) and candidate table (candidate_df).
+# Nothing here imports matplotlib or touches the network; new.py renders charts from these
+# results and the text summaries are what ends up in election_insights.txt.
+
+
+@dataclass
+class IndependentCandidates:
+    total: int
+
+    def summary(self):
+        return f"Number of independent candidates who won: {self.total}"
+
+
+@dataclass
+class ElectionStatistics:
+    total_seats: int
+    total_parties: int
+    avg_seats: float
+
+    def summary(self):
+        return (f"Overall Election Statistics:\n"
+                f"Total Seats: {self.total_seats}\n"
+                f"Total Parties: {self.total_parties}\n"
+                f"Average Seats per Party: {self.avg_seats:.2f}")
+
+
+@dataclass
+class PartySizeDistribution:
+    distribution: pd.Series
+
+    def summary(self):
+        return f"Party size distribution:\n{self.distribution.to_string()}"
+
+
+@dataclass
+class GovernmentFormation:
+    parties: list
+    totals: list
+    top_party: str
+    top_total: int
+    majority: int
+
+    @property
+    def has_majority(self):
+        return self.top_total >= self.majority
+
+    def summary(self):
+        if self.has_majority:
+            return f"{self.top_party} is likely to form the government with {self.top_total} seats (Majority: {self.majority})"
+        return f"No single party has a majority. Coalition government likely. (Majority required: {self.majority})"
+
+
+@dataclass
+class ElectionCloseness:
+    parties: list
+    totals: list
+    difference: int
+    closeness_percentage: float
+
+    def summary(self):
+        return (f"The election was decided by a margin of {self.difference} seats "
+                f"({self.closeness_percentage:.2f}% of total seats)")
+
+
+@dataclass
+class Kingmakers:
+    kingmakers: pd.DataFrame
+    majority: int
+
+    def summary(self):
+        return f"Potential kingmakers:\n{self.kingmakers[['Party', 'Total']].to_string(index=False)}"
+
+
+@dataclass
+class CandidateRanking:
+    heading: str
+    candidates: pd.DataFrame
+
+    def summary(self):
+        columns = ['Winning Candidate', 'Party', 'Constituency', 'Total Votes']
+        return f"{self.heading}:\n{self.candidates[columns].to_string(index=False)}"
+
+
+@dataclass
+class PartyCandidateRankings:
+    heading: str
+    rankings: list  # (party, candidates DataFrame) for each of the top parties
+
+    def summary(self):
+        columns = ['Winning Candidate', 'Constituency', 'Total Votes']
+        results = [f"\n{party}:\n{candidates[columns].to_string(index=False)}" for party, candidates in self.rankings]
+        return f"{self.heading}:" + '\n'.join(results)
+
+
+def majority_threshold(df):
+    return int(df['Total'].sum() // 2 + 1)
+
+
+def independent_candidates_won(df):
+    independents = entity_index().parties.independent_mask(df['Party'])
+    return IndependentCandidates(int(df['Total'].to_numpy()[independents].sum()))
+
+
+def overall_election_statistics(df):
+    return ElectionStatistics(int(df['Total'].sum()), len(df), float(df['Total'].mean()))
+
+
+def party_size_distribution(df):
+    # Parties per seat-count bin, independents aside (they are not one party).
+    engine = DistributionEngine(df)
+    independents = entity_index().parties.independents(df['Party'])
+    return PartySizeDistribution(engine.histogram('Total', 'party_size', exclude={'Party': independents}))
+
+
+def forming_government(df):
+    top_party = df.loc[df['Total'].idxmax()]
+    return GovernmentFormation(df['Party'].tolist(), df['Total'].tolist(), top_party['Party'],
+                               int(top_party['Total']), majority_threshold(df))
+
+
+def election_closeness(df):
+    top_two = df.nlargest(2, 'Total')
+    difference = int(top_two.iloc[0]['Total'] - top_two.iloc[1]['Total'])
+    closeness_percentage = (difference / df['Total'].sum()) * 100
+    return ElectionCloseness(top_two['Party'].tolist(), top_two['Total'].tolist(), difference,
+                             float(closeness_percentage))
+
+
+def potential_kingmakers(df):
+    majority = majority_threshold(df)
+    top_party_seats = df['Total'].max()
+    kingmakers = df[(df['Total'] > 0) & (df['Total'] < (majority - top_party_seats))]
+    return Kingmakers(kingmakers.sort_values('Total', ascending=False).head(), majority)
+
+
+def top_5_candidates_by_votes(candidate_df):
+    return CandidateRanking("Top 5 candidates by total votes", candidate_df.nlargest(5, 'Total Votes'))
+
+
+def least_5_candidates_by_votes(candidate_df):
+    return CandidateRanking("Bottom 5 candidates by total votes", candidate_df.nsmallest(5, 'Total Votes'))
+
+
+def top_5_candidates_by_votes_top_10_parties(df, candidate_df, index=None):
+    # index: a prebuilt CandidateIndex over candidate_df, reused across calls when given.
+    index = index or CandidateIndex(candidate_df)
+    top_10_parties = df.nlargest(10, 'Total')['Party'].tolist()
+    rankings = index.top_k_by_party(top_10_parties, 5)
+    return PartyCandidateRankings("Top 5 candidates by total votes for each top 10 party", rankings)
+
+
+def least_5_candidates_by_votes_top_10_parties(df, candidate_df, index=None):
+    index = index or CandidateIndex(candidate_df)
+    top_10_parties = df.nlargest(10, 'Total')['Party'].tolist()
+    rankings = index.top_k_by_party(top_10_parties, 5, largest=False)
+    return PartyCandidateRankings("Least 5 candidates by total votes for each top 10 party", rankings)
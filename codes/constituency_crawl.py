@@ -0,0 +1,266 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urljoin
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+import instrumentation
+from entities import store_entities
+from html_tables import constituency_table_frame, find_table, table_columns
+from http_client import make_session
+from new import BASE_URL, scrape_eci_data
+from snapshot_store import apply_schema
+
+# Full results (every candidate) of every constituency, crawled from the constituency pages
+# linked from each party's winners page. Progress lives in crawl_dir: discovery.json maps
+# each party page to the constituency pages it links to (null until that page has been read),
+# parsed rows are written to Arrow
+# part files a batch of pages at a time, and progress.jsonl gets one line per page once its
+# part is on disk. A crawl that is interrupted or hits failed pages is resumed by running
+# it again over the same crawl_dir: finished pages are skipped and failed ones retried.
+# Nothing is published until every party page is discovered and every constituency done.
+
+DATASET = 'election_results'
+DISCOVERY_FILE = 'discovery.json'
+PROGRESS_FILE = 'progress.jsonl'
+
+
+def parse_constituency_data(content, constituency, url=''):
+    with instrumentation.stage('parse', len(content)):
+        table = find_table(content, 'table-striped')
+        if table is None:
+            raise Exception(f"Could not find the results table on the page: {url}")
+        return constituency_table_frame(table, constituency)
+
+
+def constituency_links(content, page_url):
+    # {constituency page URL: constituency} from one party's winners page.
+    table = find_table(content, 'table-striped')
+    if table is None:
+        raise Exception(f"Could not find the candidate data table on the page: {page_url}")
+    (_, constituency, _, _, _), links = table_columns(table, 5, link_col=1)
+    return {urljoin(page_url, link): name for name, link in zip(constituency, links) if link}
+
+
+class ConstituencyCrawl:
+    def __init__(self, crawl_dir='crawl', base_url=BASE_URL, workers=8, rate_limit=10.0, retries=3, backoff=0.5,
+                 timeout=30, batch_pages=50):
+        self.crawl_dir = crawl_dir
+        self.base_url = base_url
+        self.workers = workers
+        self.rate_limit = rate_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.batch_pages = batch_pages
+        os.makedirs(crawl_dir, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.crawl_dir, name)
+
+    def load_discovery(self):
+        if not os.path.exists(self.path(DISCOVERY_FILE)):
+            return {}
+        with open(self.path(DISCOVERY_FILE)) as f:
+            return json.load(f)
+
+    def save_discovery(self, discovery):
+        with open(self.path(DISCOVERY_FILE) + '.tmp', 'w') as f:
+            json.dump(discovery, f, indent=2)
+        os.replace(self.path(DISCOVERY_FILE) + '.tmp', self.path(DISCOVERY_FILE))
+
+    def progress(self):
+        # {url: entry} for the last entry logged per page; a torn last line from a crash is
+        # ignored, and a page whose part file is gone counts as not done.
+        entries = {}
+        if os.path.exists(self.path(PROGRESS_FILE)):
+            with open(self.path(PROGRESS_FILE)) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    entries[entry['url']] = entry
+        return {url: entry for url, entry in entries.items()
+                if 'part' not in entry or os.path.exists(self.path(entry['part']))}
+
+    def log(self, entries):
+        with open(self.path(PROGRESS_FILE), 'a') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def discover(self, session):
+        # Constituency pages of every party page discovered so far, the number of party pages
+        # tried, and {party page: seats} for those still undiscovered. A party page that fails
+        # is kept in discovery.json as null and tried again next run.
+        discovery = self.load_discovery()
+        parties = scrape_eci_data(f"{self.base_url}index.htm", session)
+        seats = dict(zip(parties['Link'], parties['Total'].astype(int)))
+        pending = [link for link in parties['Link'] if link and discovery.get(link) is None]
+
+        def fetch(link):
+            url = urljoin(self.base_url, link)
+            response = instrumentation.get(url, session)
+            response.raise_for_status()
+            return constituency_links(response.content, url)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(fetch, link): link for link in pending}
+            for future in as_completed(futures):
+                link = futures[future]
+                try:
+                    discovery[link] = future.result()
+                except Exception as e:
+                    print(f"Error discovering constituencies from {link}: {str(e)}")
+                    instrumentation.record_error('discover', e, link=link)
+                    discovery[link] = None
+        self.save_discovery(discovery)
+        constituencies = {url: name for pages in discovery.values() if pages for url, name in pages.items()}
+        return constituencies, len(pending), {link: seats.get(link, 0) for link, pages in discovery.items()
+                                              if pages is None}
+
+    def incomplete(self):
+        # (party pages not yet discovered, constituency pages not yet done) from crawl_dir alone.
+        discovery = self.load_discovery()
+        if not discovery:
+            return None, None
+        done = {url for url, entry in self.progress().items() if 'error' not in entry}
+        constituencies = {url for pages in discovery.values() if pages for url in pages}
+        return sum(pages is None for pages in discovery.values()), len(constituencies - done)
+
+    def fetch(self, session, url, constituency):
+        response = instrumentation.get(url, session)
+        response.raise_for_status()
+        return parse_constituency_data(response.content, constituency, url)
+
+    def flush(self, pages):
+        # One part file for a batch of finished pages, then their progress lines: a page is
+        # only ever logged done once its rows are durably in a part.
+        frames = [df for _, _, df in pages if not df.empty]
+        entries = [{'url': url, 'constituency': name, 'rows': len(df)} for url, name, df in pages]
+        if frames:
+            part = f"part-{len(self.parts()):05d}.arrow"
+            df = apply_schema(DATASET, pd.concat(frames, ignore_index=True))
+            feather.write_feather(df, self.path(part) + '.tmp', compression='uncompressed')
+            os.replace(self.path(part) + '.tmp', self.path(part))
+            entries = [{**entry, 'part': part} for entry in entries]
+        self.log(entries)
+
+    def parts(self):
+        return sorted(file for file in os.listdir(self.crawl_dir) if file.startswith('part-') and file.endswith('.arrow'))
+
+    def run(self, limit=None):
+        # Crawls every constituency page not yet done, at most limit of them; returns counts.
+        with make_session(pool_size=self.workers, rate_limit=self.rate_limit, retries=self.retries,
+                          backoff=self.backoff, timeout=self.timeout) as session:
+            with instrumentation.stage('crawl.discover'):
+                constituencies, discovered, undiscovered = self.discover(session)
+            done = {url for url, entry in self.progress().items() if 'error' not in entry}
+            pending = [(url, name) for url, name in constituencies.items() if url not in done][:limit]
+            finished, failed, rows = [], [], 0
+            with instrumentation.stage('crawl.fetch'), ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self.fetch, session, url, name): (url, name) for url, name in pending}
+                try:
+                    for future in as_completed(futures):
+                        url, name = futures[future]
+                        try:
+                            df = future.result()
+                        except Exception as e:
+                            print(f"Failed to crawl {url}: {str(e)}")
+                            instrumentation.record_error('crawl', e, url=url)
+                            failed.append({'url': url, 'error': str(e)})
+                            continue
+                        finished.append((url, name, df))
+                        rows += len(df)
+                        if len(finished) >= self.batch_pages:
+                            self.flush(finished)
+                            finished = []
+                finally:
+                    # Interrupted or not, what was fetched is kept; unstarted pages are dropped.
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    if finished:
+                        self.flush(finished)
+                    if failed:
+                        self.log(failed)
+        # Seats behind undiscovered party pages count as remaining (at least one page each),
+        # so a crawl is only ever reported finished once every party page has been read.
+        undiscovered_pages = sum(max(seats, 1) for seats in undiscovered.values())
+        remaining = len(constituencies) - len(done) - (len(pending) - len(failed)) + undiscovered_pages
+        return {'constituencies': len(constituencies) + undiscovered_pages, 'party_pages': discovered,
+                'undiscovered': len(undiscovered), 'fetched': len(pending) - len(failed), 'failed': len(failed),
+                'remaining': remaining, 'rows': rows}
+
+    def tables(self):
+        # Each part's rows for the pages whose latest progress entry points at it, so pages
+        # crawled again after a crash between a part and its log lines are never doubled.
+        logged = {}
+        for entry in self.progress().values():
+            if 'part' in entry:
+                logged.setdefault(entry['part'], []).append(entry['constituency'])
+        for part in sorted(logged):
+            table = feather.read_table(self.path(part), memory_map=True)
+            yield table.filter(pc.is_in(table['Constituency'].cast(pa.string()), pa.array(logged[part])))
+
+    def read(self):
+        # Every crawled row so far as one frame.
+        tables = list(self.tables())
+        if not tables:
+            return pd.DataFrame()
+        return pa.concat_tables(tables, promote_options='permissive').to_pandas()
+
+    def publish(self, store, version=None):
+        # Streams the parts into one election_results snapshot and returns its version; a crawl
+        # with party pages undiscovered or constituencies not done is refused.
+        undiscovered, remaining = self.incomplete()
+        if undiscovered is None or undiscovered or remaining:
+            raise Exception(f"Crawl in {self.crawl_dir} is incomplete: {undiscovered} party pages undiscovered, "
+                            f"{remaining} constituencies remaining")
+        version = version or datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        entities = store_entities(store)
+        with store.writer(DATASET, version) as writer:
+            for table in self.tables():
+                df = table.to_pandas()
+                entities.record(df)
+                writer.write(df)
+        return version
+
+
+if __name__ == "__main__":
+    import argparse
+    from contextlib import nullcontext
+
+    from snapshot_store import SnapshotStore
+
+    parser = argparse.ArgumentParser(description="Crawl every constituency's full results; rerun to resume.")
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--crawl-dir', default='crawl')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate-limit', type=float, default=10.0, help="requests per second")
+    parser.add_argument('--limit', type=int, help="crawl at most this many pages this run")
+    parser.add_argument('--store-dir', default='snapshots', help="where the finished crawl is published")
+    parser.add_argument('--csv', help="also export the finished crawl as CSV (e.g. election_results.csv)")
+    parser.add_argument('--report', help="write an instrumentation run report here")
+    args = parser.parse_args()
+
+    crawl = ConstituencyCrawl(args.crawl_dir, args.base_url, args.workers, args.rate_limit)
+    run = instrumentation.Instrumentation() if args.report else None
+    with instrumentation.activate(run) if run else nullcontext():
+        counts = crawl.run(args.limit)
+    if run:
+        run.write(args.report)
+    print(f"Crawled {counts['fetched']} pages ({counts['rows']} rows), {counts['failed']} failed, "
+          f"{counts['remaining']} of {counts['constituencies']} constituencies remaining, "
+          f"{counts['undiscovered']} party pages undiscovered")
+    if counts['remaining'] == 0:
+        store = SnapshotStore(args.store_dir)
+        version = crawl.publish(store)
+        print(f"Published {DATASET} version {version}")
+        if args.csv:
+            store.export_csv(DATASET, args.csv, version)
@@ -0,0 +1,222 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Histograms of any numeric column over any bin scheme, sliced by any grouping columns
+# (State, Election, Party, ...). A column is binned once per scheme with searchsorted over
+# its array as stored, and every requested (column, scheme) and group is then counted by a
+# single bincount over combined (group, bin) codes, so a per-state or per-election slice
+# costs no extra pass over the frame and the frame itself is never copied or filtered.
+# Engines over stored snapshots are cached by version: a snapshot never changes, so each
+# of its distributions is computed once.
+
+
+@dataclass(frozen=True)
+class BinScheme:
+    name: str
+    edges: tuple
+    labels: tuple = None
+    right: bool = False  # bins closed on the right, (a, b], rather than [a, b)
+
+    def __post_init__(self):
+        if self.labels is None:
+            left, right = ('(', ']') if self.right else ('[', ')')
+            object.__setattr__(self, 'labels', tuple(
+                f"{left}{a:g}, {b:g}{right}" for a, b in zip(self.edges[:-1], self.edges[1:])))
+        if len(self.labels) != len(self.edges) - 1:
+            raise ValueError(f"{self.name}: {len(self.edges)} edges need {len(self.edges) - 1} labels")
+
+    @classmethod
+    def uniform(cls, name, start, stop, bins, right=False):
+        return cls(name, tuple(np.linspace(start, stop, bins + 1).tolist()), right=right)
+
+    def codes(self, values):
+        # Bin of each value, -1 for values outside the edges (NaN included), as pd.cut does.
+        edges = np.asarray(self.edges, dtype=np.float64)
+        codes = np.searchsorted(edges, values, side='left' if self.right else 'right') - 1
+        codes[codes >= len(edges) - 1] = -1
+        return codes
+
+
+SCHEMES = {
+    # Seats per party, as in the party size distribution insight and its PowerBI dataset.
+    'party_size': BinScheme('Size Category', (0, 2, 6, 11, 51, 101, float('inf')),
+                            ('1', '2-5', '6-10', '11-50', '51-100', '100+')),
+    'margin': BinScheme('Margin', (0, 1_000, 5_000, 10_000, 50_000, 100_000, 250_000, float('inf')),
+                        ('<1K', '1K-5K', '5K-10K', '10K-50K', '50K-1L', '1L-2.5L', '2.5L+')),
+    'votes': BinScheme('Votes', (0, 200_000, 400_000, 600_000, 800_000, 1_000_000, float('inf')),
+                       ('<2L', '2L-4L', '4L-6L', '6L-8L', '8L-10L', '10L+')),
+    'vote_share': BinScheme('Vote Share', (0, 10, 20, 30, 40, 50, 60, 70, 80, 90, float('inf')),
+                            ('0-10%', '10-20%', '20-30%', '30-40%', '40-50%', '50-60%', '60-70%', '70-80%',
+                             '80-90%', '90-100%')),
+}
+
+
+def vote_share(df):
+    # Each candidate's percentage of the votes cast in their constituency (per election when
+    # the frame spans several), from full results with a Votes column for every candidate.
+    keys = [df['Election'], df['Constituency']] if 'Election' in df.columns else [df['Constituency']]
+    codes = np.zeros(len(df), dtype=np.int64)
+    for key in keys:
+        key_codes, uniques = pd.factorize(key)
+        codes = codes * (len(uniques) + 1) + key_codes + 1
+    codes, _ = pd.factorize(codes)
+    votes = df['Votes'].to_numpy(dtype=np.float64)
+    totals = np.bincount(codes, weights=votes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return votes / totals[codes] * 100
+
+
+# Columns computed from the frame rather than read from it.
+METRICS = {'Vote Share': vote_share}
+
+
+class DistributionEngine:
+    def __init__(self, df):
+        self.df = df
+        self.values = {}
+        self.bins = {}
+        self.group_codes = {}
+        self.masks = {}
+        self.results = {}
+
+    def column(self, name):
+        if name not in self.values:
+            if name in self.df.columns:
+                self.values[name] = self.df[name].to_numpy()
+            elif name in METRICS:
+                self.values[name] = METRICS[name](self.df)
+            else:
+                raise KeyError(f"No column or metric named {name!r}")
+        return self.values[name]
+
+    def bin_codes(self, column, scheme):
+        if (column, scheme) not in self.bins:
+            self.bins[column, scheme] = scheme.codes(self.column(column))
+        return self.bins[column, scheme]
+
+    def groups(self, by):
+        # Dense codes over the combinations of the by columns that occur (sorted), with the
+        # index of those combinations; rows missing any key get -1.
+        if by not in self.group_codes:
+            if not by:
+                self.group_codes[by] = np.zeros(len(self.df), dtype=np.int64), None
+            else:
+                combined = np.zeros(len(self.df), dtype=np.int64)
+                missing = np.zeros(len(self.df), dtype=bool)
+                uniques = []
+                for column in by:
+                    codes, column_uniques = pd.factorize(self.df[column], sort=True)
+                    missing |= codes < 0
+                    combined = combined * len(column_uniques) + codes
+                    uniques.append(column_uniques)
+                present_codes, present = pd.factorize(combined[~missing], sort=True)
+                codes = np.full(len(self.df), -1, dtype=np.int64)
+                codes[~missing] = present_codes
+                keys = np.unravel_index(np.asarray(present), [len(column_uniques) for column_uniques in uniques])
+                if len(by) == 1:
+                    index = pd.Index(uniques[0].take(keys[0]), name=by[0])
+                else:
+                    index = pd.MultiIndex.from_arrays([column_uniques.take(key) for column_uniques, key in
+                                                       zip(uniques, keys)], names=list(by))
+                self.group_codes[by] = codes, index
+        return self.group_codes[by]
+
+    def kept(self, exclude):
+        # Rows not excluded, as a mask; exclude is ((column, values), ...).
+        if exclude not in self.masks:
+            mask = np.ones(len(self.df), dtype=bool)
+            for column, values in exclude:
+                mask &= ~self.df[column].isin(values).to_numpy()
+            self.masks[exclude] = mask
+        return self.masks[exclude]
+
+    def histograms(self, specs, by=None, weights=None, exclude=None):
+        # One result per (column, scheme) in specs: a Series of counts per bin, or with by a
+        # frame of groups x bins. weights sums that column instead of counting rows; exclude
+        # maps columns to values whose rows are left out, e.g. {'Party': ['Independent - IND']}.
+        by = (by,) if isinstance(by, str) else tuple(by or ())
+        exclude = tuple(sorted((column, tuple(values)) for column, values in (exclude or {}).items()))
+        specs = [(column, SCHEMES[scheme] if isinstance(scheme, str) else scheme) for column, scheme in specs]
+        keys = [(column, scheme, by, weights, exclude) for column, scheme in specs]
+        missing = [(key, column, scheme) for key, (column, scheme) in zip(keys, specs) if key not in self.results]
+        if missing:
+            group_codes, groups = self.groups(by)
+            n_groups = 1 if groups is None else len(groups)
+            valid = group_codes >= 0
+            if exclude:
+                valid = valid & self.kept(exclude)
+            blocks, layout, size = [], [], 0
+            for key, column, scheme in missing:
+                bins = self.bin_codes(column, scheme)
+                n_bins = len(scheme.labels)
+                blocks.append(np.where(valid & (bins >= 0), size + group_codes * n_bins + bins, -1))
+                layout.append((key, scheme, size, n_bins))
+                size += n_groups * n_bins
+            codes = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+            codes[codes < 0] = size  # one overflow slot for rows outside every bin
+            row_weights = None
+            if weights is not None:
+                row_weights = np.asarray(self.column(weights), dtype=np.float64)
+                row_weights = np.tile(row_weights, len(blocks)) if len(blocks) > 1 else row_weights
+            counts = np.bincount(codes, weights=row_weights, minlength=size + 1)
+            if weights is not None and np.asarray(self.column(weights)).dtype.kind in 'iu':
+                counts = counts.round().astype(np.int64)
+            for key, scheme, start, n_bins in layout:
+                self.results[key] = self.frame(counts[start:start + n_groups * n_bins].reshape(n_groups, n_bins),
+                                               scheme, groups)
+        return [self.results[key] for key in keys]
+
+    def histogram(self, column, scheme, by=None, weights=None, exclude=None):
+        return self.histograms([(column, scheme)], by, weights, exclude)[0]
+
+    def frame(self, counts, scheme, groups):
+        labels = pd.CategoricalIndex(scheme.labels, categories=scheme.labels, ordered=True, name=scheme.name)
+        if groups is None:
+            return pd.Series(counts[0], index=labels, name='count')
+        return pd.DataFrame(counts, index=groups, columns=labels)
+
+
+_snapshot_engines = {}
+
+
+def snapshot_engine(store, name, version=None):
+    # The engine over one stored snapshot, built once per version. A partitioned dataset
+    # (election_history) spans the latest snapshot of every partition, keyed by all of them.
+    partitions = store.partitions(name) if version is None else []
+    if partitions:
+        key = (os.path.abspath(store.root), name,
+               tuple((partition, store.versions(name, partition)[-1]) for partition in partitions))
+    else:
+        key = (os.path.abspath(store.root), name, version or store.versions(name)[-1])
+    if key not in _snapshot_engines:
+        df = store.read_partitions(name) if partitions else store.read(name, key[2])
+        _snapshot_engines[key] = DistributionEngine(df)
+    return _snapshot_engines[key]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from snapshot_store import SnapshotStore
+
+    parser = argparse.ArgumentParser(description="Histogram a stored dataset's column, optionally sliced by groups.")
+    parser.add_argument('dataset', help="e.g. parties, candidates, election_history, election_results")
+    parser.add_argument('column', help=f"column or one of: {', '.join(METRICS)}")
+    parser.add_argument('--scheme', default='party_size', help=f"one of: {', '.join(SCHEMES)}")
+    parser.add_argument('--edges', type=float, nargs='+', help="custom bin edges instead of --scheme")
+    parser.add_argument('--by', nargs='*', default=[], help="group columns, e.g. State Election")
+    parser.add_argument('--weights', help="sum this column instead of counting rows")
+    parser.add_argument('--exclude', nargs=2, action='append', metavar=('COLUMN', 'VALUE'), default=[])
+    parser.add_argument('--store-dir', default='snapshots')
+    parser.add_argument('--version')
+    args = parser.parse_args()
+
+    scheme = BinScheme(args.column, tuple(args.edges)) if args.edges else args.scheme
+    exclude = {}
+    for column, value in args.exclude:
+        exclude.setdefault(column, []).append(value)
+    engine = snapshot_engine(SnapshotStore(args.store_dir), args.dataset, args.version)
+    print(engine.histogram(args.column, scheme, args.by, args.weights, exclude).to_string())
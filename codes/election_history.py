@@ -0,0 +1,160 @@
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+import instrumentation
+from entities import store_entities
+from html_tables import find_table, parse_int_column, table_columns
+from new import scrape_all_candidates, scrape_eci_data
+from records import party_frame
+from snapshot_store import SnapshotStore
+
+HISTORY_DATASET = 'election_history'
+
+
+@dataclass(frozen=True)
+class Layout:
+    # Where one general election's party-wise results live and how its pages are laid out:
+    # an index of parties, each linking to a table of the seats it won. Tables are found by
+    # class token; *_cells name the column each cell holds, left to right (None for a cell
+    # that is not kept), below header_rows heading rows. A closing totals row whose first cell
+    # reads footer is dropped, and winners tables without serial numbers are numbered in
+    # row order.
+    base_url: str
+    index_page: str = 'index.htm'
+    party_table: str = 'table'
+    party_cells: tuple = ('Party', 'Won', 'Leading', 'Total')
+    party_link: str = 'Won'
+    candidate_table: str = 'table-striped'
+    candidate_cells: tuple = ('Serial Number', 'Constituency', 'Winning Candidate', 'Total Votes', 'Margin')
+    header_rows: int = 1
+    footer: str = None
+
+    def cells(self, table, cells, link=None, exact=False):
+        # {column: values} for the kept cells of every body row, plus 'Link' from link's anchor.
+        columns, links = table_columns(table, len(cells), exact, cells.index(link) if link else None,
+                                       self.header_rows)
+        keep = [i for i, first in enumerate(columns[0]) if self.footer is None or first != self.footer]
+        frame = {name: [column[i] for i in keep] for name, column in zip(cells, columns) if name is not None}
+        if link:
+            frame['Link'] = [links[i] for i in keep]
+        return frame
+
+    def parse_index(self, content):
+        with instrumentation.stage('parse', len(content)):
+            table = find_table(content, self.party_table)
+            if table is None:
+                raise Exception("Could not find the results table on the page")
+            columns = self.cells(table, self.party_cells, self.party_link, exact=True)
+            if not columns['Party']:
+                return pd.DataFrame()
+            return party_frame(columns['Party'], parse_int_column(columns['Won']),
+                               parse_int_column(columns['Leading']), parse_int_column(columns['Total']),
+                               columns['Link'])
+
+    def parse_winners(self, content, party_name, url=''):
+        with instrumentation.stage('parse', len(content)):
+            table = find_table(content, self.candidate_table)
+            if table is None:
+                print(f"Could not find the candidate data table on the page: {url}")
+                instrumentation.record_error('parse', "candidate table not found", url=url)
+                return pd.DataFrame()
+            columns = self.cells(table, self.candidate_cells)
+            if not columns['Constituency']:
+                print(f"No data found in the table for URL: {url}")
+                return pd.DataFrame()
+            serial = columns.get('Serial Number') or [str(i) for i in range(1, len(columns['Constituency']) + 1)]
+            return pd.DataFrame({
+                'Serial Number': serial,
+                'Constituency': columns['Constituency'],
+                'Winning Candidate': columns['Winning Candidate'],
+                'Total Votes': parse_int_column(columns['Total Votes']),
+                'Margin': parse_int_column(columns['Margin']),
+                'Party': party_name,
+            })
+
+
+# 2014's archive links each party's page from its name, opens its tables with a title row
+# above the headings, closes them with a totals row, and lists winners by constituency and
+# state without serial numbers, margin before votes. 2019's party table carries its own
+# class and its winners tables a trailing result-status cell. Pass base_url to point at a
+# mirror, or fixture_server.build_election_site for a local copy of each layout.
+ELECTIONS = {
+    2014: Layout("https://eciresults.nic.in/", 'PartyWiseResult.htm', party_table='partywise', party_link='Party',
+                 candidate_table='partywise-winners',
+                 candidate_cells=('Constituency', None, 'Winning Candidate', 'Margin', 'Total Votes'),
+                 header_rows=2, footer='Total'),
+    2019: Layout("https://results.eci.gov.in/pc/en/partywise/", party_table='table-party',
+                 candidate_cells=('Serial Number', 'Constituency', 'Winning Candidate', 'Total Votes', 'Margin',
+                                  None)),
+    2024: Layout("https://results.eci.gov.in/PcResultGenJune2024/"),
+}
+
+
+def election_layout(election, base_url=None):
+    if election not in ELECTIONS:
+        raise Exception(f"Unknown election {election}; expected one of {sorted(ELECTIONS)}")
+    layout = ELECTIONS[election]
+    return replace(layout, base_url=base_url) if base_url else layout
+
+
+def history_frame(candidate_df, election, states=None):
+    # Winners table tagged with its election (and State when a Constituency -> State mapping
+    # is given), sorted by constituency so each partition is keyed the way it is queried.
+    df = candidate_df.assign(Election=election)
+    if states is not None:
+        df = df.merge(states[['Constituency', 'State']], on='Constituency', how='left')
+    return df.sort_values('Constituency', kind='stable').reset_index(drop=True)
+
+
+def scrape_election(election, base_url=None, workers=8, rate_limit=10.0, cache=None):
+    layout = election_layout(election, base_url)
+    df = scrape_eci_data(f"{layout.base_url}{layout.index_page}", cache=cache, parse=layout.parse_index)
+    return df, scrape_all_candidates(df, layout.base_url, workers, rate_limit, cache=cache,
+                                     parse=layout.parse_winners)
+
+
+def ingest_election(store, election, base_url=None, states=None, workers=8, rate_limit=10.0, cache=None):
+    # Scrapes one election into its partition of the history dataset and returns the version.
+    _, candidate_df = scrape_election(election, base_url, workers, rate_limit, cache)
+    if candidate_df.empty:
+        raise Exception(f"No candidate data scraped for {election}")
+    store_entities(store).record(candidate_df)
+    return store.write(HISTORY_DATASET, history_frame(candidate_df, election, states), partition=election)
+
+
+def import_election_csv(store, election, csv_path, states=None):
+    # Same as ingest_election for a winners CSV in candidate_data.csv's shape.
+    candidate_df = pd.read_csv(csv_path)
+    store_entities(store).record(candidate_df)
+    return store.write(HISTORY_DATASET, history_frame(candidate_df, election, states), partition=election)
+
+
+def load_history(store, elections=None):
+    return store.read_partitions(HISTORY_DATASET, [str(election) for election in elections] if elections else None)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from response_cache import ResponseCache
+
+    parser = argparse.ArgumentParser(description="Load one or more general elections into the partitioned history store.")
+    parser.add_argument('elections', nargs='+', type=int, choices=sorted(ELECTIONS))
+    parser.add_argument('--base-url', help="override the election's base URL (e.g. a mirror)")
+    parser.add_argument('--csv', help="import this winners CSV instead of scraping (one election only)")
+    parser.add_argument('--states', help="CSV mapping Constituency to State")
+    parser.add_argument('--store-dir', default='snapshots')
+    parser.add_argument('--cache-dir', default='.eci_cache')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store_dir)
+    states = pd.read_csv(args.states) if args.states else None
+    cache = ResponseCache(args.cache_dir)
+    for election in args.elections:
+        if args.csv:
+            version = import_election_csv(store, election, args.csv, states)
+        else:
+            version = ingest_election(store, election, args.base_url, states, cache=cache)
+            cache.flush()
+        print(f"{election}: stored version {version}")
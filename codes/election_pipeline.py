@@ -1,36 +1,232 @@
-from pyspark.sql import SparkSession
-from zenml.pipelines import pipeline
-from zenml.steps import step
+import json
+import os
+from functools import partial
 
-# Initialize Spark session
-spark = SparkSession.builder.appName("ElectionResults").getOrCreate()
+import pandas as pd
 
-# Define ZenML steps and pipeline
-@step
-def ingest_data():
-    df = spark.read.csv('cleaned_election_results.csv', header=True, inferSchema=True)
+from analyze_data import analyze_data
+from charts import MANIFEST_FILE
+from pipeline_runner import PIPELINE_CACHE_DIR, Pipeline, Step
+from process_data import clean_data
+from entities import store_entities
+from snapshot_store import SnapshotStore, apply_schema
+
+# scrape -> snapshot, and ingest -> process -> analyze, feeding three independent branches
+# (insights text, charts, PDF report) that run side by side. Every step is content-hashed
+# by pipeline_runner, so a rerun over unchanged inputs only re-checks the live scrape.
+# Spark is only started for the results branch when the CSV is big enough to need it.
+
+SPARK_MIN_BYTES = 2 * 1024 ** 3
+
+
+def read_parties(csv_path):
+    return apply_schema('parties', pd.read_csv(csv_path))
+
+
+def read_candidates(csv_path):
+    return apply_schema('candidates', pd.read_csv(csv_path))
+
+
+def scrape_parties(base_url, cache_dir):
+    from new import scrape_eci_data
+    from response_cache import ResponseCache
+
+    cache = ResponseCache(cache_dir)
+    df = scrape_eci_data(f"{base_url}index.htm", cache=cache)
+    cache.flush()
     return df
 
-@step
+
+def scrape_candidates(df, base_url, workers, rate_limit, cache_dir):
+    from new import scrape_all_candidates
+    from response_cache import ResponseCache
+
+    cache = ResponseCache(cache_dir)
+    candidate_df = scrape_all_candidates(df, base_url, workers, rate_limit, cache=cache)
+    cache.flush()
+    return candidate_df
+
+
+def write_snapshots(df, candidate_df, store_dir):
+    # Same as new.main: the snapshots, then the entity IDs of everything they hold. Returns
+    # the files written, so a cached run can tell when the store was deleted.
+    store = SnapshotStore(store_dir)
+    version = store.write('parties', df)
+    paths = [store.path('parties', version)]
+    if not candidate_df.empty:
+        store.write('candidates', candidate_df, version)
+        paths.append(store.path('candidates', version))
+    entities = store_entities(store)
+    entities.record(df, candidate_df)
+    return paths + [entities.path]
+
+
+def files_exist(paths):
+    return all(os.path.exists(path) for path in paths)
+
+
+def ingest_data(csv_path):
+    return pd.read_csv(csv_path)
+
+
 def process_data(df):
-    # Perform data processing with Spark
-    processed_df = df.withColumn('Votes', df['Votes'].cast('int'))
-    return processed_df
-
-@step
-def analyze_data(df):
-    # Analyze data with Spark
-    df.createOrReplaceTempView("results")
-    insights = spark.sql("SELECT Party, COUNT(*) as Seats FROM results GROUP BY Party")
-    insights.show()
-    return insights
-
-@pipeline
-def election_pipeline(ingest_data, process_data, analyze_data):
-    df = ingest_data()
-    processed_df = process_data(df)
-    analyze_data(processed_df)
+    return clean_data(df.copy())
+
+
+def build_insights(df, candidate_df):
+    # Summaries plus the chart jobs they queue; rendering happens in its own step.
+    from charts import ChartRenderer
+    from new import election_insights
+
+    charts = ChartRenderer()
+    summaries = election_insights(df, candidate_df, charts)
+    return summaries, charts.jobs
+
+
+def write_insights(insights, path):
+    # Runs alongside the charts step, so it cannot count on that step creating out_dir.
+    summaries, _ = insights
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        for summary in summaries:
+            f.write(summary + '\n\n')
+    return path
+
+
+def render_charts(insights, out_dir, workers):
+    from charts import ChartRenderer
+
+    _, jobs = insights
+    charts = ChartRenderer(out_dir, workers)
+    for name, args in jobs.items():
+        charts.add(name, *args)
+    return charts.flush()
+
+
+def charts_on_disk(rendered, out_dir):
+    # Every chart the manifest records is still there (the step only returns what it redrew).
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return all(os.path.exists(os.path.join(out_dir, f'{name}.png')) for name in manifest)
+
+
+def write_report(insights, rendered, path, chart_dir):
+    # rendered (the charts step output) is only taken so the PNGs exist before embedding.
+    from generate_report import generate_report
+
+    generate_report(insights, path, chart_dir)
+    return path
+
+
+def spark_analyze_data(csv_path):
+    # The Spark backend for ingest -> process -> analyze, for result files too large for
+    # pandas. Only aggregates leave the JVM, so the step output stays small and picklable.
+    from pyspark.sql import SparkSession, Window
+    from pyspark.sql import functions as F
+
+    spark = SparkSession.builder.appName("ElectionResults").getOrCreate()
+    df = spark.read.csv(csv_path, header=True)
+    df = df.withColumn('Votes', F.regexp_replace('Votes', ',', '').cast('long'))
+
+    by_votes = Window.partitionBy('Constituency').orderBy(F.desc('Votes'))
+    winners = df.withColumn('rank', F.row_number().over(by_votes)).filter(F.col('rank') == 1)
+    seats = winners.groupBy('Party').count().collect()
+    totals = df.agg(F.countDistinct('Constituency'), F.sum('Votes'), F.countDistinct('Candidate')).first()
+
+    return {
+        'total_seats': int(totals[0]),
+        'total_votes': int(totals[1]),
+        'party_wise_seats': {row['Party']: int(row['count']) for row in sorted(seats, key=lambda row: row['Party'])},
+        'total_candidates': int(totals[2]),
+    }
+
+
+def use_spark(backend, csv_path):
+    if backend == 'auto':
+        return os.path.getsize(csv_path) >= SPARK_MIN_BYTES
+    return backend == 'spark'
+
+
+def build_pipeline(base_url=None, parties_csv=None, candidates_csv=None, results_csv=None, backend='auto',
+                   store_dir='snapshots', out_dir='.', cache_dir=PIPELINE_CACHE_DIR, response_cache_dir='.eci_cache',
+                   workers=8, rate_limit=10.0, chart_workers=None):
+    # Parties and candidates come from CSVs when given, otherwise from a live scrape of
+    # base_url; the live steps always run and are fingerprinted by what they returned.
+    steps = []
+    if parties_csv:
+        steps.append(Step('parties', read_parties, params={'csv_path': parties_csv}, files=[parties_csv]))
+    else:
+        steps.append(Step('parties', scrape_parties, params={'base_url': base_url, 'cache_dir': response_cache_dir},
+                          cache=False))
+    if candidates_csv:
+        steps.append(Step('candidates', read_candidates, params={'csv_path': candidates_csv}, files=[candidates_csv]))
+    else:
+        steps.append(Step('candidates', scrape_candidates, ('parties',),
+                          params={'base_url': base_url, 'workers': workers, 'rate_limit': rate_limit,
+                                  'cache_dir': response_cache_dir}, cache=False))
+
+    insights_path = os.path.join(out_dir, 'election_insights.txt')
+    steps += [
+        Step('insights', build_insights, ('parties', 'candidates')),
+        Step('insights_text', write_insights, ('insights',), params={'path': insights_path},
+             targets=[insights_path]),
+        Step('charts', render_charts, ('insights',), params={'out_dir': out_dir, 'workers': chart_workers},
+             targets=[os.path.join(out_dir, MANIFEST_FILE)], check=partial(charts_on_disk, out_dir=out_dir)),
+    ]
+    if store_dir:
+        steps.append(Step('snapshot', write_snapshots, ('parties', 'candidates'), params={'store_dir': store_dir},
+                          check=files_exist))
+
+    if results_csv:
+        report_path = os.path.join(out_dir, 'election_report.pdf')
+        if use_spark(backend, results_csv):
+            steps.append(Step('analysis', spark_analyze_data, params={'csv_path': results_csv}, files=[results_csv]))
+        else:
+            steps += [
+                Step('ingest', ingest_data, params={'csv_path': results_csv}, files=[results_csv]),
+                Step('process', process_data, ('ingest',)),
+                Step('analysis', analyze_data, ('process',)),
+            ]
+        steps.append(Step('report', write_report, ('analysis', 'charts'),
+                          params={'path': report_path, 'chart_dir': out_dir}, targets=[report_path]))
+
+    return Pipeline(steps, cache_dir)
+
 
 if __name__ == "__main__":
-    pipeline = election_pipeline(ingest_data(), process_data(), analyze_data())
-    pipeline.run()
+    import argparse
+    from contextlib import nullcontext
+
+    import instrumentation
+    from new import BASE_URL
+
+    parser = argparse.ArgumentParser(description="Run the election pipeline, skipping steps whose inputs are unchanged.")
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--parties-csv', help="read parties from this CSV instead of scraping")
+    parser.add_argument('--candidates-csv', help="read candidates from this CSV instead of scraping")
+    parser.add_argument('--results-csv', default='election_results.csv' if os.path.exists('election_results.csv') else None)
+    parser.add_argument('--backend', choices=['auto', 'pandas', 'spark'], default='auto')
+    parser.add_argument('--store-dir', default='snapshots')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--cache-dir', default=PIPELINE_CACHE_DIR)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate-limit', type=float, default=10.0)
+    parser.add_argument('--step', action='append', help="run only this step and what it depends on")
+    parser.add_argument('--report', metavar='JSON', help="write per-stage and per-URL timings to this run report")
+    parser.add_argument('--profile', action='store_true', help="include cProfile's top functions in the run report")
+    parser.add_argument('--trace-memory', action='store_true', help="track allocations with tracemalloc")
+    args = parser.parse_args()
+
+    pipeline = build_pipeline(args.base_url, args.parties_csv, args.candidates_csv, args.results_csv, args.backend,
+                              args.store_dir, args.out_dir, args.cache_dir, workers=args.workers,
+                              rate_limit=args.rate_limit)
+    run = instrumentation.Instrumentation(profile=args.profile, trace_memory=args.trace_memory)
+    with instrumentation.activate(run) if args.report or args.profile or args.trace_memory else nullcontext():
+        results = pipeline.run(args.step)
+    for name, result in results.items():
+        print(f"{name:14s} {result['status']:6s} {result['seconds']:8.3f}s")
+    if args.report or args.profile or args.trace_memory:
+        print(f"Run report written to {run.write(args.report or 'run_report.json')}")
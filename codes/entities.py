@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Canonical integer IDs for parties and constituencies, whatever form a dataset spells them
+# in: "Bharatiya Janata Party - BJP", "Bharatiya Janata Party" and "BJP" are one party,
+# "Anakapalle(5)", "ANAKAPALLE (5)" and "Anakapalle" one constituency. Bulk lookups resolve
+# each distinct value once and map the rest by its factorized code, so joins and filters
+# across scrapes, elections and exports compare integers. IDs are handed out in order of
+# first sight and persisted next to the snapshots, so they stay stable across runs.
+
+ENTITIES_FILE = 'entities.json'
+ENTITIES_PATH = os.path.join('snapshots', ENTITIES_FILE)
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'datasets')
+
+# Typographic variants the result sites mix: "Nationalist Congress Party – Sharadchandra Pawar",
+# "United People’s Party, Liberal".
+PUNCTUATION = str.maketrans({'–': '-', '—': '-', '‘': "'", '’': "'"})
+
+# What find() and id() return for a value no entity has, and for one that names several.
+UNKNOWN = -1
+AMBIGUOUS = -2
+
+
+def normalize(text):
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text).translate(PUNCTUATION)
+    return ' '.join(text.split()).casefold()
+
+
+def split_party(label):
+    # "Name - ABBR" -> (name, abbreviation); a label without an abbreviation gives None.
+    name, sep, abbreviation = unicodedata.normalize('NFKC', str(label)).translate(PUNCTUATION).rpartition(' - ')
+    if not sep or not name.strip() or not abbreviation.strip():
+        return str(label).strip(), None
+    return name.strip(), abbreviation.strip()
+
+
+def independent_label(label):
+    name, abbreviation = split_party(label)
+    return normalize(name) == 'independent' or (abbreviation is not None and normalize(abbreviation) == 'ind')
+
+
+def constituency_keys(label):
+    # (full key, bare name key): "Ajmer(13)" and "AJMER (13)" share the first; the bare name
+    # only identifies a constituency when no two seats share it (Hamirpur, Aurangabad, ...).
+    key = normalize(label)
+    return key.replace(' ', ''), key.split('(')[0].rstrip()
+
+
+class EntityTable:
+    def __init__(self):
+        self.labels = []
+        self.lookup = {}
+        self.lock = threading.Lock()
+
+    def aliases(self, label):
+        # Normalized keys that identify label, most specific first.
+        return [normalize(label)]
+
+    def find(self, aliases):
+        # The first alias in lookup decides; one stored as -1 is shared by several entities.
+        for alias in aliases:
+            entity = self.lookup.get(alias)
+            if entity is not None:
+                return entity if entity >= 0 else AMBIGUOUS
+        return UNKNOWN
+
+    def register(self, label, aliases):
+        entity = len(self.labels)
+        self.labels.append(str(label))
+        for alias in aliases:
+            self.lookup.setdefault(alias, entity)
+        return entity
+
+    def id(self, value, add=False):
+        aliases = self.aliases(value)
+        entity = self.find(aliases)
+        if entity == UNKNOWN and add:
+            with self.lock:
+                entity = self.find(aliases)
+                if entity == UNKNOWN:
+                    entity = self.register(value, aliases)
+        return entity
+
+    def ids(self, values, add=False):
+        # int32 ID per value, -1 for missing, ambiguous or (without add) unknown values.
+        codes, uniques = pd.factorize(values)
+        mapped = np.array([max(self.id(value, add), -1) for value in uniques.tolist()], dtype=np.int32)
+        if not len(mapped):
+            return np.full(len(codes), -1, dtype=np.int32)
+        return np.where(codes >= 0, mapped[codes], -1).astype(np.int32)
+
+    def label(self, entity):
+        return self.labels[entity]
+
+    def take(self, ids):
+        # Canonical labels for an array of IDs (None for -1).
+        labels = np.array(self.labels + [None], dtype=object)
+        return labels[np.where(np.asarray(ids) >= 0, ids, -1)]
+
+    def __len__(self):
+        return len(self.labels)
+
+    def to_json(self):
+        return {'labels': self.labels, 'aliases': {alias: entity for alias, entity in self.lookup.items()}}
+
+    @classmethod
+    def from_json(cls, data):
+        table = cls()
+        table.labels = list(data['labels'])
+        table.lookup = dict(data['aliases'])
+        return table
+
+
+class PartyTable(EntityTable):
+    def aliases(self, label):
+        name, abbreviation = split_party(label)
+        aliases = [normalize(label), normalize(name)]
+        if abbreviation is not None:
+            aliases.append(normalize(abbreviation))
+        return aliases
+
+    def abbreviation(self, value):
+        # "BJP" for any spelling of the BJP; a party known only by its name keeps the name.
+        # Lookups never register: values not in the index are read as they are spelled.
+        entity = self.id(value)
+        label = self.labels[entity] if entity >= 0 else str(value)
+        name, abbreviation = split_party(label)
+        return abbreviation or name
+
+    def is_independent(self, entity):
+        return independent_label(self.labels[entity])
+
+    def independent_mask(self, values):
+        # Rows whose party is an independent candidate rather than a party.
+        codes, uniques = pd.factorize(values)
+        flags = []
+        for value in uniques.tolist():
+            entity = self.id(value)
+            flags.append(self.is_independent(entity) if entity >= 0 else independent_label(value))
+        return np.array(flags + [False], dtype=bool)[codes]
+
+    def independents(self, values):
+        # The distinct values among values that name independents.
+        uniques = pd.unique(np.asarray(values, dtype=object))
+        return [value for value, independent in zip(uniques, self.independent_mask(uniques)) if independent]
+
+
+class ConstituencyTable(EntityTable):
+    # A numbered name only matches its own number; a bare name matches the one seat of that
+    # name, and bare names shared by several seats are kept in lookup as -1 so they never do.
+    def aliases(self, label):
+        key, bare = constituency_keys(label)
+        return [key] if bare != key else [bare]
+
+    def register(self, label, aliases):
+        entity = len(self.labels)
+        self.labels.append(str(label))
+        key, bare = constituency_keys(label)
+        self.lookup.setdefault(key, entity)
+        if bare != key:
+            self.lookup[bare] = entity if self.lookup.get(bare, entity) == entity else -1
+        return entity
+
+
+class EntityIndex:
+    def __init__(self, path=ENTITIES_PATH):
+        self.path = path
+        self.parties = PartyTable()
+        self.constituencies = ConstituencyTable()
+
+    def register(self, *frames):
+        # Gives every Party / Constituency value in frames an ID; returns how many were new.
+        before = len(self.parties) + len(self.constituencies)
+        for df in frames:
+            if 'Party' in df.columns:
+                self.parties.ids(df['Party'], add=True)
+            if 'Constituency' in df.columns:
+                self.constituencies.ids(df['Constituency'], add=True)
+        return len(self.parties) + len(self.constituencies) - before
+
+    def record(self, *frames):
+        # register(), saving the index when it grew or was never saved: scrapers call this
+        # before writing rows so the IDs of everything stored are on disk.
+        added = self.register(*frames)
+        if added or not os.path.exists(self.path):
+            self.save()
+        return added
+
+    def annotate(self, df):
+        # df with 'Party ID' / 'Constituency ID' int32 columns for the entity columns it has.
+        columns = {}
+        if 'Party' in df.columns:
+            columns['Party ID'] = self.parties.ids(df['Party'], add=True)
+        if 'Constituency' in df.columns:
+            columns['Constituency ID'] = self.constituencies.ids(df['Constituency'], add=True)
+        return df.assign(**columns)
+
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'parties': self.parties.to_json(), 'constituencies': self.constituencies.to_json()}, f,
+                      ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+        return path
+
+    @classmethod
+    def load(cls, path=ENTITIES_PATH):
+        index = cls(path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        index.parties = PartyTable.from_json(data['parties'])
+        index.constituencies = ConstituencyTable.from_json(data['constituencies'])
+        return index
+
+    @classmethod
+    def seeded(cls, path=ENTITIES_PATH):
+        # A fresh index with the 2024 datasets' parties and constituencies as the first IDs.
+        index = cls(path)
+        index.register(pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv')),
+                       pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv')))
+        return index
+
+
+_indexes = {}
+
+
+def entity_index(path=ENTITIES_PATH):
+    # The process-wide index for path: loaded from disk once, or seeded if none is saved yet.
+    key = os.path.abspath(path)
+    if key not in _indexes:
+        _indexes[key] = EntityIndex.load(path) if os.path.exists(path) else EntityIndex.seeded(path)
+    return _indexes[key]
+
+
+def store_entities(store):
+    # The index kept alongside a SnapshotStore's datasets.
+    return entity_index(os.path.join(store.root, ENTITIES_FILE))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Register the parties and constituencies in CSVs and look names up.")
+    parser.add_argument('csv', nargs='*', help="CSVs with Party and/or Constituency columns to register")
+    parser.add_argument('--path', default=ENTITIES_PATH)
+    parser.add_argument('--party', action='append', default=[], help="print the ID and label for a party name")
+    parser.add_argument('--constituency', action='append', default=[])
+    args = parser.parse_args()
+
+    index = entity_index(args.path)
+    added = index.register(*(pd.read_csv(path) for path in args.csv))
+    print(f"{len(index.parties)} parties, {len(index.constituencies)} constituencies ({added} new); "
+          f"saved to {index.save()}")
+    for table, values in ((index.parties, args.party), (index.constituencies, args.constituency)):
+        for value in values:
+            entity = table.id(value)
+            label = table.label(entity) if entity >= 0 else '(ambiguous)' if entity == AMBIGUOUS else '(unknown)'
+            print(f"{value!r}: {entity} {label}")
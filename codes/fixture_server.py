@@ -0,0 +1,242 @@
+import os
+import random
+import sys
+import threading
+from functools import partial
+from html import escape
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import requests
+
+from html_tables import find_table, party_table_frame
+from http_client import HEADERS
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'datasets')
+ELECTION_PATH = 'PcResultGenJune2024'
+
+
+def render_index_page(parties_df):
+    rows = []
+    for _, row in parties_df.iterrows():
+        rows.append(
+            f"<tr><td>{escape(row['Party'])}</td><td><a href=\"{escape(row['Link'])}\">{row['Won']}</a></td>"
+            f"<td>{row['Leading']}</td><td>{row['Total']}</td></tr>")
+    return ("<html><head><meta charset=\"utf-8\"></head><body><table class=\"table\">"
+            "<thead><tr><th>Party</th><th>Won</th><th>Leading</th><th>Total</th></tr></thead><tbody>"
+            + ''.join(rows) + "</tbody></table></body></html>")
+
+
+def render_party_page(party_candidates, links=None):
+    # links, when given, holds each row's constituency page, linked from its name as on ECI.
+    rows = []
+    for position, (_, row) in enumerate(party_candidates.iterrows()):
+        constituency = escape(row['Constituency'])
+        if links is not None:
+            constituency = f"<a href=\"{escape(links[position])}\">{constituency}</a>"
+        rows.append(
+            f"<tr><td>{row['Serial Number']}</td><td>{constituency}</td>"
+            f"<td>{escape(row['Winning Candidate'])}</td><td>{row['Total Votes']:,}</td>"
+            f"<td>{row['Margin']:,}</td></tr>")
+    return ("<html><head><meta charset=\"utf-8\"></head><body><table class=\"table table-striped table-bordered\">"
+            "<thead><tr><th>S.No</th><th>Parliament Constituency</th><th>Winning Candidate</th>"
+            "<th>Total Votes</th><th>Margin</th></tr></thead><tbody>"
+            + ''.join(rows) + "</tbody></table></body></html>")
+
+
+def render_constituency_page(constituency, results):
+    # All candidates of one constituency, votes descending, with ECI's closing Total row.
+    rows = []
+    total = int(results['Votes'].sum())
+    for serial, (_, row) in enumerate(results.iterrows(), start=1):
+        rows.append(
+            f"<tr><td>{serial}</td><td>{escape(row['Candidate'])}</td><td>{escape(row['Party'])}</td>"
+            f"<td>{row['Votes']:,}</td><td>0</td><td>{row['Votes']:,}</td>"
+            f"<td>{row['Votes'] / total * 100:.2f}</td></tr>")
+    rows.append(f"<tr><td></td><td>Total</td><td></td><td>{total:,}</td><td>0</td><td>{total:,}</td><td></td></tr>")
+    return (f"<html><head><meta charset=\"utf-8\"></head><body><h2>{escape(constituency)}</h2>"
+            "<table class=\"table table-striped table-bordered\"><thead><tr><th>S.N.</th><th>Candidate</th>"
+            "<th>Party</th><th>EVM Votes</th><th>Postal Votes</th><th>Total Votes</th><th>% of Votes</th></tr>"
+            "</thead><tbody>" + ''.join(rows) + "</tbody></table></body></html>")
+
+
+def synthetic_results(candidate_df, parties, candidates=6, seed=0):
+    # Full results behind each winner in candidate_df: the runner-up trails by the winner's
+    # margin, the rest trail further, each from a different party, and NOTA closes the list.
+    rng = np.random.default_rng(seed)
+    parties = np.asarray(parties, dtype=object)
+    frames = []
+    for position, (constituency, winner, party, votes, margin) in enumerate(zip(
+            candidate_df['Constituency'], candidate_df['Winning Candidate'], candidate_df['Party'],
+            candidate_df['Total Votes'], candidate_df['Margin'])):
+        runner_up = max(int(votes) - int(margin), 0)
+        trailing = np.sort((runner_up * rng.uniform(0.01, 0.6, candidates - 3)).astype(np.int64))[::-1]
+        frames.append(pd.DataFrame({
+            'Constituency': constituency,
+            'Candidate': [winner, *(f"CANDIDATE {position + 1}-{k}" for k in range(2, candidates)), 'NOTA'],
+            'Party': [party, *rng.choice(parties[parties != party], candidates - 2, replace=False),
+                      'None of the Above'],
+            'Votes': [int(votes), runner_up, *trailing.tolist(), int(rng.integers(1_000, 20_000))],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def constituency_page(position):
+    return f"Constituencywise{position + 1:04d}.htm"
+
+
+def build_fixture_site(out_dir, parties_df=None, candidate_df=None, results_df=None):
+    # The index, one winners page per party and one full-results page per constituency;
+    # without results_df the losing candidates are synthesized from the winners' margins.
+    if parties_df is None:
+        parties_df = pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv'))
+    if candidate_df is None:
+        candidate_df = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+    if results_df is None:
+        results_df = synthetic_results(candidate_df, parties_df['Party'])
+
+    site_dir = os.path.join(out_dir, ELECTION_PATH)
+    os.makedirs(site_dir, exist_ok=True)
+    with open(os.path.join(site_dir, 'index.htm'), 'w', encoding='utf-8') as f:
+        f.write(render_index_page(parties_df))
+    pages = {constituency: constituency_page(position)
+             for position, constituency in enumerate(pd.unique(candidate_df['Constituency']))}
+    for _, row in parties_df.iterrows():
+        party_candidates = candidate_df[candidate_df['Party'] == row['Party']]
+        with open(os.path.join(site_dir, row['Link']), 'w', encoding='utf-8') as f:
+            f.write(render_party_page(party_candidates, party_candidates['Constituency'].map(pages).tolist()))
+    for constituency, results in results_df.groupby('Constituency', sort=False):
+        if constituency not in pages:
+            continue
+        with open(os.path.join(site_dir, pages[constituency]), 'w', encoding='utf-8') as f:
+            f.write(render_constituency_page(constituency, results.sort_values('Votes', ascending=False)))
+    return site_dir
+
+
+def layout_table(table_class, cells, rows, header_rows=1, footer=None):
+    # A results table in an election_history.Layout's shape: a title row above the headings
+    # when it has two header rows, unnamed cells headed 'Status' and a closing footer row.
+    title = f"<tr><th colspan=\"{len(cells)}\">Results</th></tr>" if header_rows == 2 else ''
+    headings = ''.join(f"<th>{escape(cell or 'Status')}</th>" for cell in cells)
+    body = [''.join(f"<td>{value}</td>" for value in row) for row in rows]
+    if footer is not None:
+        body.append(f"<td>{escape(footer)}</td>" + "<td></td>" * (len(cells) - 1))
+    return (f"<html><head><meta charset=\"utf-8\"></head><body><table class=\"{table_class}\">"
+            f"<thead>{title}<tr>{headings}</tr></thead><tbody>"
+            + ''.join(f"<tr>{row}</tr>" for row in body) + "</tbody></table></body></html>")
+
+
+def render_layout_index(layout, parties_df):
+    rows = []
+    for _, row in parties_df.iterrows():
+        values = {'Party': escape(row['Party']), 'Won': row['Won'], 'Leading': row['Leading'], 'Total': row['Total']}
+        values[layout.party_link] = f"<a href=\"{escape(row['Link'])}\">{values[layout.party_link]}</a>"
+        rows.append([values.get(cell, '-') for cell in layout.party_cells])
+    return layout_table(layout.party_table, layout.party_cells, rows,
+                        layout.header_rows, layout.footer)
+
+
+def render_layout_party_page(layout, party_candidates):
+    rows = []
+    for _, row in party_candidates.iterrows():
+        values = {'Serial Number': row['Serial Number'], 'Constituency': escape(row['Constituency']),
+                  'Winning Candidate': escape(row['Winning Candidate']),
+                  'Total Votes': f"{row['Total Votes']:,}", 'Margin': f"{row['Margin']:,}"}
+        rows.append([values.get(cell, '-') for cell in layout.candidate_cells])
+    return layout_table(f"table {layout.candidate_table} table-bordered", layout.candidate_cells, rows,
+                        layout.header_rows, layout.footer)
+
+
+def build_election_site(out_dir, layout, path, parties_df=None, candidate_df=None):
+    # The index and winners pages of one election_history.Layout, under out_dir/path.
+    if parties_df is None:
+        parties_df = pd.read_csv(os.path.join(DATASETS_DIR, 'parties_data.csv'))
+    if candidate_df is None:
+        candidate_df = pd.read_csv(os.path.join(DATASETS_DIR, 'candidate_data.csv'))
+
+    site_dir = os.path.join(out_dir, path)
+    os.makedirs(site_dir, exist_ok=True)
+    with open(os.path.join(site_dir, layout.index_page), 'w', encoding='utf-8') as f:
+        f.write(render_layout_index(layout, parties_df))
+    for _, row in parties_df.iterrows():
+        with open(os.path.join(site_dir, row['Link']), 'w', encoding='utf-8') as f:
+            f.write(render_layout_party_page(layout, candidate_df[candidate_df['Party'] == row['Party']]))
+    return site_dir
+
+
+def record_fixtures(base_url, out_dir, index_page='index.htm'):
+    # Saves the live index page and every party page it links to, byte for byte, in the
+    # layout build_fixture_site writes, so benchmarks can replay a real refresh offline.
+    site_dir = os.path.join(out_dir, ELECTION_PATH)
+    os.makedirs(site_dir, exist_ok=True)
+    with requests.Session() as session:
+        index = session.get(f"{base_url}{index_page}", headers=HEADERS)
+        index.raise_for_status()
+        with open(os.path.join(site_dir, 'index.htm'), 'wb') as f:
+            f.write(index.content)
+        for link in party_table_frame(find_table(index.content, 'table'))['Link']:
+            page = session.get(f"{base_url}{link}", headers=HEADERS)
+            page.raise_for_status()
+            with open(os.path.join(site_dir, link), 'wb') as f:
+                f.write(page.content)
+    return site_dir
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    error_rate = 0.0
+    errors = random.Random(0)
+
+    def do_GET(self):
+        # With an error_rate, that share of requests fails with 503 like an overloaded ECI site.
+        if self.error_rate and self.errors.random() < self.error_rate:
+            self.send_error(503, "Service Unavailable")
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping their connections (a crawl killed mid-request) are expected here.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve_fixtures(directory, port=0, error_rate=0.0, seed=0, path=ELECTION_PATH):
+    handler = type('FlakyHandler', (QuietHandler,), {'error_rate': error_rate, 'errors': random.Random(seed)})
+    server = FixtureServer(('127.0.0.1', port), partial(handler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/{path}/"
+    return server, base_url
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Serve ECI result pages locally, built from the datasets or recorded.")
+    parser.add_argument('root', nargs='?', help="fixture directory (default: a new temporary one)")
+    parser.add_argument('--record', metavar='BASE_URL', help="save the pages under BASE_URL into root and exit")
+    parser.add_argument('--serve-only', action='store_true', help="serve root as it is, e.g. recorded pages")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix='eci_fixtures_')
+    if args.record:
+        print(f"Recorded pages into {record_fixtures(args.record, root)}")
+        raise SystemExit
+    if not args.serve_only:
+        build_fixture_site(root)
+    server, base_url = serve_fixtures(root, port=8000, error_rate=args.error_rate)
+    print(f"Serving ECI fixtures at {base_url}index.htm")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
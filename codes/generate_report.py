@@ -1,21 +1,101 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+import os
+import re
+
+import numpy as np
 import pandas as pd
 
-from analyze_data import analyze_data
+from analyze_data import analyze_data, rank_within_groups
+from report_builder import ReportBuilder, existing_charts
+from snapshot_store import load_dataset
+
+# Column headings for the dict-valued insights; anything else gets Key/Value.
+DICT_COLUMNS = {
+    'party_wise_seats': ('Party', 'Seats'),
+    'top_5_parties_by_votes': ('Party', 'Votes'),
+}
+
+
+def insight_label(key):
+    return key.replace('_', ' ').capitalize()
+
+
+def generate_report(insights, path="election_report.pdf", chart_dir=None):
+    # Scalar insights go in one summary table, each dict-valued insight gets its own
+    # table (largest first), then every chart PNG found in chart_dir gets its own page.
+    with ReportBuilder(path, "Election Results Report") as report:
+        scalars = [(insight_label(key), value) for key, value in insights.items() if not isinstance(value, dict)]
+        report.heading("Summary")
+        report.table(['Insight', 'Value'], scalars, widths=[0.65, 0.35], align=['left', 'right'])
+
+        for key, value in insights.items():
+            if isinstance(value, dict):
+                report.heading(insight_label(key))
+                rows = sorted(value.items(), key=lambda item: item[1], reverse=True)
+                report.table(DICT_COLUMNS.get(key, ('Key', 'Value')), rows, widths=[0.75, 0.25],
+                             align=['left', 'right'])
+
+        if chart_dir:
+            from charts import CHARTS
+
+            for name, chart_path in existing_charts(chart_dir, CHARTS):
+                report.new_page()
+                report.image(chart_path, caption=insight_label(name))
+    return report.pages
+
+
+def constituency_groups(df):
+    # (constituency, rows) per constituency, rows ranked by votes, straight from the column
+    # arrays: one factorize and one sort for the whole table, no per-constituency frames.
+    codes, constituencies = pd.factorize(df['Constituency'], sort=True)
+    votes = df['Votes'].to_numpy(dtype=np.int64)
+    candidates = df['Candidate'].to_numpy()
+    parties = df['Party'].to_numpy()
+    order = rank_within_groups(codes, votes, len(constituencies))
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(constituencies)))))
+    order = order[len(order) - offsets[-1]:]  # unmatched (-1) codes sort first
+    for i, constituency in enumerate(constituencies):
+        rows = order[offsets[i]:offsets[i + 1]]
+        yield constituency, candidates[rows], parties[rows], votes[rows]
+
+
+def report_filename(constituency):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(constituency)).strip('_') + '.pdf'
+
+
+def generate_constituency_reports(df, out_dir, chart_paths=()):
+    # One PDF per constituency. Each canvas is saved and dropped before the next starts, so
+    # memory stays at one report's worth however many seats there are. Returns page count.
+    os.makedirs(out_dir, exist_ok=True)
+    pages = 0
+    for constituency, candidates, parties, votes in constituency_groups(df):
+        total = int(votes.sum())
+        margin = int(votes[0] - votes[1]) if len(votes) > 1 else int(votes[0])
+        with ReportBuilder(os.path.join(out_dir, report_filename(constituency)), str(constituency)) as report:
+            report.paragraph(f"Winner: {candidates[0]} ({parties[0]}) by {margin:,} votes "
+                             f"of {total:,} cast across {len(votes)} candidates.")
+            report.space()
+            shares = votes / total * 100 if total else np.zeros(len(votes))
+            rows = ((rank + 1, candidate, party, int(vote), float(share))
+                    for rank, (candidate, party, vote, share) in enumerate(zip(candidates, parties, votes, shares)))
+            report.table(['#', 'Candidate', 'Party', 'Votes', 'Share %'], rows,
+                         widths=[0.06, 0.32, 0.36, 0.14, 0.12], align=['right', 'left', 'left', 'right', 'right'])
+            for chart_path in chart_paths:
+                report.image(chart_path, max_height=300)
+        pages += report.pages
+    return pages
 
-def generate_report(insights):
-    c = canvas.Canvas("election_report.pdf", pagesize=letter)
-    c.drawString(100, 750, "Election Results Report")
-    
-    y = 700
-    for key, value in insights.items():
-        c.drawString(100, y, f"{key}: {value}")
-        y -= 20
-    
-    c.save()
 
 if __name__ == "__main__":
-    cleaned_df = pd.read_csv('cleaned_election_results.csv')
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write the election PDF report, optionally one per constituency.")
+    parser.add_argument('--csv', default='cleaned_election_results.csv')
+    parser.add_argument('--chart-dir', default='.')
+    parser.add_argument('--constituencies', metavar='DIR', help="also write one PDF per constituency into DIR")
+    args = parser.parse_args()
+
+    cleaned_df = load_dataset('election_results', args.csv)
     insights = analyze_data(cleaned_df)
-    generate_report(insights)
+    generate_report(insights, chart_dir=args.chart_dir)
+    if args.constituencies:
+        generate_constituency_reports(cleaned_df, args.constituencies)
@@ -0,0 +1,74 @@
+import lxml.html
+import numpy as np
+import pandas as pd
+
+from records import party_frame
+
+
+def find_table(content, table_class, encoding='utf-8'):
+    # Same match as BeautifulSoup's find('table', class_=...): first table carrying the class token.
+    doc = lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=encoding))
+    tables = doc.xpath(f'//table[contains(concat(" ", normalize-space(@class), " "), " {table_class} ")]')
+    return tables[0] if tables else None
+
+
+def table_columns(table, n_cols, exact=False, link_col=None, header_rows=1):
+    # Pulls the body rows of table into one list per column (plus a list of hrefs from
+    # link_col), skipping the header rows and rows with too few cells.
+    columns = [[] for _ in range(n_cols)]
+    links = []
+    rows = table.iter('tr')
+    for _ in range(header_rows):
+        next(rows, None)
+    for row in rows:
+        cells = list(row.iter('td'))
+        if len(cells) < n_cols or (exact and len(cells) != n_cols):
+            continue
+        for column, cell in zip(columns, cells):
+            column.append(cell.text_content().strip())
+        if link_col is not None:
+            anchor = next(cells[link_col].iter('a'), None)
+            links.append(anchor.get('href') if anchor is not None else None)
+    return columns, links
+
+
+def parse_int_column(values):
+    # Thousands separators are dropped and ECI's '-' placeholder counts as 0.
+    return np.array([int(value.replace(',', '')) if value != '-' else 0 for value in values], dtype=np.int64)
+
+
+def party_table_frame(table):
+    (party, won, leading, total), links = table_columns(table, 4, exact=True, link_col=1)
+    if not party:
+        return pd.DataFrame()
+    return party_frame(party, parse_int_column(won), parse_int_column(leading), parse_int_column(total), links)
+
+
+def candidate_table_frame(table, party_name):
+    (serial, constituency, candidate, total_votes, margin), _ = table_columns(table, 5)
+    if not serial:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        'Serial Number': serial,
+        'Constituency': constituency,
+        'Winning Candidate': candidate,
+        'Total Votes': parse_int_column(total_votes),
+        'Margin': parse_int_column(margin),
+        'Party': party_name,
+    })
+
+
+def constituency_table_frame(table, constituency):
+    # All-candidate results of one constituency page (S.N., Candidate, Party, EVM Votes,
+    # Postal Votes, Total Votes, % of Votes) in election_results.csv's columns; the closing
+    # Total row has no serial number and is skipped.
+    (serial, candidate, party, _, _, total_votes, _), _ = table_columns(table, 7)
+    keep = [i for i, value in enumerate(serial) if value.isdigit()]
+    if not keep:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        'Constituency': constituency,
+        'Candidate': [candidate[i] for i in keep],
+        'Party': [party[i] for i in keep],
+        'Votes': parse_int_column([total_votes[i] for i in keep]),
+    })
@@ -0,0 +1,216 @@
+import cProfile
+import io
+import json
+import pstats
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import requests
+
+# Per-stage and per-URL timing for a run. Code marks its stages with stage('parse') etc. and
+# fetches through get(); both cost nothing until a run activates an Instrumentation, which
+# then collects wall time, call counts, bytes, errors and memory high-water marks and writes
+# them out as a JSON run report. ru_maxrss is the whole process's high-water mark, so a stage
+# gets it as process_peak_rss_mb (the mark when the stage last ended, whatever set it) and,
+# as its own share, peak_rss_growth_mb: how far its calls raised the mark. traced_peak_mb,
+# with trace_memory, is the stage's own tracemalloc peak.
+
+_active = None
+
+
+def peak_rss_mb():
+    # Process-wide high-water mark; ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def empty_stage():
+    return {'calls': 0, 'seconds': 0.0, 'min_seconds': float('inf'), 'max_seconds': 0.0, 'bytes': 0, 'errors': 0,
+            'process_peak_rss_mb': 0.0, 'peak_rss_growth_mb': 0.0}
+
+
+class Instrumentation:
+    def __init__(self, profile=False, trace_memory=False, profile_limit=25):
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_limit = profile_limit
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.urls = {}
+        self.errors = []
+        self.profiler = None
+        self.started_at = None
+        self.start_time = None
+        self.wall_seconds = None
+        self.profile_stats = None
+        self.memory_top = None
+
+    def start(self):
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.start_time = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop(self):
+        self.wall_seconds = time.perf_counter() - self.start_time
+        if self.profiler is not None:
+            self.profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(self.profile_limit)
+            self.profile_stats = out.getvalue()
+        if self.trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            self.memory_top = [{'location': str(stat.traceback), 'size_kb': round(stat.size / 1024, 1),
+                                'count': stat.count}
+                               for stat in snapshot.statistics('lineno')[:self.profile_limit]]
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name, nbytes=0):
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            rss_after = peak_rss_mb()
+            traced_peak = None
+            if self.trace_memory and tracemalloc.is_tracing():
+                # Peak since the previous stage ended; exact for stages that do not overlap.
+                traced_peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+                tracemalloc.reset_peak()
+            with self.lock:
+                entry = self.stages.setdefault(name, empty_stage())
+                entry['calls'] += 1
+                entry['seconds'] += seconds
+                entry['min_seconds'] = min(entry['min_seconds'], seconds)
+                entry['max_seconds'] = max(entry['max_seconds'], seconds)
+                entry['bytes'] += nbytes
+                entry['errors'] += failed
+                entry['process_peak_rss_mb'] = max(entry['process_peak_rss_mb'], rss_after)
+                entry['peak_rss_growth_mb'] += rss_after - rss_before
+                if traced_peak is not None:
+                    entry['traced_peak_mb'] = max(entry.get('traced_peak_mb', 0.0), traced_peak)
+
+    def record_request(self, url, seconds, nbytes, status):
+        with self.lock:
+            entry = self.urls.setdefault(url, {'requests': 0, 'seconds': 0.0, 'bytes': 0, 'status': None})
+            entry['requests'] += 1
+            entry['seconds'] += seconds
+            entry['bytes'] += nbytes
+            entry['status'] = status
+            fetch = self.stages.setdefault('fetch', empty_stage())
+            fetch['calls'] += 1
+            fetch['seconds'] += seconds
+            fetch['min_seconds'] = min(fetch['min_seconds'], seconds)
+            fetch['max_seconds'] = max(fetch['max_seconds'], seconds)
+            fetch['bytes'] += nbytes
+            fetch['errors'] += status is None or status >= 400
+
+    def record_error(self, stage, error, **context):
+        # error is an exception or a plain message for problems that are reported, not raised.
+        kind = type(error).__name__ if isinstance(error, BaseException) else None
+        with self.lock:
+            self.errors.append({'stage': stage, 'type': kind, 'message': str(error), **context})
+
+    def report(self):
+        round_floats = lambda entry: {key: round(value, 4) if isinstance(value, float) else value
+                                      for key, value in entry.items()}
+        return {
+            'started_at': self.started_at,
+            'wall_seconds': round(self.wall_seconds, 4) if self.wall_seconds is not None else None,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'stages': {name: round_floats(entry) for name, entry in self.stages.items()},
+            'urls': {url: round_floats(entry) for url, entry in sorted(self.urls.items())},
+            'errors': self.errors,
+            'profile': self.profile_stats,
+            'memory_top': self.memory_top,
+        }
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+@contextmanager
+def activate(instrumentation):
+    # Makes instrumentation the one stage()/get()/record_error() report to for the block.
+    global _active
+    previous, _active = _active, instrumentation
+    instrumentation.start()
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.stop()
+        _active = previous
+
+
+@contextmanager
+def stage(name, nbytes=0):
+    if _active is None:
+        yield
+        return
+    with _active.stage(name, nbytes):
+        yield
+
+
+def get(url, session=None, **kwargs):
+    # requests GET through session (or plain requests), recorded against url when active.
+    if _active is None:
+        return (session or requests).get(url, **kwargs)
+    start = time.perf_counter()
+    try:
+        response = (session or requests).get(url, **kwargs)
+    except requests.RequestException:
+        _active.record_request(url, time.perf_counter() - start, 0, None)
+        raise
+    _active.record_request(url, time.perf_counter() - start, len(response.content), response.status_code)
+    return response
+
+
+def record_error(stage, error, **context):
+    if _active is not None:
+        _active.record_error(stage, error, **context)
+
+
+def compare_reports(previous, current, tolerance=0.25, min_seconds=0.05, tolerances=None, measure='seconds'):
+    # Stages whose time grew by more than their tolerance (tolerances[stage], else tolerance)
+    # and by at least min_seconds, as (stage, previous, current). measure is the stage field
+    # compared: total 'seconds' for whole runs, 'min_seconds' for repeated benchmark stages.
+    tolerances = tolerances or {}
+    regressions = []
+    for name, entry in current['stages'].items():
+        before = previous['stages'].get(name)
+        if before is None or measure not in before:
+            continue
+        allowed = before[measure] * (1 + tolerances.get(name, tolerance))
+        if entry[measure] - before[measure] >= min_seconds and entry[measure] > allowed:
+            regressions.append((name, before[measure], entry[measure]))
+    return regressions
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python instrumentation.py <previous_report.json> <current_report.json>")
+        sys.exit(1)
+    with open(sys.argv[1]) as f:
+        previous = json.load(f)
+    with open(sys.argv[2]) as f:
+        current = json.load(f)
+    regressions = compare_reports(previous, current)
+    for name, before, after in regressions:
+        print(f"{name}: {before:.3f}s -> {after:.3f}s")
+    sys.exit(1 if regressions else 0)
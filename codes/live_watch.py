@@ -0,0 +1,198 @@
+import json
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from candidate_index import CandidateIndex
+from entities import entity_index
+from new import (BASE_URL, election_closeness, forming_government, independent_candidates_won,
+                 least_5_candidates_by_votes, least_5_candidates_by_votes_top_10_parties,
+                 overall_election_statistics, party_size_distribution, potential_kingmakers,
+                 scrape_all_candidates, scrape_eci_data, top_5_candidates_by_votes,
+                 top_5_candidates_by_votes_top_10_parties)
+from records import candidate_frame
+
+COUNT_COLUMNS = ['Won', 'Leading', 'Total']
+
+
+def top_10_parties(df):
+    return set(df.nlargest(10, 'Total')['Party'])
+
+
+def affects_any_party(change):
+    return bool(change['parties'])
+
+
+def affects_independents(change):
+    # The same test independent_candidates_won() counts by.
+    return bool(entity_index().parties.independent_mask(pd.Series(change['parties'], dtype=object)).any())
+
+
+def affects_candidates(change):
+    return bool(change['candidate_parties'])
+
+
+def affects_top_10_parties(change):
+    return (change['top_10_changed']
+            or bool(set(change['candidate_parties']) & top_10_parties(change['df'])))
+
+
+# Insight name, function, the frames it takes (by parameter name; 'index' is a CandidateIndex
+# over candidate_df built once per tick), and the predicate deciding whether a tick's changes
+# can alter its output. Order matches new.main().
+INSIGHTS = [
+    ('election_closeness', election_closeness, ('df',), affects_any_party),
+    ('forming_government', forming_government, ('df',), affects_any_party),
+    ('overall_election_statistics', overall_election_statistics, ('df',), affects_any_party),
+    ('party_size_distribution', party_size_distribution, ('df',), affects_any_party),
+    ('potential_kingmakers', potential_kingmakers, ('df',), affects_any_party),
+    ('independent_candidates_won', independent_candidates_won, ('df',), affects_independents),
+    ('top_5_candidates_by_votes', top_5_candidates_by_votes, ('candidate_df',), affects_candidates),
+    ('top_5_candidates_by_votes_top_10_parties', top_5_candidates_by_votes_top_10_parties, ('df', 'candidate_df', 'index'),
+     affects_top_10_parties),
+    ('least_5_candidates_by_votes', least_5_candidates_by_votes, ('candidate_df',), affects_candidates),
+    ('least_5_candidates_by_votes_top_10_parties', least_5_candidates_by_votes_top_10_parties, ('df', 'candidate_df', 'index'),
+     affects_top_10_parties),
+]
+
+
+def diff_party_tables(previous, current):
+    # One row per party whose Won/Leading/Total differ between the two snapshots, including
+    # parties that appeared or disappeared (their missing side counts as 0).
+    merged = previous.set_index('Party')[COUNT_COLUMNS].join(
+        current.set_index('Party')[COUNT_COLUMNS], how='outer', lsuffix=' Before', rsuffix=' After')
+    merged = merged.fillna(0).astype('int64')
+    changed = pd.Series(False, index=merged.index)
+    for column in COUNT_COLUMNS:
+        merged[f'{column} Delta'] = merged[f'{column} After'] - merged[f'{column} Before']
+        changed |= merged[f'{column} Delta'] != 0
+    return merged[changed].reset_index()
+
+
+class LiveWatcher:
+    def __init__(self, base_url=BASE_URL, interval=60, workers=8, rate_limit=10.0, cache=None,
+                 insights_path='election_insights.txt', changelog_path='live_changelog.jsonl'):
+        self.base_url = base_url
+        self.interval = interval
+        self.workers = workers
+        self.rate_limit = rate_limit
+        self.cache = cache
+        self.insights_path = insights_path
+        self.changelog_path = changelog_path
+        self.df = None
+        self.party_frames = {}
+        self.pending = set()  # parties whose last refetch failed, retried every tick
+        self.candidate_df = pd.DataFrame()
+        self.insights = {}
+        self.ticks = 0
+
+    def refetch(self, parties_df):
+        # A party with seats whose page came back empty failed to fetch: its previous frame
+        # is kept and it stays pending until a later tick fetches it.
+        fetched = scrape_all_candidates(parties_df, self.base_url, self.workers, self.rate_limit,
+                                        cache=self.cache)
+        frames = dict(tuple(fetched.groupby('Party', sort=False))) if not fetched.empty else {}
+        self.pending = set()
+        for party, total in zip(parties_df['Party'], parties_df['Total']):
+            if party in frames:
+                self.party_frames[party] = frames[party]
+            elif total > 0:
+                self.pending.add(party)
+            else:
+                self.party_frames.pop(party, None)
+
+    def patch_candidates(self, df):
+        frames = [self.party_frames[party] for party in df['Party'] if party in self.party_frames]
+        self.candidate_df = candidate_frame(frames)
+
+    def tick(self):
+        started = time.perf_counter()
+        current = scrape_eci_data(f"{self.base_url}index.htm", cache=self.cache)
+
+        if self.df is None:
+            deltas = diff_party_tables(current.iloc[:0], current)
+            changed_parties = list(current['Party'])
+            top_10_changed = True
+        else:
+            deltas = diff_party_tables(self.df, current)
+            changed_parties = list(deltas['Party'])
+            top_10_changed = top_10_parties(self.df) != top_10_parties(current)
+
+        refetch_df = current[current['Party'].isin(changed_parties) | current['Party'].isin(self.pending)]
+        if not refetch_df.empty:
+            self.refetch(refetch_df)
+        removed = set(self.party_frames) - set(current['Party'])
+        for party in removed:
+            del self.party_frames[party]
+        self.patch_candidates(current)
+        self.df = current
+
+        change = {
+            'parties': changed_parties,
+            'candidate_parties': list(refetch_df['Party']) + sorted(removed),
+            'top_10_changed': top_10_changed,
+            'df': current,
+        }
+        recomputed = []
+        frames = {'df': current, 'candidate_df': self.candidate_df}
+        for name, func, inputs, affected in INSIGHTS:
+            if 'candidate_df' in inputs and self.candidate_df.empty:
+                self.insights.pop(name, None)
+                continue
+            if name in self.insights and not affected(change):
+                continue
+            if 'index' in inputs and 'index' not in frames:
+                frames['index'] = CandidateIndex(self.candidate_df)
+            self.insights[name] = func(**{frame: frames[frame] for frame in inputs})
+            recomputed.append(name)
+
+        if recomputed:
+            self.write_insights()
+
+        self.ticks += 1
+        record = {
+            'tick': self.ticks,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'duration_seconds': round(time.perf_counter() - started, 3),
+            'deltas': deltas.to_dict(orient='records'),
+            'refetched_parties': list(refetch_df['Party']),
+            'pending_parties': sorted(self.pending),
+            'recomputed_insights': recomputed,
+        }
+        with open(self.changelog_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        return record
+
+    def write_insights(self):
+        with open(self.insights_path, 'w') as f:
+            for name, _, _, _ in INSIGHTS:
+                if name in self.insights:
+                    f.write(self.insights[name] + '\n\n')
+
+    def run(self, max_ticks=None):
+        # max_ticks counts polls, failed ones included; there is no wait after the last.
+        polls = 0
+        while max_ticks is None or polls < max_ticks:
+            polls += 1
+            started = time.monotonic()
+            try:
+                record = self.tick()
+                print(f"Tick {record['tick']}: {len(record['deltas'])} parties changed, "
+                      f"{len(record['recomputed_insights'])} insights recomputed")
+            except Exception as e:
+                print(f"Error during live refresh: {str(e)}")
+            if polls == max_ticks:
+                break
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Watch ECI results and refresh only what changed.")
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--interval', type=float, default=60, help="seconds between polls")
+    parser.add_argument('--ticks', type=int, default=None, help="stop after this many polls")
+    args = parser.parse_args()
+    LiveWatcher(args.base_url, args.interval).run(args.ticks)
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+import compute_insights
+import new
+from candidate_index import CandidateIndex
+from entities import entity_index
+from snapshot_store import apply_schema
+
+# Insight text, charts and the derived CSVs kept on disk as materialized views. Each view
+# names the input columns it reads; the manifest records the digest of exactly those
+# columns for every view it built, so a refresh rebuilds only views whose inputs changed (new
+# candidate rows leave the party-table views alone, a changed Link rebuilds nothing) and
+# readers serve whatever the manifest says is current without recomputing anything.
+
+VIEWS_MANIFEST = 'views_manifest.json'
+INSIGHTS_FILE = 'election_insights.txt'
+
+PARTY_TOTALS = ['Party', 'Total']
+CANDIDATE_COLUMNS = ['Serial Number', 'Constituency', 'Winning Candidate', 'Total Votes', 'Margin', 'Party']
+
+
+def party_abbreviation(party):
+    return entity_index().parties.abbreviation(party)
+
+
+def closeness_dataset(df):
+    result = compute_insights.election_closeness(df)
+    return pd.DataFrame({'Parties': [party_abbreviation(party) for party in result.parties],
+                         'Number Of Seats': result.totals})
+
+
+def statistics_dataset(df):
+    result = compute_insights.overall_election_statistics(df)
+    return pd.DataFrame({'Statistic': ['Total Seats', 'Total Parties', 'Average Seats per Party'],
+                         'Value': [float(result.total_seats), float(result.total_parties), round(result.avg_seats, 2)]})
+
+
+def independents_dataset(df):
+    return pd.DataFrame({'Category': ['Independent Candidates'],
+                         'Count': [compute_insights.independent_candidates_won(df).total]})
+
+
+def size_distribution_dataset(df):
+    # Headers as in the PowerBI model: Size is the bin, Category the number of parties in it.
+    distribution = compute_insights.party_size_distribution(df).distribution
+    return pd.DataFrame({'Size': distribution.index.astype(str), 'Category': distribution.to_numpy()})
+
+
+def kingmakers_dataset(df):
+    return compute_insights.potential_kingmakers(df).kingmakers[['Party', 'Total']]
+
+
+@dataclass
+class View:
+    name: str
+    insight: object  # new.py insight: (*input frames, charts) -> summary, queueing its chart
+    inputs: dict  # input name ('parties' / 'candidates') -> columns the view reads
+    dataset: object = None  # optional (parties frame) -> DataFrame written as <name>.csv
+    chart: bool = True
+    indexed: bool = False  # insight takes index=, a CandidateIndex shared across one refresh
+
+
+# Order matches election_insights.txt.
+VIEWS = [
+    View('election_closeness', new.election_closeness, {'parties': PARTY_TOTALS}, closeness_dataset),
+    View('forming_government', new.forming_government, {'parties': PARTY_TOTALS}),
+    View('overall_election_statistics', new.overall_election_statistics, {'parties': PARTY_TOTALS},
+         statistics_dataset),
+    View('party_size_distribution', new.party_size_distribution, {'parties': PARTY_TOTALS},
+         size_distribution_dataset),
+    View('potential_kingmakers', new.potential_kingmakers, {'parties': PARTY_TOTALS}, kingmakers_dataset),
+    View('independent_candidates_won', new.independent_candidates_won, {'parties': PARTY_TOTALS},
+         independents_dataset),
+    View('top_5_candidates_by_votes', new.top_5_candidates_by_votes, {'candidates': CANDIDATE_COLUMNS}),
+    View('top_5_candidates_by_votes_top_10_parties', new.top_5_candidates_by_votes_top_10_parties,
+         {'parties': PARTY_TOTALS, 'candidates': CANDIDATE_COLUMNS}, indexed=True),
+    View('least_5_candidates_by_votes', new.least_5_candidates_by_votes, {'candidates': CANDIDATE_COLUMNS}),
+    View('least_5_candidates_by_votes_top_10_parties', new.least_5_candidates_by_votes_top_10_parties,
+         {'parties': PARTY_TOTALS, 'candidates': CANDIDATE_COLUMNS}, indexed=True),
+]
+
+# Dataset names for the CSV file each view writes, as the PowerBI model expects them.
+DATASET_FILES = {
+    'election_closeness': 'election_closeness.csv',
+    'overall_election_statistics': 'election_statistics.csv',
+    'party_size_distribution': 'party_size_distribution.csv',
+    'potential_kingmakers': 'potential_kingmakers.csv',
+    'independent_candidates_won': 'independent_candidates_won.csv',
+}
+
+
+# The inputs themselves, exported under their dataset names whenever they change.
+EXPORTS = {'parties_data': ('parties', 'parties_data.csv'), 'candidate_data': ('candidates', 'candidate_data.csv')}
+
+
+def input_digest(source, df, columns):
+    # Values in the snapshot schema only, so a scraped frame (text serial numbers) digests
+    # the same as the int32/categorical frame read back from its snapshot.
+    df = apply_schema(source, df[columns])
+    digest = hashlib.sha256(repr(columns).encode())
+    for column in columns:
+        digest.update(pd.util.hash_pandas_object(df[column], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class MaterializedViews:
+    def __init__(self, out_dir='.', dataset_dir=None, chart_workers=None):
+        self.out_dir = out_dir
+        self.dataset_dir = dataset_dir or out_dir
+        self.chart_workers = chart_workers
+        self.text_dir = os.path.join(out_dir, 'views')
+        self.manifest_path = os.path.join(out_dir, VIEWS_MANIFEST)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {}
+
+    def artifacts(self, view):
+        paths = {'text': os.path.join(self.text_dir, f'{view.name}.txt')}
+        if view.chart:
+            paths['chart'] = os.path.join(self.out_dir, f'{view.name}.png')
+        if view.dataset is not None:
+            paths['dataset'] = os.path.join(self.dataset_dir, DATASET_FILES[view.name])
+        return paths
+
+    def digests(self, view, frames):
+        return {name: input_digest(name, frames[name], columns) for name, columns in view.inputs.items()}
+
+    def is_fresh(self, view, digests):
+        entry = self.manifest.get(view.name)
+        return (entry is not None and entry['inputs'] == digests
+                and all(os.path.exists(path) for path in entry['artifacts'].values()))
+
+    def refresh(self, parties_df, candidate_df, force=False):
+        # Rebuilds the stale views and election_insights.txt if any view changed; returns the
+        # names rebuilt. Views reading candidates are dropped while there is no candidate data.
+        from charts import ChartRenderer
+
+        frames = {'parties': parties_df, 'candidates': candidate_df}
+        if candidate_df.empty:
+            print("No candidate-specific insights could be generated due to lack of data.")
+        charts = ChartRenderer(self.out_dir, self.chart_workers)
+        os.makedirs(self.text_dir, exist_ok=True)
+        rebuilt = []
+        index = None
+        for view in VIEWS:
+            if 'candidates' in view.inputs and candidate_df.empty:
+                if self.manifest.pop(view.name, None) is not None:
+                    rebuilt.append(view.name)
+                continue
+            digests = self.digests(view, frames)
+            if not force and self.is_fresh(view, digests):
+                continue
+            paths = self.artifacts(view)
+            options = {}
+            if view.indexed:
+                index = index or CandidateIndex(candidate_df)
+                options['index'] = index
+            summary = view.insight(*(frames[name] for name in view.inputs), charts, **options)
+            with open(paths['text'], 'w') as f:
+                f.write(summary)
+            if view.dataset is not None:
+                view.dataset(parties_df).to_csv(paths['dataset'], index=False)
+            self.manifest[view.name] = {'inputs': digests, 'artifacts': paths, 'built_at': time.time()}
+            rebuilt.append(view.name)
+        charts.flush()
+
+        for name, (source, filename) in EXPORTS.items():
+            frame = frames[source]
+            digests = {source: input_digest(source, frame, list(frame.columns))}
+            entry = self.manifest.get(name)
+            path = os.path.join(self.dataset_dir, filename)
+            if frame.empty or (not force and entry is not None and entry['inputs'] == digests and os.path.exists(path)):
+                continue
+            frame.to_csv(path, index=False)
+            self.manifest[name] = {'inputs': digests, 'artifacts': {'dataset': path}, 'built_at': time.time()}
+            rebuilt.append(name)
+
+        if set(rebuilt) - set(EXPORTS) or not os.path.exists(os.path.join(self.out_dir, INSIGHTS_FILE)):
+            self.write_insights()
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        return rebuilt
+
+    def write_insights(self):
+        with open(os.path.join(self.out_dir, INSIGHTS_FILE), 'w') as f:
+            for summary in self.summaries():
+                f.write(summary + '\n\n')
+
+    def summaries(self):
+        return [self.read(view.name) for view in VIEWS if view.name in self.manifest]
+
+    def read(self, name):
+        # The materialized text of one view, straight from disk.
+        with open(self.manifest[name]['artifacts']['text']) as f:
+            return f.read()
+
+    def read_dataset(self, name):
+        return pd.read_csv(self.manifest[name]['artifacts']['dataset'])
+
+    def artifact_path(self, name, kind):
+        return self.manifest[name]['artifacts'][kind]
+
+    def etag(self, name):
+        inputs = self.manifest[name]['inputs']
+        return hashlib.sha256(''.join(inputs[source] for source in sorted(inputs)).encode()).hexdigest()
+
+
+CONTENT_TYPES = {'text': 'text/plain; charset=utf-8', 'chart': 'image/png', 'dataset': 'text/csv; charset=utf-8'}
+
+
+class ViewHandler(BaseHTTPRequestHandler):
+    # GET /views lists the manifest; GET /views/<name>/<text|chart|dataset> returns that
+    # artifact with the view's input digest as ETag, so unchanged views answer 304.
+    views = None
+
+    def do_GET(self):
+        parts = urlsplit(self.path).path.strip('/').split('/')
+        if parts == ['views']:
+            return self.send_json(200, self.views.manifest)
+        if len(parts) != 3 or parts[0] != 'views' or parts[1] not in self.views.manifest:
+            return self.send_json(404, {'error': f"Unknown view: {self.path}"})
+        name, kind = parts[1], parts[2]
+        if kind not in self.views.manifest[name]['artifacts']:
+            return self.send_json(404, {'error': f"{name} has no {kind}"})
+        etag = f'"{self.views.etag(name)}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.send(304, None, b'', etag)
+        with open(self.views.artifact_path(name, kind), 'rb') as f:
+            self.send(200, CONTENT_TYPES[kind], f.read(), etag)
+
+    def send_json(self, status, payload):
+        self.send(status, 'application/json', json.dumps(payload).encode('utf-8'))
+
+    def send(self, status, content_type, body, etag=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_views(views, host='127.0.0.1', port=8081):
+    handler = type('BoundViewHandler', (ViewHandler,), {'views': views})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from snapshot_store import SnapshotStore
+
+    parser = argparse.ArgumentParser(description="Rebuild stale insight views from the latest snapshot, or serve them.")
+    parser.add_argument('--store-dir', default='snapshots')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--dataset-dir', help="where the PowerBI CSVs go (default: --out-dir)")
+    parser.add_argument('--force', action='store_true', help="rebuild every view")
+    parser.add_argument('--serve', type=int, metavar='PORT', help="serve the views over HTTP instead of refreshing")
+    args = parser.parse_args()
+
+    views = MaterializedViews(args.out_dir, args.dataset_dir)
+    if args.serve:
+        print(f"Serving views on http://127.0.0.1:{args.serve}/views")
+        serve_views(views, port=args.serve).serve_forever()
+    else:
+        store = SnapshotStore(args.store_dir)
+        version = store.versions('parties')[-1]
+        candidates = store.read('candidates', version) if version in store.versions('candidates') else pd.DataFrame()
+        rebuilt = views.refresh(store.read('parties', version), candidates, args.force)
+        print(f"Rebuilt {', '.join(rebuilt) or 'nothing'}")
@@ -0,0 +1,183 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+import instrumentation
+
+PIPELINE_CACHE_DIR = '.pipeline_cache'
+
+
+class Step:
+    # One node of the DAG: func(*outputs of inputs, **params). files are paths whose contents
+    # feed the cache key; targets are files the step writes, so a cached step whose targets
+    # were deleted runs again; check, for files only known once the step has run, is called
+    # with the cached output and the step runs again unless it returns True. Steps with
+    # cache=False always run (e.g. a live scrape) and their output digest, rather than their
+    # key, is what downstream keys hash.
+    def __init__(self, name, func, inputs=(), params=None, files=(), targets=(), cache=True, check=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = params or {}
+        self.files = tuple(files)
+        self.targets = tuple(targets)
+        self.cache = cache
+        self.check = check
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def func_source(func):
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return f"{func.__module__}.{func.__qualname__}"
+
+
+def output_digest(value):
+    # Pickled DataFrames are not byte-stable across processes, so frames hash their values.
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), [str(dtype) for dtype in value.dtypes])).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+class Pipeline:
+    def __init__(self, steps, cache_dir=PIPELINE_CACHE_DIR, workers=None):
+        self.steps = {step.name: step for step in steps}
+        self.cache_dir = cache_dir
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        for step in steps:
+            for name in step.inputs:
+                if name not in self.steps:
+                    raise Exception(f"Step {step.name} depends on unknown step {name}")
+        self.order = self.topological_order()
+
+    def topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise Exception(f"Pipeline has a cycle through step {name}")
+            visiting.add(name)
+            for dependency in self.steps[name].inputs:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.steps:
+            visit(name)
+        return order
+
+    def key(self, step, fingerprints):
+        # Content hash of everything that determines the output: the step's code, its
+        # parameters, its input files and the fingerprints of its upstream steps.
+        payload = {
+            'name': step.name,
+            'source': func_source(step.func),
+            'params': repr(sorted(step.params.items())),
+            'files': {path: file_digest(path) for path in step.files},
+            'inputs': [fingerprints[name] for name in step.inputs],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def output_path(self, name, key):
+        return os.path.join(self.cache_dir, f'{name}-{key[:16]}.pkl')
+
+    def is_materialized(self, step, key):
+        return (step.cache and os.path.exists(self.output_path(step.name, key))
+                and all(os.path.exists(path) for path in step.targets)
+                and (step.check is None or step.check(self.load(step.name, key))))
+
+    def load(self, name, key):
+        with open(self.output_path(name, key), 'rb') as f:
+            return pickle.load(f)
+
+    def store(self, name, key, value):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.output_path(name, key)
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    def run(self, only=None):
+        # Runs the DAG (or only the named steps and what they depend on), starting every step
+        # as soon as its inputs are ready so independent branches overlap. Cached steps are
+        # not loaded unless a step that has to run needs their output. Returns a report of
+        # {step: {'status': 'ran' | 'cached', 'seconds': ...}}.
+        wanted = self.required(only) if only else set(self.order)
+        outputs, keys, fingerprints, report = {}, {}, {}, {}
+
+        def value(name):
+            if name not in outputs:
+                outputs[name] = self.load(name, keys[name])
+            return outputs[name]
+
+        def execute(step, args):
+            start = time.perf_counter()
+            with instrumentation.stage(f'step:{step.name}'):
+                result = step.func(*args, **step.params)
+            return result, time.perf_counter() - start
+
+        pending = [name for name in self.order if name in wanted]
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    step = self.steps[name]
+                    if any(dependency not in fingerprints for dependency in step.inputs):
+                        continue
+                    pending.remove(name)
+                    keys[name] = self.key(step, fingerprints)
+                    if self.is_materialized(step, keys[name]):
+                        fingerprints[name] = keys[name]
+                        report[name] = {'status': 'cached', 'seconds': 0.0}
+                        continue
+                    args = [value(dependency) for dependency in step.inputs]
+                    running[executor.submit(execute, step, args)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    step = self.steps[name]
+                    result, seconds = future.result()
+                    outputs[name] = result
+                    if step.cache:
+                        self.store(name, keys[name], result)
+                        fingerprints[name] = keys[name]
+                    else:
+                        fingerprints[name] = output_digest(result)
+                    report[name] = {'status': 'ran', 'seconds': round(seconds, 3)}
+
+        return {name: report[name] for name in self.order if name in report}
+
+    def required(self, names):
+        wanted, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name not in wanted:
+                wanted.add(name)
+                stack.extend(self.steps[name].inputs)
+        return wanted
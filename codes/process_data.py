@@ -1,13 +1,89 @@
+import os
+import resource
+from contextlib import nullcontext
+
 import pandas as pd
 
+from snapshot_store import SnapshotStore
+
 def clean_data(df):
     # Convert numerical columns to appropriate data types
-    df['Votes'] = df['Votes'].str.replace(',', '').astype(int)
+    if not pd.api.types.is_integer_dtype(df['Votes']):
+        df['Votes'] = df['Votes'].str.replace(',', '').astype(int)
     
     # Additional cleaning steps as necessary
     return df
 
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def current_rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+def estimate_row_bytes(csv_path, sample_rows=10000):
+    # Parsed size of one row plus parser buffers (about 3x the frame).
+    sample = pd.read_csv(csv_path, nrows=sample_rows, thousands=',')
+    return max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1) * 3
+
+def rows_within_ceiling(row_bytes, memory_limit_mb):
+    # A sixth of the headroom left under the ceiling: converting a chunk for the CSV and
+    # snapshot sinks roughly doubles it, and allocator slack eats the rest.
+    headroom_mb = memory_limit_mb - current_rss_mb()
+    if headroom_mb <= 0:
+        raise MemoryError(f"Memory ceiling of {memory_limit_mb} MB is below the current RSS "
+                          f"of {current_rss_mb():.0f} MB")
+    return max(int(headroom_mb * 1024 * 1024 / 6 / row_bytes), 1000)
+
+def clean_data_chunked(csv_path, out_csv=None, store=None, memory_limit_mb=512, chunk_rows=None):
+    # Streams csv_path through clean_data in bounded chunks, appending each cleaned chunk to
+    # out_csv and/or a new snapshot in store. Without a fixed chunk_rows the chunk size is
+    # re-derived from the remaining headroom after every chunk; MemoryError is raised if peak
+    # RSS passes the ceiling anyway.
+    row_bytes = estimate_row_bytes(csv_path) if chunk_rows is None else None
+    largest_chunk = 0
+    chunks = 0
+    rows = 0
+    writer = store.writer('election_results') if store is not None else None
+    with writer or nullcontext(), pd.read_csv(csv_path, iterator=True, thousands=',') as reader:
+        while True:
+            size = chunk_rows or rows_within_ceiling(row_bytes, memory_limit_mb)
+            try:
+                chunk = reader.get_chunk(size)
+            except StopIteration:
+                break
+            cleaned = clean_data(chunk)
+            if writer is not None:
+                writer.write(cleaned)
+            if out_csv is not None:
+                cleaned.to_csv(out_csv, mode='w' if chunks == 0 else 'a', header=chunks == 0, index=False)
+            chunks += 1
+            rows += len(cleaned)
+            largest_chunk = max(largest_chunk, len(cleaned))
+            del chunk, cleaned
+            if peak_rss_mb() > memory_limit_mb:
+                raise MemoryError(f"Peak RSS {peak_rss_mb():.0f} MB exceeded the {memory_limit_mb} MB ceiling "
+                                  f"after {chunks} chunks; lower chunk_rows")
+
+    return {'rows': rows, 'chunks': chunks, 'chunk_rows': largest_chunk, 'peak_rss_mb': round(peak_rss_mb(), 1)}
+
 if __name__ == "__main__":
-    election_results_df = pd.read_csv('election_results.csv')
-    cleaned_df = clean_data(election_results_df)
-    cleaned_df.to_csv('cleaned_election_results.csv', index=False)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Clean election_results.csv into the snapshot store and CSV.")
+    parser.add_argument('--chunked', action='store_true', help="stream the input in bounded chunks")
+    parser.add_argument('--memory-limit-mb', type=int, default=512)
+    parser.add_argument('--chunk-rows', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.chunked:
+        stats = clean_data_chunked('election_results.csv', 'cleaned_election_results.csv', SnapshotStore(),
+                                   args.memory_limit_mb, args.chunk_rows)
+        print(f"Cleaned {stats['rows']:,} rows in {stats['chunks']} chunks of up to {stats['chunk_rows']:,}; "
+              f"peak RSS {stats['peak_rss_mb']} MB")
+    else:
+        election_results_df = pd.read_csv('election_results.csv')
+        cleaned_df = clean_data(election_results_df)
+        SnapshotStore().write('election_results', cleaned_df)
+        cleaned_df.to_csv('cleaned_election_results.csv', index=False)
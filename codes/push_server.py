@@ -0,0 +1,295 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import socket
+import time
+from urllib.parse import urlsplit
+
+import instrumentation
+from live_watch import COUNT_COLUMNS, INSIGHTS, LiveWatcher
+from new import BASE_URL
+
+# Live seat counts and insights pushed to dashboards over Server-Sent Events or WebSocket.
+# One poller drives LiveWatcher on the interval; a tick's changes (the counts of parties that
+# moved, the text of insights that now read differently) are encoded once per protocol and
+# the same bytes are queued to every client. Each client has a short queue emptied by its
+# own writer, which waits for the socket to drain: a client that falls queue_size messages
+# behind has its backlog replaced by one snapshot of the current state, and one that stops
+# reading for send_timeout seconds is disconnected.
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+DASHBOARD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'live.html')
+MAX_CLIENT_FRAME = 64 * 1024
+
+SSE_RESPONSE = (b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n'
+                b'Connection: keep-alive\r\nAccess-Control-Allow-Origin: *\r\n\r\n')
+
+
+def ws_frame(payload, opcode=0x1):
+    # A single unmasked, unfragmented server frame (RFC 6455 section 5.2).
+    n = len(payload)
+    if n < 126:
+        header = bytes([0x80 | opcode, n])
+    elif n < 1 << 16:
+        header = bytes([0x80 | opcode, 126]) + n.to_bytes(2, 'big')
+    else:
+        header = bytes([0x80 | opcode, 127]) + n.to_bytes(8, 'big')
+    return header + payload
+
+
+async def read_ws_frame(reader):
+    # (opcode, payload) of the next client frame; clients mask everything they send.
+    first, second = await reader.readexactly(2)
+    n = second & 0x7f
+    if n == 126:
+        n = int.from_bytes(await reader.readexactly(2), 'big')
+    elif n == 127:
+        n = int.from_bytes(await reader.readexactly(8), 'big')
+    if n > MAX_CLIENT_FRAME:
+        raise ConnectionError(f"Client frame of {n} bytes")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(n)
+    if mask:
+        payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    return first & 0x0f, payload
+
+
+def ws_accept(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+
+
+class Message:
+    # One event in both wire formats; every client is handed the same two byte strings.
+    def __init__(self, sse, ws):
+        self.sse = sse
+        self.ws = ws
+
+    @classmethod
+    def event(cls, event, payload):
+        data = json.dumps(payload, separators=(',', ':'))
+        return cls(f"event: {event}\ndata: {data}\n\n".encode('utf-8'),
+                   ws_frame(f'{{"event":"{event}","data":{data}}}'.encode('utf-8')))
+
+
+HEARTBEAT = Message(b': ping\n\n', ws_frame(b'', opcode=0x9))
+
+
+class Client:
+    def __init__(self, writer, protocol, queue_size):
+        self.writer = writer
+        self.protocol = protocol
+        self.queue = asyncio.Queue(queue_size)
+
+    def offer(self, message, snapshot):
+        # Never blocks the broadcast: a full queue is dropped for the snapshot, which already
+        # includes every delta it held. Returns whether the client had to be resynced.
+        try:
+            self.queue.put_nowait(message)
+            return False
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(snapshot or message)
+            return True
+
+    async def send_loop(self, send_timeout, stats):
+        while True:
+            payload = getattr(await self.queue.get(), self.protocol)
+            self.writer.write(payload)
+            await asyncio.wait_for(self.writer.drain(), send_timeout)
+            stats['sent_bytes'] += len(payload)
+
+
+class PushServer:
+    def __init__(self, watcher, interval=60, heartbeat=15, queue_size=8, write_buffer=64 * 1024, send_timeout=30):
+        self.watcher = watcher
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+        self.write_buffer = write_buffer
+        self.send_timeout = send_timeout
+        self.clients = set()
+        self.seats = {}
+        self.insights = {}
+        self.snapshot = None
+        self.state = None
+        self.stats = {'ticks': 0, 'published': 0, 'encoded_bytes': 0, 'sent_bytes': 0, 'connections': 0,
+                      'resyncs': 0, 'dropped': 0}
+
+    def publish(self, record):
+        # Folds one LiveWatcher tick into the current state and fans out what changed; a tick
+        # that moved nothing sends nothing.
+        self.stats['ticks'] += 1
+        df = self.watcher.df
+        seats = dict(zip(df['Party'], df[COUNT_COLUMNS].to_numpy().tolist()))
+        seat_delta = {party: counts for party, counts in seats.items() if self.seats.get(party) != counts}
+        seat_delta.update({party: None for party in self.seats if party not in seats})
+        insights = {name: self.watcher.insights[name] for name, _, _, _ in INSIGHTS if name in self.watcher.insights}
+        insight_delta = {name: text for name, text in insights.items() if self.insights.get(name) != text}
+        insight_delta.update({name: None for name in self.insights if name not in insights})
+        if not seat_delta and not insight_delta:
+            return None
+
+        self.seats, self.insights = seats, insights
+        published_at = time.time()
+        with instrumentation.stage('push.publish'):
+            self.state = {'tick': record['tick'], 'published_at': published_at, 'seats': seats, 'insights': insights}
+            self.snapshot = Message.event('snapshot', self.state)
+            message = Message.event('delta', {'tick': record['tick'], 'published_at': published_at,
+                                              'seats': seat_delta, 'insights': insight_delta})
+            self.stats['encoded_bytes'] += len(message.sse) + len(message.ws)
+            self.stats['published'] += 1
+            self.broadcast(message)
+        return message
+
+    def broadcast(self, message):
+        for client in self.clients:
+            self.stats['resyncs'] += client.offer(message, self.snapshot)
+
+    async def poll(self, max_ticks=None):
+        # The scrape runs on a worker thread so the event loop keeps serving clients meanwhile.
+        # max_ticks counts polls, failed ones included; there is no wait after the last.
+        loop = asyncio.get_running_loop()
+        polls = 0
+        while max_ticks is None or polls < max_ticks:
+            polls += 1
+            started = loop.time()
+            try:
+                record = await loop.run_in_executor(None, self.watcher.tick)
+                message = self.publish(record)
+                print(f"Tick {record['tick']}: {len(record['deltas'])} parties changed, "
+                      f"{len(self.clients)} clients, {len(message.sse) if message else 0} bytes pushed")
+            except Exception as e:
+                print(f"Error during live refresh: {str(e)}")
+                instrumentation.record_error('push.poll', e)
+            if polls == max_ticks:
+                break
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    async def flush_clients(self):
+        # Gives connected clients up to send_timeout to take what is still queued for them.
+        deadline = asyncio.get_running_loop().time() + self.send_timeout
+        while any(not client.queue.empty() for client in self.clients):
+            if asyncio.get_running_loop().time() >= deadline:
+                break
+            await asyncio.sleep(0.05)
+
+    async def heartbeats(self):
+        # Keeps idle connections open through proxies and surfaces dead ones.
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self.broadcast(HEARTBEAT)
+
+    async def handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), 10)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode('latin-1').split('\r\n')
+        path = urlsplit(lines[0].split(' ')[1] if ' ' in lines[0] else '/').path
+        headers = {name.strip().lower(): value.strip() for name, _, value in
+                   (line.partition(':') for line in lines[1:] if line)}
+
+        if path == '/events':
+            writer.write(SSE_RESPONSE)
+            await self.stream(reader, writer, 'sse')
+        elif path == '/ws' and headers.get('upgrade', '').lower() == 'websocket' and 'sec-websocket-key' in headers:
+            writer.write(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                         b'Sec-WebSocket-Accept: ' + ws_accept(headers['sec-websocket-key']).encode() + b'\r\n\r\n')
+            await self.stream(reader, writer, 'ws')
+        elif path == '/state':
+            self.respond(writer, 200, 'application/json', json.dumps(self.state).encode('utf-8'))
+        elif path == '/stats':
+            stats = {**self.stats, 'clients': len(self.clients), 'peak_rss_mb': instrumentation.peak_rss_mb()}
+            self.respond(writer, 200, 'application/json', json.dumps(stats).encode('utf-8'))
+        elif path == '/':
+            with open(DASHBOARD_PATH, 'rb') as f:
+                self.respond(writer, 200, 'text/html; charset=utf-8', f.read())
+        else:
+            self.respond(writer, 404, 'application/json', json.dumps({'error': f"Unknown path: {path}"}).encode())
+
+    def respond(self, writer, status, content_type, body):
+        reason = {200: 'OK', 404: 'Not Found'}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        writer.close()
+
+    async def stream(self, reader, writer, protocol):
+        # Registers the client, starts its writer with the current snapshot, and reads until it
+        # goes away; the writer closes the connection itself if the client stops reading.
+        # Both the socket's kernel buffer and the transport's are capped, so a client that
+        # stops reading blocks its writer after about 2 * write_buffer bytes.
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.write_buffer)
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        client = Client(writer, protocol, self.queue_size)
+        if self.snapshot is not None:
+            client.queue.put_nowait(self.snapshot)
+        self.clients.add(client)
+        self.stats['connections'] += 1
+        sender = asyncio.create_task(self.send(client))
+        try:
+            if protocol == 'sse':
+                while await reader.read(4096):
+                    pass
+            else:
+                while True:
+                    opcode, payload = await read_ws_frame(reader)
+                    if opcode == 0x8:
+                        writer.write(ws_frame(payload[:2], opcode=0x8))
+                        break
+                    if opcode == 0x9:
+                        writer.write(ws_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def send(self, client):
+        try:
+            await client.send_loop(self.send_timeout, self.stats)
+        except asyncio.TimeoutError:
+            self.stats['dropped'] += 1
+            client.writer.transport.abort()
+        except ConnectionError:
+            client.writer.transport.abort()
+
+    async def serve(self, host='127.0.0.1', port=8765, backlog=1024, max_ticks=None):
+        server = await asyncio.start_server(self.handle, host, port, backlog=backlog)
+        heartbeats = asyncio.create_task(self.heartbeats())
+        async with server:
+            try:
+                await self.poll(max_ticks)
+                await self.flush_clients()
+            finally:
+                heartbeats.cancel()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Push live seat counts and insight changes to dashboards.")
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--interval', type=float, default=60, help="seconds between polls")
+    parser.add_argument('--ticks', type=int, default=None, help="stop after this many polls")
+    parser.add_argument('--heartbeat', type=float, default=15, help="seconds between keep-alive pings")
+    parser.add_argument('--queue-size', type=int, default=8, help="messages a client may fall behind before a resync")
+    parser.add_argument('--write-buffer', type=int, default=64 * 1024, help="bytes buffered per client before waiting")
+    parser.add_argument('--send-timeout', type=float, default=30, help="seconds a stalled client is kept")
+    parser.add_argument('--insights', default='election_insights.txt')
+    parser.add_argument('--changelog', default='live_changelog.jsonl')
+    args = parser.parse_args()
+
+    watcher = LiveWatcher(args.base_url, args.interval, insights_path=args.insights, changelog_path=args.changelog)
+    push = PushServer(watcher, args.interval, args.heartbeat, args.queue_size, args.write_buffer, args.send_timeout)
+    print(f"Live dashboard on http://{args.host}:{args.port}/ (SSE /events, WebSocket /ws)")
+    try:
+        asyncio.run(push.serve(args.host, args.port, max_ticks=args.ticks))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,139 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from snapshot_store import SCHEMAS
+
+# Compact columnar records for scraped party and candidate tables. Party and constituency
+# names are dictionary-encoded once per distinct value, so "Bharatiya Janata Party - BJP"
+# costs a 2-byte code per candidate row instead of a string object, and vote counts live in
+# the fixed-width integer dtypes the snapshot schema declares. Frames come out already in
+# that schema, so writing a snapshot is no further conversion.
+
+CANDIDATE_COLUMNS = ['Party', 'Serial Number', 'Constituency', 'Winning Candidate', 'Total Votes', 'Margin']
+CONSTITUENCY_PATTERN = re.compile(r'^(.*?)\s*\((\d+)\)\s*$')
+
+
+def split_constituency(constituency):
+    # "Anakapalle(5)" -> ("Anakapalle", 5); a name without a seat number gets 0.
+    match = CONSTITUENCY_PATTERN.match(str(constituency))
+    if match is None:
+        return str(constituency).strip(), 0
+    return match.group(1), int(match.group(2))
+
+
+def count_array(values, dtype):
+    # Integer column from ints or scraped text ("1,23,456", with '-' for no value).
+    values = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values.astype(dtype, copy=False)
+    return np.array([int(value.replace(',', '')) if value != '-' else 0 for value in map(str, values)], dtype=dtype)
+
+
+class Dictionary:
+    # Value <-> code table that only grows, so codes handed out stay valid.
+    def __init__(self):
+        self.lookup = {}
+        self.values = []
+
+    def code(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values):
+        # One dict lookup per distinct value, not per row; missing values get -1.
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object) if isinstance(values, list) else values)
+        remap = np.array([self.code(value) for value in uniques.tolist()], dtype=np.int32)
+        return np.where(codes >= 0, remap[codes] if len(remap) else codes, -1).astype(np.int32)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class CandidateRecords:
+    def __init__(self):
+        self.parties = Dictionary()
+        self.constituencies = Dictionary()
+        self.chunks = []
+        self.rows = 0
+
+    def extend(self, party, serial, constituency, candidate, total_votes, margin):
+        # Appends one page (party is a single name) or any frame's columns (party per row).
+        n = len(serial)
+        if n == 0:
+            return
+        if isinstance(party, str):
+            party_codes = np.full(n, self.parties.code(party), dtype=np.int16)
+        else:
+            party_codes = self.parties.encode(party).astype(np.int16)
+        self.chunks.append((
+            count_array(serial, np.int32),
+            self.constituencies.encode(constituency),
+            pd.array(candidate, dtype='str'),
+            count_array(total_votes, np.int64),
+            count_array(margin, np.int64),
+            party_codes,
+        ))
+        self.rows += n
+
+    def extend_frames(self, frames):
+        # Pages are joined column by column first, so a scrape is encoded in one pass rather
+        # than paying the per-call overhead once per party page.
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return
+        self.extend(*(np.concatenate([df[column].to_numpy() for df in frames]) for column in CANDIDATE_COLUMNS))
+
+    def __len__(self):
+        return self.rows
+
+    def to_frame(self, split=False):
+        # Candidate table in the 'candidates' snapshot schema; split adds the constituency's
+        # bare name and seat number as 'Constituency Name' / 'Constituency Number'.
+        if not self.rows:
+            return pd.DataFrame()
+        if len(self.chunks) > 1:
+            serial, constituency, candidate, votes, margin, party = zip(*self.chunks)
+            serial, constituency, votes, margin, party = (np.concatenate(column)
+                                                          for column in (serial, constituency, votes, margin, party))
+            candidate = pd.concat([pd.Series(names, copy=False) for names in candidate], ignore_index=True).array
+            # Later extends append after the concatenated block instead of re-joining every page.
+            self.chunks = [(serial, constituency, candidate, votes, margin, party)]
+        serial, constituency, candidate, votes, margin, party = self.chunks[0]
+        df = pd.DataFrame({
+            'Serial Number': serial,
+            'Constituency': pd.Categorical.from_codes(constituency, self.constituencies.values),
+            'Winning Candidate': candidate,
+            'Total Votes': votes,
+            'Margin': margin,
+            'Party': pd.Categorical.from_codes(party, self.parties.values),
+        })
+        if split:
+            names, numbers = zip(*(split_constituency(value) for value in self.constituencies.values))
+            name_codes, unique_names = pd.factorize(pd.Index(names, dtype=object))
+            df['Constituency Name'] = pd.Categorical.from_codes(name_codes[constituency], unique_names)
+            df['Constituency Number'] = np.asarray(numbers, dtype=np.int16)[constituency]
+        return df
+
+
+def candidate_frame(frames):
+    # Concatenation of per-party candidate frames as one compact frame: the categoricals are
+    # re-encoded against shared dictionaries rather than falling back to object columns.
+    records = CandidateRecords()
+    records.extend_frames(frames)
+    return records.to_frame()
+
+
+def party_frame(party, won, leading, total, links):
+    schema = SCHEMAS['parties']
+    return pd.DataFrame({
+        'Party': pd.array(party, dtype='str'),
+        'Won': np.asarray(won, dtype=schema['Won']),
+        'Leading': np.asarray(leading, dtype=schema['Leading']),
+        'Total': np.asarray(total, dtype=schema['Total']),
+        'Link': pd.array(links, dtype='str'),
+    })
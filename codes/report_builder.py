@@ -0,0 +1,154 @@
+import numbers
+import os
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader, simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+FONT = 'Helvetica'
+BOLD_FONT = 'Helvetica-Bold'
+
+
+class ReportBuilder:
+    # Writes a PDF top to bottom on one canvas, breaking to a new page whenever the next
+    # line, table row or image would run past the bottom margin. Rows are drawn as they are
+    # consumed, so tables can be fed from generators. Images are drawn by filename, which
+    # reportlab registers as one XObject per file however many times it is placed.
+    def __init__(self, path, title=None, pagesize=letter, margin=54, font_size=10, leading=14):
+        self.canvas = canvas.Canvas(path, pagesize=pagesize, pageCompression=1)
+        self.width, self.height = pagesize
+        self.margin = margin
+        self.font_size = font_size
+        self.leading = leading
+        self.title = title
+        self.pages = 0
+        self.image_sizes = {}
+        self.start_page()
+        if title:
+            self.canvas.setTitle(title)
+            self.heading(title, size=18)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def content_width(self):
+        return self.width - 2 * self.margin
+
+    def start_page(self):
+        self.pages += 1
+        self.y = self.height - self.margin
+
+    def end_page(self):
+        self.canvas.setFont(FONT, 8)
+        footer = f"{self.title} - page {self.pages}" if self.title else f"Page {self.pages}"
+        self.canvas.drawRightString(self.width - self.margin, self.margin / 2, footer)
+        self.canvas.showPage()
+
+    def new_page(self):
+        self.end_page()
+        self.start_page()
+
+    def ensure(self, height):
+        # Starts a new page unless height points still fit above the bottom margin.
+        if self.y - height < self.margin:
+            self.new_page()
+
+    def space(self, height=None):
+        self.y -= self.leading if height is None else height
+
+    def heading(self, text, size=14):
+        self.ensure(size * 2 + self.leading)
+        self.y -= size
+        self.canvas.setFont(BOLD_FONT, size)
+        self.canvas.drawString(self.margin, self.y, text)
+        self.y -= size * 0.6
+
+    def paragraph(self, text, font=FONT, size=None):
+        size = size or self.font_size
+        self.canvas.setFont(font, size)
+        for line in simpleSplit(str(text), font, size, self.content_width):
+            self.ensure(self.leading)
+            self.y -= self.leading
+            self.canvas.setFont(font, size)
+            self.canvas.drawString(self.margin, self.y, line)
+
+    def table(self, columns, rows, widths=None, align=None):
+        # columns: header labels; rows: any iterable of row sequences; widths: fractions of
+        # the content width (equal by default); align: 'left' or 'right' per column. The
+        # header is repeated at the top of every page the table spans.
+        widths = [w * self.content_width for w in (widths or [1 / len(columns)] * len(columns))]
+        align = align or ['left'] * len(columns)
+        lefts = [self.margin + sum(widths[:i]) for i in range(len(columns))]
+
+        def draw_row(values, font):
+            self.y -= self.leading
+            self.canvas.setFont(font, self.font_size)
+            for value, left, width, side in zip(values, lefts, widths, align):
+                text = fit_text(format_cell(value), font, self.font_size, width - 4)
+                if side == 'right':
+                    self.canvas.drawRightString(left + width - 2, self.y, text)
+                else:
+                    self.canvas.drawString(left + 2, self.y, text)
+
+        def draw_header():
+            draw_row(columns, BOLD_FONT)
+            self.canvas.line(self.margin, self.y - 3, self.margin + self.content_width, self.y - 3)
+            self.y -= 3
+
+        self.ensure(self.leading * 2 + 3)
+        draw_header()
+        for row in rows:
+            if self.y - self.leading < self.margin:
+                self.new_page()
+                draw_header()
+            draw_row(row, FONT)
+        self.space(self.leading / 2)
+
+    def image(self, path, max_height=None, caption=None):
+        # Scaled to the content width (and max_height), keeping its aspect ratio.
+        if path not in self.image_sizes:
+            self.image_sizes[path] = ImageReader(path).getSize()
+        image_width, image_height = self.image_sizes[path]
+        max_height = max_height or (self.height - 2 * self.margin - self.leading * 2)
+        scale = min(self.content_width / image_width, max_height / image_height)
+        width, height = image_width * scale, image_height * scale
+
+        self.ensure(height + (self.leading if caption else 0))
+        self.y -= height
+        self.canvas.drawImage(path, self.margin + (self.content_width - width) / 2, self.y, width, height)
+        if caption:
+            self.y -= self.leading
+            self.canvas.setFont(FONT, self.font_size - 1)
+            self.canvas.drawCentredString(self.width / 2, self.y, caption)
+        self.space(self.leading / 2)
+
+    def close(self):
+        self.end_page()
+        self.canvas.save()
+        return self.pages
+
+
+def format_cell(value):
+    if isinstance(value, numbers.Integral):
+        return f"{value:,}"
+    if isinstance(value, numbers.Real):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def fit_text(text, font, size, width):
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + '...', font, size) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+def existing_charts(chart_dir, names):
+    return [(name, os.path.join(chart_dir, f'{name}.png')) for name in names
+            if os.path.exists(os.path.join(chart_dir, f'{name}.png'))]
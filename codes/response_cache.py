@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+import instrumentation
+from http_client import HEADERS
+
+
+class ResponseCache:
+    # Hits only refresh an entry's timestamps, so they mark the index dirty and it is written
+    # at most every flush_interval seconds (and by flush()); misses write it straight away.
+    def __init__(self, cache_dir='.eci_cache', max_bytes=64 * 1024 * 1024, max_age=None, flush_interval=5.0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    def fetch(self, url, parse, session=None):
+        # Returns the parsed DataFrame for url, re-parsing only when the page body changed.
+        # Raises requests.HTTPError for non-2xx responses other than 304.
+        with self.lock:
+            entry = self.index.get(url)
+            if entry is not None and not os.path.exists(self._data_path(entry)):
+                entry = None
+
+        headers = dict(HEADERS)
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = instrumentation.get(url, session, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            df = self._hit(url, entry)
+            if df is not None:
+                return df
+            # Evicted between the lookup and the read: fetch the body again, unconditionally.
+            response = instrumentation.get(url, session, headers=HEADERS)
+            entry = None
+        response.raise_for_status()
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        if entry is not None and entry['sha256'] == digest:
+            df = self._hit(url, entry, response)
+            if df is not None:
+                return df
+
+        df = parse(response.content)
+        entry = {
+            'file': hashlib.sha1(url.encode()).hexdigest() + '.pkl',
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': digest,
+        }
+        df.to_pickle(self._data_path(entry))
+        entry['size'] = os.path.getsize(self._data_path(entry))
+        entry['fetched_at'] = entry['used_at'] = time.time()
+        with self.lock:
+            self.misses += 1
+            self.index[url] = entry
+            self._evict()
+            self._save_index()
+        return df
+
+    def flush(self):
+        # Writes timestamps from hits not yet saved.
+        with self.lock:
+            if self.dirty:
+                self._save_index()
+
+    def clear(self):
+        with self.lock:
+            for entry in self.index.values():
+                self._remove_file(entry)
+            self.index = {}
+            self._save_index()
+
+    def _hit(self, url, entry, response=None):
+        # The cached frame, or None when another fetch evicted it since the lookup.
+        try:
+            df = pd.read_pickle(self._data_path(entry))
+        except FileNotFoundError:
+            return None
+        with self.lock:
+            self.hits += 1
+            entry['used_at'] = entry['fetched_at'] = time.time()
+            changed = False
+            if response is not None:
+                validators = response.headers.get('ETag'), response.headers.get('Last-Modified')
+                changed = validators != (entry.get('etag'), entry.get('last_modified'))
+                entry['etag'], entry['last_modified'] = validators
+            self.dirty = True
+            if changed or time.monotonic() - self.saved_at >= self.flush_interval:
+                self._save_index()
+        return df
+
+    def _evict(self):
+        if self.max_age is not None:
+            cutoff = time.time() - self.max_age
+            for url in [url for url, entry in self.index.items() if entry['fetched_at'] < cutoff]:
+                self._remove_file(self.index.pop(url))
+
+        total = sum(entry['size'] for entry in self.index.values())
+        for url in sorted(self.index, key=lambda url: self.index[url]['used_at']):
+            if total <= self.max_bytes:
+                break
+            entry = self.index.pop(url)
+            total -= entry['size']
+            self._remove_file(entry)
+
+    def _data_path(self, entry):
+        return os.path.join(self.cache_dir, entry['file'])
+
+    def _remove_file(self, entry):
+        try:
+            os.remove(self._data_path(entry))
+        except FileNotFoundError:
+            pass
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+        self.saved_at = time.monotonic()
@@ -1,11 +1,12 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from html_tables import find_table, party_table_frame
+
 
 def scrape_eci_data(url):
     headers = {
@@ -15,27 +16,9 @@ def scrape_eci_data(url):
     if response.status_code != 200:
         raise Exception(f"Failed to fetch data: Status code {response.status_code}")
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    table = soup.find('table', class_='table')
+    table = find_table(response.content, 'table')
 
-    if not table:
+    if table is None:
         raise Exception("Could not find the results table on the page")
 
-    data = []
-    for row in table.find_all('tr')[1:]:
-        cols = row.find_all('td')
-        if len(cols) == 4:
-            party = cols[0].text.strip()
-            won = int(cols[1].text.strip())
-            leading = int(cols[2].text.strip())
-            total = int(cols[3].text.strip())
-            party_link = cols[1].find('a')['href']
-            data.append({
-                'Party': party,
-                'Won': won,
-                'Leading': leading,
-                'Total': total,
-                'Link': party_link
-            })
-
-    return pd.DataFrame(data)
+    return party_table_frame(table)
@@ -0,0 +1,242 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from coalitions import banzhaf_index
+from compute_insights import majority_threshold
+
+# Monte Carlo seat projection from the winners table. Each trial draws a swing for every
+# party, nationally and (with regions) per region, plus one per seat, each normal with its
+# own spread. A seat's swing to its runner-up is half the runner-up's party swing minus half
+# the winner's, plus the seat term, in percent of the winner's votes moving across. Moving a
+# share f of the winner's votes V closes the margin M by 2fV, so a seat flips once
+# f > M / 2V; a party swinging up gains the seats where it runs second and holds more of its
+# own. Runners-up come from the seat's 'Runner-up Party' or the full results crawled by
+# constituency_crawl.py; seats with neither flip to a pooled CHALLENGER, which only takes
+# seats away and is left out of the majority and kingmaker figures.
+
+CHALLENGER = 'Runner-up (unknown party)'
+NOTA = 'None of the Above'
+
+
+def runner_up_parties(candidate_df, results_df):
+    # Per winners row, the best-placed party other than the winner's in results_df (one row
+    # per candidate, as in election_results), or CHALLENGER for constituencies it lacks.
+    winners = pd.Series(candidate_df['Party'].astype(str).to_numpy(), index=candidate_df['Constituency'].astype(str))
+    winners = winners[~winners.index.duplicated()]
+    results = results_df[results_df['Party'].astype(str) != NOTA]
+    constituency = results['Constituency'].astype(str)
+    results = results[results['Party'].astype(str) != constituency.map(winners)]
+    best = results.sort_values('Votes', ascending=False, kind='stable').drop_duplicates('Constituency')
+    runner_up = best.set_index(best['Constituency'].astype(str))['Party'].astype(str)
+    return candidate_df['Constituency'].astype(str).map(runner_up).fillna(CHALLENGER)
+
+
+@dataclass
+class SeatProjection:
+    trials: int
+    quota: int
+    top_party: str
+    majority_probability: float  # top_party alone reaching the quota
+    any_majority_probability: float
+    seats: pd.DataFrame  # per party: base seats, mean, 5th/50th/95th percentile, P(majority)
+    kingmakers: pd.DataFrame  # per party: P(kingmaker), mean Banzhaf power over sampled trials
+
+    def summary(self):
+        seats = self.seats.head(10).to_string(index=False, float_format=lambda v: f"{v:.2f}")
+        kingmakers = self.kingmakers.head(10).to_string(index=False, float_format=lambda v: f"{v:.3f}")
+        return (f"Seat projection over {self.trials:,} trials (majority: {self.quota}):\n"
+                f"P({self.top_party} reaches majority alone) = {self.majority_probability:.3f}\n"
+                f"P(any party reaches majority alone) = {self.any_majority_probability:.3f}\n\n"
+                f"{seats}\n\nKingmaker power:\n{kingmakers}")
+
+
+class SeatModel:
+    def __init__(self, candidate_df, regions=None, results_df=None):
+        # regions: optional per-row labels (e.g. State) sharing a regional swing. results_df:
+        # full results naming each seat's runner-up when candidate_df has no 'Runner-up Party'.
+        df = candidate_df.reset_index(drop=True)
+        if 'Runner-up Party' in df.columns:
+            runner_up = df['Runner-up Party'].astype(str)
+        elif results_df is not None:
+            runner_up = runner_up_parties(df, results_df)
+        else:
+            runner_up = pd.Series(CHALLENGER, index=df.index)
+        party_codes, parties = pd.factorize(pd.concat([df['Party'], runner_up], ignore_index=True).astype(str))
+        self.parties = pd.Index(parties)
+        self.named = np.asarray(self.parties != CHALLENGER)
+        self.winner = party_codes[:len(df)]
+        self.runner_up = party_codes[len(df):]
+        votes = df['Total Votes'].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Swing (in percent of the winner's votes) at which each seat changes hands.
+            self.flip_at = np.where(votes > 0, df['Margin'].to_numpy(dtype=np.float64) / (2 * votes) * 100, 0.0)
+        region_codes, self.regions = pd.factorize(np.asarray(regions) if regions is not None else np.zeros(len(df)))
+        self.region = region_codes
+        # Each seat's winner and runner-up as (region, party) pairs, numbered over the pairs
+        # that occur, so regional party swings are only drawn where some seat uses them.
+        pair_codes, self.pairs = pd.factorize(np.concatenate((region_codes * len(self.parties) + self.winner,
+                                                               region_codes * len(self.parties) + self.runner_up)))
+        self.winner_pair = pair_codes[:len(df)]
+        self.runner_up_pair = pair_codes[len(df):]
+        self.base_seats = np.bincount(self.winner, minlength=len(self.parties))
+        self.quota = majority_threshold(pd.DataFrame({'Total': [len(df)]}))
+        # Row i moves seat i from its winner (-1) to its runner-up (+1) if it flips.
+        self.transfer = np.zeros((len(df), len(self.parties)), dtype=np.float32)
+        self.transfer[np.arange(len(df)), self.winner] -= 1
+        self.transfer[np.arange(len(df)), self.runner_up] += 1
+
+    @property
+    def seat_count(self):
+        return len(self.winner)
+
+
+def simulate_chunk(model, trials, seed, national_sd, regional_sd, seat_sd, power_samples):
+    # Aggregates for one chunk of trials; memory is trials x seats for the swing draws.
+    rng = np.random.default_rng(seed)
+    n_parties = len(model.parties)
+    swing = rng.standard_normal(size=(trials, model.seat_count), dtype=np.float32)
+    swing *= seat_sd
+    # Half of each party's national swing, and of its swing in each region it contests.
+    party_swing = rng.normal(0.0, national_sd / 2, size=(trials, n_parties)).astype(np.float32)
+    swing += party_swing[:, model.runner_up]
+    swing -= party_swing[:, model.winner]
+    if len(model.regions) > 1:
+        party_swing = rng.normal(0.0, regional_sd / 2, size=(trials, len(model.pairs))).astype(np.float32)
+        swing += party_swing[:, model.runner_up_pair]
+        swing -= party_swing[:, model.winner_pair]
+    del party_swing
+    flips = (swing > model.flip_at).astype(np.float32)
+    del swing
+
+    # Seat totals are one (trials x seats) @ (seats x parties) product with the transfer
+    # matrix; float32 sums of 0/1 flips stay exact far beyond 543 seats. CHALLENGER's seats
+    # count against the others but it never leads, holds a majority or makes a kingmaker.
+    seats = model.base_seats + (flips @ model.transfer).astype(np.int64)
+    top_code = int(np.argmax(model.base_seats))
+    named_seats = np.where(model.named, seats, 0)
+    leader = np.argmax(named_seats, axis=1)
+    leader_seats = seats[np.arange(trials), leader]
+    shortfall = model.quota - leader_seats
+    # A kingmaker alone lifts the trial's largest party to the majority it falls short of.
+    kingmaker = (named_seats >= shortfall[:, None]) & (shortfall[:, None] > 0)
+    kingmaker[np.arange(trials), leader] = False
+
+    power = np.zeros(n_parties)
+    for t in range(min(power_samples, trials)):
+        power[model.named] += banzhaf_index(seats[t, model.named].tolist(), model.quota)
+
+    return {
+        'trials': trials,
+        'top_majority': int((seats[:, top_code] >= model.quota).sum()),
+        'any_majority': int((leader_seats >= model.quota).sum()),
+        'histogram': np.stack([np.bincount(seats[:, p], minlength=model.seat_count + 1) for p in range(n_parties)]),
+        'majority': (named_seats >= model.quota).sum(axis=0),
+        'kingmaker': kingmaker.sum(axis=0),
+        'power': power,
+        'power_samples': min(power_samples, trials),
+    }
+
+
+def chunk_sizes(trials, chunk_trials):
+    sizes = [chunk_trials] * (trials // chunk_trials)
+    if trials % chunk_trials:
+        sizes.append(trials % chunk_trials)
+    return sizes
+
+
+def histogram_percentile(histogram, q):
+    # Seat count at quantile q of each party's seat histogram.
+    cumulative = np.cumsum(histogram, axis=1)
+    return np.argmax(cumulative >= q * cumulative[:, -1:], axis=1)
+
+
+def simulate(candidate_df, trials=100_000, national_sd=2.0, regional_sd=2.0, seat_sd=4.0, regions=None,
+             results_df=None, chunk_trials=None, memory_limit_mb=256, workers=None, power_samples=200, seed=0):
+    # Runs trials in chunks sized so one chunk's swing matrices stay within memory_limit_mb,
+    # spread over a process pool when workers > 1. Chunks draw from independent child
+    # seeds of seed, so results do not depend on the number of workers.
+    model = SeatModel(candidate_df, regions, results_df)
+    if chunk_trials is None:
+        # float32 swing, party swing lookups and flips per seat, the party swings drawn,
+        # plus the per-party seat and kingmaker matrices.
+        per_trial = model.seat_count * 13 + (len(model.pairs) + len(model.parties)) * 12 + len(model.parties) * 40
+        chunk_trials = max(1, min(trials, memory_limit_mb * 1024 * 1024 // per_trial))
+    sizes = chunk_sizes(trials, chunk_trials)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    samples = [power_samples // len(sizes) + (i < power_samples % len(sizes)) for i in range(len(sizes))]
+    args = [(model, size, child, national_sd, regional_sd, seat_sd, sample)
+            for size, child, sample in zip(sizes, seeds, samples)]
+
+    workers = workers or os.cpu_count()
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as executor:
+            results = list(executor.map(simulate_chunk, *zip(*args)))
+    else:
+        results = [simulate_chunk(*chunk_args) for chunk_args in args]
+
+    histogram = sum(result['histogram'] for result in results)
+    power_trials = sum(result['power_samples'] for result in results)
+    top_code = int(np.argmax(model.base_seats))
+    named = model.named
+    seats = pd.DataFrame({
+        'Party': model.parties,
+        'Base Seats': model.base_seats,
+        'Mean Seats': (histogram * np.arange(histogram.shape[1])).sum(axis=1) / trials,
+        'P5': histogram_percentile(histogram, 0.05),
+        'P50': histogram_percentile(histogram, 0.50),
+        'P95': histogram_percentile(histogram, 0.95),
+        'P(Majority)': sum(result['majority'] for result in results) / trials,
+    })[named].sort_values('Mean Seats', ascending=False, kind='stable').reset_index(drop=True)
+    kingmakers = pd.DataFrame({
+        'Party': model.parties,
+        'P(Kingmaker)': sum(result['kingmaker'] for result in results) / trials,
+        'Mean Banzhaf': sum(result['power'] for result in results) / power_trials if power_trials else np.nan,
+    })[named].sort_values(['P(Kingmaker)', 'Mean Banzhaf'], ascending=False, kind='stable').reset_index(drop=True)
+
+    return SeatProjection(
+        trials=trials,
+        quota=model.quota,
+        top_party=model.parties[top_code],
+        majority_probability=sum(result['top_majority'] for result in results) / trials,
+        any_majority_probability=sum(result['any_majority'] for result in results) / trials,
+        seats=seats,
+        kingmakers=kingmakers,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from snapshot_store import load_dataset
+
+    parser = argparse.ArgumentParser(description="Monte Carlo seat projection from winners' margins.")
+    parser.add_argument('--csv', default='../datasets/candidate_data.csv')
+    parser.add_argument('--trials', type=int, default=100_000)
+    parser.add_argument('--national-sd', type=float, default=2.0)
+    parser.add_argument('--regional-sd', type=float, default=2.0)
+    parser.add_argument('--seat-sd', type=float, default=4.0)
+    parser.add_argument('--states', help="CSV mapping Constituency to State, used as swing regions")
+    parser.add_argument('--results', default='election_results.csv',
+                        help="full results naming each seat's runner-up (from constituency_crawl.py)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--memory-limit-mb', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    candidate_df = load_dataset('candidates', args.csv)
+    try:
+        results_df = load_dataset('election_results', args.results)
+    except FileNotFoundError:
+        print(f"No full results at {args.results}: seats without a known runner-up flip to '{CHALLENGER}'")
+        results_df = None
+    regions = None
+    if args.states:
+        states = pd.read_csv(args.states).set_index('Constituency')['State']
+        regions = candidate_df['Constituency'].astype(str).map(states).fillna('Unknown')
+    projection = simulate(candidate_df, args.trials, args.national_sd, args.regional_sd, args.seat_sd, regions,
+                          results_df, memory_limit_mb=args.memory_limit_mb, workers=args.workers, seed=args.seed)
+    print(projection.summary())
@@ -0,0 +1,213 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+
+# Column dtypes each dataset is coerced to before it is written. Columns not listed
+# are stored with whatever dtype they already have.
+SCHEMAS = {
+    'parties': {
+        'Party': 'category',
+        'Won': 'int32',
+        'Leading': 'int32',
+        'Total': 'int32',
+        'Link': 'str',
+    },
+    'candidates': {
+        'Serial Number': 'int32',
+        'Constituency': 'category',
+        'Winning Candidate': 'str',
+        'Total Votes': 'int64',
+        'Margin': 'int64',
+        'Party': 'category',
+    },
+    'election_results': {
+        'Constituency': 'category',
+        'Candidate': 'str',
+        'Party': 'category',
+        'Votes': 'int64',
+    },
+    'election_history': {
+        'Election': 'int16',
+        'State': 'category',
+        'Constituency': 'category',
+        'Winning Candidate': 'str',
+        'Total Votes': 'int64',
+        'Margin': 'int64',
+        'Party': 'category',
+    },
+}
+
+SNAPSHOT_DIR = 'snapshots'
+SNAPSHOT_SUFFIX = '.arrow'
+
+
+def parse_count(series):
+    # Vote counts scraped as text carry thousands separators and '-' for "no value".
+    if pd.api.types.is_integer_dtype(series):
+        return series
+    series = series.astype(str).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(series.mask(series == '-', '0'))
+
+
+def apply_schema(name, df):
+    schema = SCHEMAS.get(name, {})
+    columns = {}
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype.startswith('int'):
+            columns[column] = parse_count(df[column]).astype(dtype)
+        else:
+            columns[column] = df[column].astype(dtype)
+    return df.assign(**columns)
+
+
+class SnapshotStore:
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+
+    def dataset_dir(self, name, partition=None):
+        # A partitioned dataset keeps each partition's snapshots in its own subdirectory.
+        if partition is None:
+            return os.path.join(self.root, name)
+        return os.path.join(self.root, name, str(partition))
+
+    def versions(self, name, partition=None):
+        directory = self.dataset_dir(name, partition)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(file[:-len(SNAPSHOT_SUFFIX)] for file in os.listdir(directory)
+                      if file.endswith(SNAPSHOT_SUFFIX))
+
+    def partitions(self, name):
+        directory = self.dataset_dir(name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(entry for entry in os.listdir(directory) if self.versions(name, entry))
+
+    def path(self, name, version=None, partition=None):
+        if version is None:
+            versions = self.versions(name, partition)
+            if not versions:
+                raise FileNotFoundError(f"No snapshots stored for dataset '{name}' in {self.root}")
+            version = versions[-1]
+        return os.path.join(self.dataset_dir(name, partition), version + SNAPSHOT_SUFFIX)
+
+    def write(self, name, df, version=None, partition=None):
+        # Snapshots are uncompressed Arrow IPC files so reads can memory-map them
+        # without decoding; the version defaults to the write timestamp.
+        if version is None:
+            version = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        directory = self.dataset_dir(name, partition)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, version + SNAPSHOT_SUFFIX)
+        tmp_path = path + '.tmp'
+        feather.write_feather(apply_schema(name, df).reset_index(drop=True), tmp_path,
+                              compression='uncompressed')
+        os.replace(tmp_path, path)
+        return version
+
+    def writer(self, name, version=None):
+        if version is None:
+            version = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        os.makedirs(self.dataset_dir(name), exist_ok=True)
+        return SnapshotWriter(name, os.path.join(self.dataset_dir(name), version + SNAPSHOT_SUFFIX))
+
+    def read_table(self, name, version=None, columns=None, partition=None):
+        return feather.read_table(self.path(name, version, partition), columns=columns, memory_map=True)
+
+    def read(self, name, version=None, columns=None, partition=None):
+        return self.read_table(name, version, columns, partition).to_pandas()
+
+    def read_partitions(self, name, partitions=None, columns=None):
+        # Latest snapshot of each partition (all of them by default) as one frame.
+        tables = [self.read_table(name, columns=columns, partition=partition)
+                  for partition in (partitions or self.partitions(name))]
+        if not tables:
+            raise FileNotFoundError(f"No partitions stored for dataset '{name}' in {self.root}")
+        return pa.concat_tables(tables, promote_options='permissive').to_pandas()
+
+    def export_csv(self, name, csv_path, version=None):
+        # Plain CSV for PowerBI and anything else that does not read Arrow.
+        self.read(name, version).to_csv(csv_path, index=False)
+        return csv_path
+
+
+def plain_array(series):
+    # Arrow-backed columns (pandas' str dtype) convert to a ChunkedArray; a batch needs one array.
+    array = pa.array(series)
+    return array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array
+
+
+class SnapshotWriter:
+    # Appends DataFrame chunks to one snapshot as separate record batches. Category columns
+    # share a dictionary that only grows, so later batches ship dictionary deltas and codes
+    # stay valid across the whole file.
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.schema = None
+        self.writer = None
+        self.dictionaries = {}
+        self.known = {}
+        self.rows = 0
+
+    def encode(self, series):
+        categories = self.dictionaries.setdefault(series.name, [])
+        known = self.known.setdefault(series.name, set())
+        unseen = [value for value in pd.unique(series.dropna()) if value not in known]
+        categories.extend(unseen)
+        known.update(unseen)
+        codes = pd.Categorical(series, categories=categories).codes.astype('int32')
+        return pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0), pa.array(categories, pa.string()))
+
+    def write(self, df):
+        df = apply_schema(self.name, df)
+        arrays = [self.encode(df[column]) if isinstance(df[column].dtype, pd.CategoricalDtype)
+                  else plain_array(df[column]) for column in df.columns]
+        if self.writer is None:
+            self.schema = pa.schema([pa.field(column, array.type) for column, array in zip(df.columns, arrays)])
+            self.writer = ipc.new_file(self.tmp_path, self.schema,
+                                       options=ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+        else:
+            arrays = [array if pa.types.is_dictionary(field.type) else array.cast(field.type)
+                      for array, field in zip(arrays, self.schema)]
+        self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self.writer is not None:
+            self.writer.close()
+            os.remove(self.tmp_path)
+
+
+def load_dataset(name, csv_path, store_root=SNAPSHOT_DIR):
+    # Latest snapshot if the store has one, otherwise the CSV typed to the same schema.
+    store = SnapshotStore(store_root)
+    if store.versions(name):
+        return store.read(name)
+    return apply_schema(name, pd.read_csv(csv_path))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python snapshot_store.py <dataset> <csv_path>")
+        sys.exit(1)
+    print(SnapshotStore().export_csv(sys.argv[1], sys.argv[2]))
@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+
+from entities import constituency_keys, entity_index
+
+# Swing and seat retention across elections from the history store's winners tables.
+# Every election is laid out as a row of dense per-constituency arrays (winning party code,
+# winner's votes, margin), so comparing two elections is elementwise array arithmetic and a
+# state or party slice is a boolean mask over at most a few hundred seats. Constituencies
+# and parties are matched across elections by their entity IDs, so "AJMER (13)" is
+# "Ajmer(13)" and a party spelled "BJP" one year is the same party the next. A bare name
+# several seats share (Aurangabad, Hamirpur) has no entity ID; it is matched within its State
+# instead, and history without a State column cannot use such names at all.
+
+
+class SwingEngine:
+    def __init__(self, history, entities=None):
+        self.entities = entities or entity_index()
+        self.elections = np.sort(history['Election'].unique())
+        election_codes = np.searchsorted(self.elections, history['Election'].to_numpy())
+
+        constituency_codes, self.constituencies = pd.factorize(self.seat_keys(history))
+        party_codes, self.party_ids = pd.factorize(self.entities.parties.ids(history['Party'], add=True))
+        self.parties = pd.Index(self.entities.parties.take(self.party_ids), dtype=object)
+
+        shape = (len(self.elections), len(self.constituencies))
+        self.present = np.zeros(shape, dtype=bool)
+        self.winner = np.full(shape, -1, dtype=np.int32)
+        self.votes = np.zeros(shape, dtype=np.int64)
+        self.margin = np.zeros(shape, dtype=np.int64)
+        self.names = np.empty(len(self.constituencies), dtype=object)
+        at = (election_codes, constituency_codes)
+        self.present[at] = True
+        self.winner[at] = party_codes
+        self.votes[at] = history['Total Votes'].to_numpy(dtype=np.int64)
+        self.margin[at] = history['Margin'].to_numpy(dtype=np.int64)
+        self.names[constituency_codes] = history['Constituency'].astype(str).to_numpy()
+
+        if 'State' in history.columns:
+            state_codes, states = pd.factorize(history['State'])
+            self.states = pd.Index(np.asarray(states), dtype=object)
+            self.state = np.full(len(self.constituencies), -1, dtype=np.int32)
+            self.state[constituency_codes] = state_codes
+        else:
+            self.states, self.state = pd.Index([]), None
+        self.comparisons = {}
+
+    def seat_keys(self, history):
+        # One key per row: the constituency's entity ID, or for a name without one, the ID of
+        # the seat of that name in the same State elsewhere in history, else a key of its own
+        # per (State, name), numbered below -1 so it never meets an entity ID.
+        ids = self.entities.constituencies.ids(history['Constituency'], add=True).astype(np.int64)
+        unresolved = ids < 0
+        if not unresolved.any():
+            return ids
+        names = history['Constituency'].astype(str).to_numpy()
+        if 'State' not in history.columns or history['State'][unresolved].isna().any():
+            raise Exception("Constituencies without a State cannot be told apart: "
+                            f"{sorted(set(names[unresolved]))}")
+        states = history['State'].astype(str).to_numpy()
+        bare = np.array([constituency_keys(name)[1] for name in names], dtype=object)
+        known = {}
+        for state, name, entity in zip(states[~unresolved], bare[~unresolved], ids[~unresolved]):
+            known.setdefault((state, name), set()).add(int(entity))
+        own = {}
+        for row in np.flatnonzero(unresolved):
+            key = (states[row], bare[row])
+            entities = known.get(key, ())
+            ids[row] = next(iter(entities)) if len(entities) == 1 else own.setdefault(key, -2 - len(own))
+        return ids
+
+    def election_index(self, election):
+        position = np.searchsorted(self.elections, election)
+        if position == len(self.elections) or self.elections[position] != election:
+            raise Exception(f"Election {election} is not in the history store")
+        return position
+
+    def compare(self, before, after):
+        # Per-constituency arrays for one pair of elections, computed once and reused by
+        # every slice of that pair.
+        if (before, after) not in self.comparisons:
+            b, a = self.election_index(before), self.election_index(after)
+            both = self.present[b] & self.present[a]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                votes_swing = np.where(self.votes[b] > 0, (self.votes[a] - self.votes[b]) / self.votes[b] * 100, np.nan)
+            self.comparisons[before, after] = {
+                'both': both,
+                'winner_before': self.winner[b],
+                'winner_after': self.winner[a],
+                'flipped': both & (self.winner[b] != self.winner[a]),
+                'votes_before': self.votes[b],
+                'votes_after': self.votes[a],
+                'votes_swing': votes_swing,
+                'margin_before': self.margin[b],
+                'margin_after': self.margin[a],
+                'margin_change': self.margin[a] - self.margin[b],
+            }
+        return self.comparisons[before, after]
+
+    def selection(self, comparison, state=None, party=None, flipped_only=False):
+        mask = comparison['both'].copy()
+        if state is not None:
+            if self.state is None:
+                raise Exception("History has no State column; ingest it with a states mapping")
+            codes = np.flatnonzero(self.states == state)
+            mask &= self.state == (codes[0] if len(codes) else -2)
+        if party is not None:
+            codes = np.flatnonzero(self.party_ids == self.entities.parties.id(party))
+            code = codes[0] if len(codes) else -2
+            mask &= (comparison['winner_before'] == code) | (comparison['winner_after'] == code)
+        if flipped_only:
+            mask &= comparison['flipped']
+        return np.flatnonzero(mask)
+
+    def swing(self, before, after, state=None, party=None, flipped_only=False):
+        # One row per constituency held in both elections: who won each time, whether the
+        # seat flipped, and how the winner's votes and margin moved.
+        comparison = self.compare(before, after)
+        rows = self.selection(comparison, state, party, flipped_only)
+        columns = {'Constituency': self.names[rows]}
+        if self.state is not None:
+            columns['State'] = pd.Categorical.from_codes(self.state[rows], self.states)
+        columns.update({
+            f'Winner {before}': self.parties.take(comparison['winner_before'][rows]),
+            f'Winner {after}': self.parties.take(comparison['winner_after'][rows]),
+            'Flipped': comparison['flipped'][rows],
+            f'Votes {before}': comparison['votes_before'][rows],
+            f'Votes {after}': comparison['votes_after'][rows],
+            'Votes Swing %': comparison['votes_swing'][rows],
+            f'Margin {before}': comparison['margin_before'][rows],
+            f'Margin {after}': comparison['margin_after'][rows],
+            'Margin Change': comparison['margin_change'][rows],
+        })
+        return pd.DataFrame(columns)
+
+    def party_swing(self, before, after, state=None):
+        # Seats per party in each election (within the slice) with retained, gained and lost.
+        comparison = self.compare(before, after)
+        rows = self.selection(comparison, state)
+        n = len(self.parties)
+        winner_before = comparison['winner_before'][rows]
+        winner_after = comparison['winner_after'][rows]
+        flipped = comparison['flipped'][rows]
+        seats_before = np.bincount(winner_before, minlength=n)
+        seats_after = np.bincount(winner_after, minlength=n)
+        summary = pd.DataFrame({
+            'Party': self.parties,
+            f'Seats {before}': seats_before,
+            f'Seats {after}': seats_after,
+            'Change': seats_after - seats_before,
+            'Retained': np.bincount(winner_after[~flipped], minlength=n),
+            'Gained': np.bincount(winner_after[flipped], minlength=n),
+            'Lost': np.bincount(winner_before[flipped], minlength=n),
+        })
+        summary = summary[(summary[f'Seats {before}'] > 0) | (summary[f'Seats {after}'] > 0)]
+        return summary.sort_values([f'Seats {after}', 'Party'], ascending=[False, True]).reset_index(drop=True)
+
+
+def vote_share_swing(results, before, after):
+    # Percentage-point change in each party's vote share per constituency, from full results
+    # (Election, Constituency, Party, Votes for every candidate). Votes are summed per
+    # (election, constituency-party pair) with one bincount, so memory follows the pairs that
+    # actually occur rather than constituencies x parties.
+    results = results[results['Election'].isin([before, after])]
+    after_rows = (results['Election'] == after).to_numpy()
+    constituency_codes, constituencies = pd.factorize(results['Constituency'])
+    party_codes, parties = pd.factorize(results['Party'])
+    pair_codes, pairs = pd.factorize(constituency_codes.astype(np.int64) * len(parties) + party_codes)
+    votes = results['Votes'].to_numpy(dtype=np.int64)
+
+    pair_votes = np.bincount(pair_codes + after_rows * len(pairs), weights=votes,
+                             minlength=2 * len(pairs)).reshape(2, len(pairs))
+    pair_constituency = pairs // len(parties)
+    totals = np.stack([np.bincount(pair_constituency, weights=pair_votes[i], minlength=len(constituencies))
+                       for i in range(2)])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = pair_votes / totals[:, pair_constituency] * 100
+
+    contested = (totals[0] > 0) & (totals[1] > 0)
+    keep = np.flatnonzero(contested[pair_constituency])
+    swing = pd.DataFrame({
+        'Constituency': constituencies.take(pair_constituency[keep]),
+        'Party': parties.take(pairs[keep] % len(parties)),
+        f'Share {before}': shares[0, keep],
+        f'Share {after}': shares[1, keep],
+        'Swing': shares[1, keep] - shares[0, keep],
+    })
+    return swing.sort_values(['Constituency', 'Swing'], ascending=[True, False], kind='stable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from election_history import load_history
+    from entities import store_entities
+    from snapshot_store import SnapshotStore
+
+    parser = argparse.ArgumentParser(description="Seat flips, retention and margin change between two elections.")
+    parser.add_argument('before', type=int)
+    parser.add_argument('after', type=int)
+    parser.add_argument('--state')
+    parser.add_argument('--party')
+    parser.add_argument('--store-dir', default='snapshots')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store_dir)
+    engine = SwingEngine(load_history(store, [args.before, args.after]), store_entities(store))
+    print(engine.party_swing(args.before, args.after, args.state).to_string(index=False))
+    print()
+    print(engine.swing(args.before, args.after, args.state, args.party, flipped_only=True).to_string(index=False))
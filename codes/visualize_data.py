@@ -2,6 +2,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from snapshot_store import load_dataset
+
 def visualize_data(df):
     plt.figure(figsize=(10, 6))
     sns.countplot(y='Party', data=df, order=df['Party'].value_counts().index)
@@ -9,5 +11,5 @@ def visualize_data(df):
     plt.show()
 
 if __name__ == "__main__":
-    cleaned_df = pd.read_csv('cleaned_election_results.csv')
+    cleaned_df = load_dataset('election_results', 'cleaned_election_results.csv')
     visualize_data(cleaned_df)